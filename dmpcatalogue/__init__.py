@@ -11,8 +11,10 @@
 ***************************************************************************
 """
 
-from dmpcatalogue.plugin import DmpPlugin
-
 
 def classFactory(iface):
+    # plugin is imported here, so worker processes importing the package
+    # modules do not load QGIS
+    from dmpcatalogue.plugin import DmpPlugin
+
     return DmpPlugin(iface)
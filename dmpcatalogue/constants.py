@@ -22,6 +22,52 @@ PLUGIN_ICON = QIcon(os.path.join(PLUGIN_PATH, "icons", "dmpcatalogue.svg"))
 # defaults for settings
 DEFAULT_API_ROOT = "https://datakatalog.miljoeportal.dk/api"
 DEFAULT_LOAD_ORDER = ["wms", "wmts", "wfs"]
+# interval of the dataset status polling in minutes, 0 disables polling
+DEFAULT_STATUS_POLL_INTERVAL = 15
+# polling interval is at most this many times longer than the configured
+# one when dataset status does not change
+MAX_STATUS_POLL_BACKOFF = 8
+
+# maximum number of thumbnails downloaded at once
+MAX_THUMBNAIL_REQUESTS = 4
+# size of the thumbnail icons in the dataset tree in device independent
+# pixels, thumbnails are scaled to it in the background
+THUMBNAIL_ICON_SIZE = 16
+# disk budget of the thumbnails cache in megabytes, 0 means no limit
+DEFAULT_THUMBNAIL_CACHE_SIZE = 50
+
+# number of datasets requested in one page of the catalogue
+DATASETS_PAGE_SIZE = 500
+# maximum number of catalogue pages downloaded at once
+MAX_PAGE_REQUESTS = 4
+
+# number of times a failed request is repeated
+MAX_REQUEST_RETRIES = 3
+# delay before the first retry in seconds, it doubles with every retry
+RETRY_BASE_DELAY = 1
+# maximum delay between retries in seconds
+RETRY_MAX_DELAY = 30
+# number of failed requests in a row after which the host is not
+# contacted for a while
+CIRCUIT_FAILURE_THRESHOLD = 5
+# time in seconds after which requests to the failing host are allowed
+# again
+CIRCUIT_RESET_TIMEOUT = 300
+
+# number of the most recent requests per endpoint kept in the metrics
+METRICS_HISTORY_SIZE = 50
+
+# catalogues with at least this number of datasets are parsed in worker
+# processes, starting them does not pay off for smaller catalogues
+PARALLEL_PARSE_THRESHOLD = 20000
+# number of datasets sent to a worker process at once
+PARSE_CHUNK_SIZE = 1000
+# maximum number of worker processes parsing the catalogue
+MAX_PARSE_WORKERS = 4
 
 LOCALES = ["dk", "en"]
 DEFAULT_LOCALE = "dk"
+
+# version of the parsed catalogue snapshot format, should be increased
+# every time the format changes
+SNAPSHOT_VERSION = 1
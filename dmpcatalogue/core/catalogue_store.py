@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, Union
+import pickle
+import sqlite3
+
+from dmpcatalogue.constants import SNAPSHOT_VERSION
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    uid TEXT PRIMARY KEY,
+    position INTEGER,
+    title TEXT,
+    category TEXT,
+    status TEXT,
+    search TEXT,
+    record BLOB
+);
+CREATE INDEX IF NOT EXISTS datasets_category ON datasets (category);
+CREATE INDEX IF NOT EXISTS datasets_status ON datasets (status);
+CREATE TABLE IF NOT EXISTS dataset_tags (
+    uid TEXT,
+    tag TEXT
+);
+CREATE INDEX IF NOT EXISTS dataset_tags_tag ON dataset_tags (tag);
+CREATE TABLE IF NOT EXISTS dataset_owners (
+    uid TEXT,
+    owner TEXT
+);
+CREATE INDEX IF NOT EXISTS dataset_owners_owner ON dataset_owners (owner);
+CREATE TABLE IF NOT EXISTS dataset_sources (
+    uid TEXT,
+    protocol TEXT,
+    url TEXT
+);
+CREATE INDEX IF NOT EXISTS dataset_sources_url ON dataset_sources (url);
+CREATE TABLE IF NOT EXISTS collections (
+    uid TEXT PRIMARY KEY,
+    position INTEGER,
+    title TEXT,
+    record BLOB
+);
+CREATE TABLE IF NOT EXISTS collection_datasets (
+    collection_uid TEXT,
+    dataset_uid TEXT,
+    position INTEGER
+);
+CREATE INDEX IF NOT EXISTS collection_datasets_collection
+    ON collection_datasets (collection_uid);
+CREATE INDEX IF NOT EXISTS collection_datasets_dataset
+    ON collection_datasets (dataset_uid);
+"""
+
+
+class CatalogueStore:
+    """
+    Persistent store of the parsed catalogue, backed by SQLite database.
+    Besides plain dataset and collection records, which are used to
+    recreate datasets and collections, it keeps tags, owners, datasource
+    URLs, collection membership and status of the datasets in indexed
+    tables, so they can be queried without scanning all datasets.
+
+    SQLite connections can not be shared between threads, so every thread
+    should use its own store instance.
+    """
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        self.connection = sqlite3.connect(file_name)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """
+        Closes database connection.
+        """
+        self.connection.close()
+
+    def key(self) -> Union[str, None]:
+        """
+        Returns key of the cache files the stored catalogue was created from,
+        or None if store is empty or was created by a different version.
+        """
+        rows = dict(self.connection.execute("SELECT key, value FROM meta"))
+        if rows.get("version", None) != str(SNAPSHOT_VERSION):
+            return None
+
+        return rows.get("key", None)
+
+    def update(self, key: str, datasets: list[dict], collections: list[dict]):
+        """
+        Replaces stored catalogue with the given dataset and collection
+        records, created from the cache files with the given key.
+        """
+        with self.connection:
+            for table in (
+                "datasets",
+                "dataset_tags",
+                "dataset_owners",
+                "dataset_sources",
+                "collections",
+                "collection_datasets",
+            ):
+                self.connection.execute(f"DELETE FROM {table}")
+
+            for i, record in enumerate(datasets):
+                self.insert_dataset(i, record)
+
+            for i, record in enumerate(collections):
+                self.insert_collection(i, record)
+
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (("version", str(SNAPSHOT_VERSION)), ("key", key)),
+            )
+
+    def insert_dataset(self, position: int, record: dict):
+        """
+        Inserts dataset record into the store.
+        """
+        uid = record["uid"]
+        tags = record.get("tags", None) or list()
+        owners = record.get("owners", None) or list()
+
+        # status is kept only in its own column, so it can be updated
+        # without rewriting the whole record
+        record = record.copy()
+        status = record.pop("status", None)
+
+        # category is not searchable, like other grouping nodes it is
+        # matched by the proxy model only when it is shown as a parent
+        search = " ".join(
+            str(value)
+            for value in (
+                [
+                    record.get("title", None),
+                    record.get("description", None),
+                    uid,
+                ]
+                + tags
+                + owners
+            )
+            if value
+        ).lower()
+
+        self.connection.execute(
+            "INSERT INTO datasets "
+            "(uid, position, title, category, status, search, record) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                uid,
+                position,
+                record.get("title", None),
+                record.get("category", None),
+                status,
+                search,
+                pickle.dumps(record, pickle.HIGHEST_PROTOCOL),
+            ),
+        )
+        self.connection.executemany(
+            "INSERT INTO dataset_tags (uid, tag) VALUES (?, ?)",
+            ((uid, tag) for tag in tags),
+        )
+        self.connection.executemany(
+            "INSERT INTO dataset_owners (uid, owner) VALUES (?, ?)",
+            ((uid, owner) for owner in owners),
+        )
+
+        sources = list()
+        for protocol in ("wms", "wmts", "wfs"):
+            data = record.get(protocol, None)
+            if data is not None and data.get("url", None):
+                sources.append((uid, protocol, data["url"]))
+        for item in record.get("fileSources", None) or list():
+            if item.get("url", None):
+                sources.append((uid, "file", item["url"]))
+
+        self.connection.executemany(
+            "INSERT INTO dataset_sources (uid, protocol, url) VALUES (?, ?, ?)",
+            sources,
+        )
+
+    def insert_collection(self, position: int, record: dict):
+        """
+        Inserts collection record into the store.
+        """
+        uid = record["uid"]
+        self.connection.execute(
+            "INSERT INTO collections (uid, position, title, record) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                uid,
+                position,
+                record.get("title", None),
+                pickle.dumps(record, pickle.HIGHEST_PROTOCOL),
+            ),
+        )
+        self.connection.executemany(
+            "INSERT INTO collection_datasets "
+            "(collection_uid, dataset_uid, position) VALUES (?, ?, ?)",
+            (
+                (uid, dataset_uid, i)
+                for i, dataset_uid in enumerate(record["datasets"])
+            ),
+        )
+
+    def dataset_count(self) -> int:
+        """
+        Returns number of the stored datasets.
+        """
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM datasets"
+        ).fetchone()[0]
+
+    def dataset_records(self) -> Iterator[dict]:
+        """
+        Returns stored dataset records in the original order.
+        """
+        cursor = self.connection.execute(
+            "SELECT status, record FROM datasets ORDER BY position"
+        )
+        for status, data in cursor:
+            record = pickle.loads(data)
+            record["status"] = status
+            yield record
+
+    def collection_records(self) -> list[dict]:
+        """
+        Returns stored collection records in the original order.
+        """
+        cursor = self.connection.execute(
+            "SELECT record FROM collections ORDER BY position"
+        )
+        return [pickle.loads(data) for data, in cursor]
+
+    def update_status(self, status: dict):
+        """
+        Updates status of the stored datasets. Status is given as
+        a dictionary of dataset UIDs and their status.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE datasets SET status = ? WHERE uid = ?",
+                ((value, uid) for uid, value in status.items()),
+            )
+
+    def datasets_with_tag(self, tag: str) -> list[str]:
+        """
+        Returns UIDs of the datasets with the given tag.
+        """
+        return self.uids(
+            "SELECT uid FROM dataset_tags WHERE tag = ? ORDER BY uid", (tag,)
+        )
+
+    def datasets_of_owner(self, owner: str) -> list[str]:
+        """
+        Returns UIDs of the datasets owned by the given owner.
+        """
+        return self.uids(
+            "SELECT uid FROM dataset_owners WHERE owner = ? ORDER BY uid",
+            (owner,),
+        )
+
+    def datasets_with_url(self, url: str) -> list[str]:
+        """
+        Returns UIDs of the datasets which have a datasource with the given
+        URL.
+        """
+        return self.uids(
+            "SELECT DISTINCT uid FROM dataset_sources WHERE url = ? "
+            "ORDER BY uid",
+            (url,),
+        )
+
+    def datasets_in_category(self, category: str) -> list[str]:
+        """
+        Returns UIDs of the datasets in the given category.
+        """
+        return self.uids(
+            "SELECT uid FROM datasets WHERE category = ? ORDER BY uid",
+            (category,),
+        )
+
+    def datasets_with_status(self, status: str) -> list[str]:
+        """
+        Returns UIDs of the datasets with the given status.
+        """
+        return self.uids(
+            "SELECT uid FROM datasets WHERE status = ? ORDER BY uid",
+            (status,),
+        )
+
+    def collections_with_dataset(self, uid: str) -> list[str]:
+        """
+        Returns UIDs of the collections containing the given dataset.
+        """
+        return self.uids(
+            "SELECT collection_uid FROM collection_datasets "
+            "WHERE dataset_uid = ? ORDER BY collection_uid",
+            (uid,),
+        )
+
+    def search(self, text: str) -> list[str]:
+        """
+        Returns UIDs of the datasets matching every space separated part of
+        the text. Part matches if it is contained in the dataset title,
+        description, UID, tags or owners. Category is not matched, as it
+        depends on the grouping mode whether it is searched.
+        """
+        parts = text.lower().split()
+        if not parts:
+            return list()
+
+        # escape LIKE wildcards, so parts are matched literally
+        parts = [
+            "%{}%".format(
+                p.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            for p in parts
+        ]
+        condition = " AND ".join("search LIKE ? ESCAPE '\\'" for _ in parts)
+        return self.uids(
+            f"SELECT uid FROM datasets WHERE {condition} ORDER BY uid", parts
+        )
+
+    def uids(self, query: str, params: tuple) -> list[str]:
+        """
+        Executes query returning single column and returns its values.
+        """
+        return [row[0] for row in self.connection.execute(query, params)]
@@ -16,7 +16,6 @@ from __future__ import annotations
 from typing import Union
 from dataclasses import dataclass
 
-from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtCore import QUrl, QUrlQuery
 
 from qgis.core import QgsDataSourceUri, QgsRasterLayer, QgsVectorLayer
@@ -24,12 +23,18 @@ from qgis.core import QgsDataSourceUri, QgsRasterLayer, QgsVectorLayer
 from dmpcatalogue.core.settings_registry import SettingsRegistry
 
 
-@dataclass
+@dataclass(frozen=True)
 class Datasource:
     """
     Base class for all datasources.
+
+    Datasources, datasets and collections are immutable and use slots
+    instead of per-instance dictionaries to keep large catalogues compact,
+    dataclasses.replace() should be used to get a modified copy.
     """
 
+    __slots__ = ("url",)
+
     url: str
 
     def prepare_url(self) -> str:
@@ -81,12 +86,14 @@ class Datasource:
         raise NotImplementedError("Needs to be implemented by subclasses.")
 
 
-@dataclass
+@dataclass(frozen=True)
 class WmsSource(Datasource):
     """
     Represents a WMS datasource.
     """
 
+    __slots__ = ("layer", "style", "image_format")
+
     layer: str
     style: str
     image_format: str
@@ -104,12 +111,14 @@ class WmsSource(Datasource):
         return layer
 
 
-@dataclass
+@dataclass(frozen=True)
 class WmtsSource(WmsSource):
     """
     Represents a WMTS datasource.
     """
 
+    __slots__ = ("tile_matrix",)
+
     tile_matrix: str
 
     def to_layer(self, title: str) -> QgsRasterLayer:
@@ -140,12 +149,14 @@ class WmtsSource(WmsSource):
         return layer
 
 
-@dataclass
+@dataclass(frozen=True)
 class WfsSource(Datasource):
     """
     Represents a WFS datasource.
     """
 
+    __slots__ = ("typename",)
+
     typename: str
 
     def to_layer(self, title: str) -> QgsVectorLayer:
@@ -162,17 +173,51 @@ class WfsSource(Datasource):
         return layer
 
 
-@dataclass
+@dataclass(frozen=True)
 class FileSource(Datasource):
+    __slots__ = ("file_type",)
+
     file_type: str
 
 
-@dataclass
+@dataclass(frozen=True)
 class Dataset:
     """
-    Represents a dataset.
+    Represents a dataset. Icons are not stored in the dataset, they are
+    looked up in the data registry by the id of the thumbnail record,
+    so all datasets with the same thumbnail share one icon.
+
+    Datasources are kept as records with the datasource class arguments
+    and datasource objects are created when they are accessed for the
+    first time, as only few of them are used in a session. Whether dataset
+    has OWS or file sources is known without creating them.
     """
 
+    __slots__ = (
+        "uid",
+        "title",
+        "description",
+        "category",
+        "supportContact",
+        "metadata",
+        "created",
+        "updated",
+        "tags",
+        "owners",
+        "status",
+        "wms_record",
+        "wmts_record",
+        "wfs_record",
+        "file_records",
+        "has_ows",
+        "has_file_sources",
+        "thumbnail_record",
+        "category_thumbnail_record",
+        "_sources",
+    )
+
+    SOURCE_CLASSES = {"wms": WmsSource, "wmts": WmtsSource, "wfs": WfsSource}
+
     uid: str
     title: str
     description: str
@@ -181,15 +226,65 @@ class Dataset:
     metadata: str
     created: str
     updated: str
-    tags: list[str]
-    owners: list[str]
+    tags: Union[tuple[str, ...], None]
+    owners: Union[tuple[str, ...], None]
     status: str
-    thumbnail: QIcon
-    category_icon: QIcon
-    wms: WmsSource
-    wmts: WmtsSource
-    wfs: WfsSource
-    files: list[str]
+    wms_record: Union[tuple[str, str, str, str], None]
+    wmts_record: Union[tuple[str, str, str, str, str], None]
+    wfs_record: Union[tuple[str, str], None]
+    file_records: Union[tuple[tuple[str, str], ...], None]
+    has_ows: bool
+    has_file_sources: bool
+    thumbnail_record: Union[tuple[str, str], None]
+    category_thumbnail_record: Union[tuple[str, str], None]
+
+    @property
+    def wms(self) -> Union[WmsSource, None]:
+        return self.source("wms")
+
+    @property
+    def wmts(self) -> Union[WmtsSource, None]:
+        return self.source("wmts")
+
+    @property
+    def wfs(self) -> Union[WfsSource, None]:
+        return self.source("wfs")
+
+    @property
+    def files(self) -> Union[tuple[FileSource, ...], None]:
+        return self.source("files")
+
+    def source(
+        self, name: str
+    ) -> Union[Datasource, tuple[FileSource, ...], None]:
+        """
+        Returns datasource of the given protocol or file sources if name
+        is "files". Datasources are created from the records on the first
+        access and cached.
+        """
+        try:
+            sources = self._sources
+        except AttributeError:
+            sources = dict()
+            object.__setattr__(self, "_sources", sources)
+
+        if name not in sources:
+            if name == "files":
+                records = self.file_records
+                sources[name] = (
+                    None
+                    if records is None
+                    else tuple(FileSource(*r) for r in records)
+                )
+            else:
+                record = getattr(self, f"{name}_record")
+                sources[name] = (
+                    None
+                    if record is None
+                    else self.SOURCE_CLASSES[name](*record)
+                )
+
+        return sources[name]
 
     def layer(
         self, protocol: str = ""
@@ -235,23 +330,40 @@ class Dataset:
         """
         Returns True if dataset contains OWS sources.
         """
-        return any(getattr(self, p) is not None for p in ("wms", "wfs", "wmts"))
+        return self.has_ows
 
     def has_files(self) -> bool:
         """
         Returns True if dataset contains file sources.
         """
-        return self.files is not None and len(self.files) > 0
+        return self.has_file_sources
 
 
-@dataclass
+@dataclass(frozen=True)
 class Collection:
     """
-    Represents a collection.
+    Represents a collection. Like for datasets, icon is looked up in the
+    data registry by the id of the thumbnail record.
     """
 
+    __slots__ = ("uid", "title", "description", "datasets", "thumbnail_record")
+
     uid: str
     title: str
     description: str
-    datasets: list[str]
-    icon: QIcon
+    datasets: tuple[str, ...]
+    thumbnail_record: Union[tuple[str, str], None]
+
+
+@dataclass(frozen=True)
+class RecordError:
+    """
+    Describes a catalogue record which was skipped while parsing: kind of
+    the record, its id, if it is known, and the reason.
+    """
+
+    __slots__ = ("kind", "uid", "reason")
+
+    kind: str
+    uid: Union[str, None]
+    reason: str
@@ -11,49 +11,314 @@
 ***************************************************************************
 """
 
+from __future__ import annotations
+
+from typing import Callable, Iterator, TypeVar, Union
 import os
+import sys
 import json
+import pickle
+import threading
+import subprocess
+import multiprocessing.spawn
+import multiprocessing.context
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 from qgis.PyQt.QtCore import pyqtSignal
-from qgis.PyQt.QtGui import QIcon
-
 from qgis.core import QgsTask
 
-from dmpcatalogue.core.data_classes import Dataset, Collection
+from dmpcatalogue.core.catalogue_store import CatalogueStore
+from dmpcatalogue.core.data_classes import Dataset, Collection, RecordError
+from dmpcatalogue.core.metrics import METRICS
+from dmpcatalogue.core.records import (
+    RECORD_ERRORS,
+    ResourceResolver,
+    attribute,
+    record_error,
+    thumbnail_record,
+    dataset_record,
+    init_worker,
+    resolve_chunk,
+)
+from dmpcatalogue.core.symbols import SYMBOLS
+from dmpcatalogue.core.thumbnail_store import ThumbnailStore
 from dmpcatalogue.core.utils import (
     cache_directory,
+    cache_key,
+    load_snapshot,
+    save_snapshot,
+    iter_json,
     lookup_map,
-    flatten,
-    attribute,
-    ows_datasource,
-    file_datasource,
-    icon,
+    collection,
+    file_type,
 )
-from dmpcatalogue.constants import PLUGIN_ICON
+from dmpcatalogue.constants import (
+    THUMBNAIL_ICON_SIZE,
+    PARALLEL_PARSE_THRESHOLD,
+    PARSE_CHUNK_SIZE,
+    MAX_PARSE_WORKERS,
+)
+
+T = TypeVar("T")
 
 
 class DataParserTask(QgsTask):
     """
     Loads datasets from the cached server reply. Emits processed signal
     when finished. Loaded datasets can be accessed via datasets class member.
+
+    While parsing, datasets are also emitted in batches with the
+    datasetsProcessed signal, so they can be used before the whole
+    catalogue is processed.
+
+    Stored thumbnails are decoded and scaled to the icon size in the task,
+    decoded images can be accessed via images class member. Icons are
+    not created here, as pixmaps can be used only in the GUI thread.
+
+    Resolved content of the cached replies is stored in a binary snapshot,
+    keyed by the hash of the cache files, so unchanged replies do not need
+    to be parsed again on the next run. If catalogue store file is given,
+    SQLite catalogue store is used instead of the snapshot.
+
+    If parse_datasets is False, only collections are loaded, which is used
+    when collections are fetched after the datasets were already parsed.
+
+    If parallel is True, datasets of large catalogues are resolved into
+    plain records in worker processes, which do not use Qt. Datasets and
+    icons are still created in this task. If worker processes cannot be
+    used, datasets are resolved in the task.
+
+    If tolerant is True, every record is processed in isolation, malformed
+    datasets, collections and included resources are skipped, so a single
+    broken record does not fail the whole catalogue. Skipped records are
+    collected in the errors class member, together with empty collections,
+    which are skipped in both modes. Only valid records are stored in the
+    snapshot, so errors are reported only when the replies are parsed.
     """
 
-    processed = pyqtSignal()
+    BATCH_SIZE = 250
 
-    def __init__(self):
+    processed = pyqtSignal()
+    datasetsProcessed = pyqtSignal(list, dict)
+
+    def __init__(
+        self,
+        thumbnails: Union[ThumbnailStore, None] = None,
+        icon_size: int = THUMBNAIL_ICON_SIZE,
+        catalogue_store: Union[str, None] = None,
+        parse_datasets: bool = True,
+        parallel: bool = False,
+        tolerant: bool = False,
+    ):
         QgsTask.__init__(self)
 
+        self.catalogue_store = catalogue_store
+        self.parse_datasets = parse_datasets
+        self.parallel = parallel
+        self.tolerant = tolerant
+
+        self.thumbnails = ThumbnailStore() if thumbnails is None else thumbnails
+        self.icon_size = icon_size
+
         self.datasets = dict()
         self.collections = dict()
+        self.status_info = dict()
+        self.resolver = None
+        self.images = dict()
+        self.batch_images = dict()
+        self.errors = list()
+        self.from_snapshot = False
+        # interpreter running the worker processes and number of chunks
+        # resolved by them
+        self.executable = None
+        self.worker_chunks = 0
 
     def run(self):
+        if self.parse_datasets:
+            operation = "parse_datasets"
+        else:
+            operation = "parse_collections"
+
+        with METRICS.timer(operation):
+            return self.parse_catalogue()
+
+    def parse_catalogue(self) -> bool:
+        """
+        Parses cached catalogue, parsing time is recorded in the metrics.
+        """
         cache_root = cache_directory()
 
-        icon_cache = os.path.join(cache_root, "thumbnails")
-        os.makedirs(icon_cache, exist_ok=True)
+        if not self.parse_datasets:
+            collection_records = self.collection_records(cache_root)
+            if collection_records is None:
+                return False
+
+            return self.create_collections(collection_records, 0)
+
+        cache_files = [
+            os.path.join(cache_root, name)
+            for name in ("datasets.json", "collections.json")
+        ]
+        key = cache_key(cache_files)
+
+        store = None
+        if self.catalogue_store is not None:
+            store = CatalogueStore(self.catalogue_store)
+            try:
+                return self.parse(cache_root, key, store)
+            finally:
+                store.close()
+
+        return self.parse(cache_root, key)
+
+    def parse(
+        self,
+        cache_root: str,
+        key: str,
+        store: Union[CatalogueStore, None] = None,
+    ) -> bool:
+        """
+        Creates datasets and collections from the snapshot or catalogue
+        store if they were created from the same cache files, otherwise
+        parses cached server replies and updates snapshot or store.
+
+        Status of the datasets is polled more often than the catalogue
+        changes, so it is not part of the records and the key. It is applied
+        when datasets are created and written to the status column of the
+        catalogue store.
+        """
+        snapshot_file = os.path.join(cache_root, "catalogue.snapshot")
+        self.load_status(cache_root)
+
+        snapshot = None
+        if store is not None:
+            if store.key() == key:
+                snapshot = (store.dataset_records(), store.collection_records())
+                total = store.dataset_count()
+        else:
+            snapshot = load_snapshot(snapshot_file, key)
+            if snapshot is not None:
+                total = len(snapshot[0])
+
+        self.from_snapshot = snapshot is not None
+        METRICS.record_cache(
+            "catalogue_store" if store is not None else "snapshot",
+            self.from_snapshot,
+        )
+        if snapshot is not None:
+            dataset_records, collection_records = snapshot
+        else:
+            total = self.index_datasets(cache_root)
+            if total == 0:
+                return False
+
+            if self.parallel and total >= PARALLEL_PARSE_THRESHOLD:
+                dataset_records = self.parallel_records(cache_root)
+            else:
+                dataset_records = self.dataset_records(cache_root)
+
+        records = list()
+        status_changes = dict()
+        batch = list()
+        step = 90 / max(total, 1)
+        for i, record in enumerate(dataset_records):
+            if self.isCanceled():
+                return False
+
+            ds = self.isolate("dataset", record, self.create_dataset)
+            if ds is None:
+                continue
+
+            # only valid records are stored, so they do not fail again
+            records.append(record)
+            self.datasets[ds.uid] = ds
+            if record.get("status", None) != ds.status:
+                status_changes[ds.uid] = ds.status
+
+            batch.append(ds)
+            if len(batch) == self.BATCH_SIZE:
+                self.emit_batch(batch)
+                batch = list()
+
+            self.setProgress(i * step)
+
+        if batch:
+            self.emit_batch(batch)
+
+        if snapshot is None:
+            collection_records = self.collection_records(cache_root)
+            if collection_records is None:
+                return False
+
+            if store is not None:
+                store.update(key, records, collection_records)
+            else:
+                save_snapshot(snapshot_file, key, (records, collection_records))
+
+        if store is not None and status_changes:
+            store.update_status(status_changes)
+
+        return self.create_collections(collection_records, 90)
+
+    def create_collections(self, records: list[dict], progress: float) -> bool:
+        """
+        Creates collections from the collection records and emits processed
+        signal. Progress is reported starting from the given value.
+        """
+        step = (100 - progress) / max(len(records), 1)
+        for i, record in enumerate(records):
+            if self.isCanceled():
+                return False
+
+            col = self.isolate("collection", record, self.create_collection)
+            if col is not None:
+                self.collections[col.uid] = col
+
+            self.setProgress(progress + i * step)
+
+        self.processed.emit()
+        return True
 
-        # read and parse datasets status info
-        status_info = dict()
+    def isolate(
+        self, kind: str, item: dict, create: Callable[[dict], T]
+    ) -> Union[T, None]:
+        """
+        Returns result of the create function called with the resource or
+        record. In the tolerant mode errors caused by malformed items are
+        reported and None is returned, otherwise they are raised.
+        """
+        if not self.tolerant:
+            return create(item)
+
+        try:
+            return create(item)
+        except RECORD_ERRORS as e:
+            self.add_error(kind, *record_error(item, e))
+            return None
+
+    def add_error(self, kind: str, uid: Union[str, None], reason: str):
+        """
+        Adds record skipped while parsing to the errors.
+        """
+        self.errors.append(RecordError(kind, uid, reason))
+
+    def emit_batch(self, datasets: list[Dataset]):
+        """
+        Emits batch of datasets together with the thumbnail images decoded
+        since the previous batch.
+        """
+        self.datasetsProcessed.emit(datasets, self.batch_images)
+        self.batch_images = dict()
+
+    def load_status(self, cache_root: str):
+        """
+        Reads datasets status info from the cached status reply.
+        """
+        self.status_info = dict()
         cache_file = os.path.join(cache_root, "status.json")
         if os.path.exists(cache_file):
             with open(cache_file, "r", encoding="utf-8") as f:
@@ -61,124 +326,407 @@ class DataParserTask(QgsTask):
 
             # reply contains only status information, it is enough to have
             # only uid as a key
-            status_info = lookup_map(content["data"], True)
-
-        # read and parse datatsets metadata
+            self.status_info = lookup_map(content["data"], True)
+
+    def index_datasets(self, cache_root: str) -> int:
+        """
+        Indexes resources included in the cached datasets reply. Returns
+        total number of datasets in the cache.
+        """
+        # datasets cache is read incrementally, first all included resources
+        # are indexed, then datasets are processed one by one
         cache_file = os.path.join(cache_root, "datasets.json")
-        with open(cache_file, "r", encoding="utf-8") as f:
-            content = json.load(f)
 
-        meta = content.get("meta", None)
+        meta = None
+        self.resolver = ResourceResolver()
+        for key, value in iter_json(cache_file, {"meta", "included"}):
+            if key == "meta":
+                meta = value
+            else:
+                self.isolate("resource", value, self.resolver.add)
+
         if meta is None:
-            return False
+            return 0
 
-        if meta["total"] == 0:
-            return False
+        return meta["total"]
 
-        lookup_table = lookup_map(content["included"], simplify=True)
+    def dataset_records(self, cache_root: str) -> Iterator[dict]:
+        """
+        Reads datasets from the cached server reply and resolves them into
+        plain records, which can be stored in the snapshot. Should be called
+        after index_datasets().
+        """
+        cache_file = os.path.join(cache_root, "datasets.json")
+        for _, item in iter_json(cache_file, {"data"}):
+            record = self.dataset_record(item)
+            if record is not None:
+                yield record
+
+    def dataset_record(self, item: dict) -> Union[dict, None]:
+        """
+        Resolves dataset resource into a plain record. Returns None if the
+        resource is malformed and skipped in the tolerant mode.
+        """
+        return self.isolate(
+            "dataset",
+            item,
+            lambda i: dataset_record(i, self.resolver),
+        )
+
+    def parallel_records(self, cache_root: str) -> Iterator[dict]:
+        """
+        Reads datasets from the cached server reply and resolves them into
+        plain records in worker processes. Datasets are sent to the workers
+        in chunks and records are yielded in the order of the reply. Falls
+        back to dataset_records() if worker processes cannot be started.
+        Should be called after index_datasets().
+        """
+        workers = parse_workers()
+        executor = self.create_executor(workers)
+        if executor is None:
+            yield from self.dataset_records(cache_root)
+            return
 
-        flatten(content["data"], lookup_table)
+        cache_file = os.path.join(cache_root, "datasets.json")
+        pending = deque()
+        try:
+            chunk = list()
+            for _, item in iter_json(cache_file, {"data"}):
+                chunk.append(item)
+                if len(chunk) < PARSE_CHUNK_SIZE:
+                    continue
+
+                pending.append((chunk, self.submit(executor, chunk)))
+                chunk = list()
+                # limit number of chunks waiting for the workers, so the
+                # whole catalogue is not kept in memory twice
+                if len(pending) > 2 * workers:
+                    yield from self.chunk_records(*pending.popleft())
+
+            if chunk:
+                pending.append((chunk, self.submit(executor, chunk)))
+
+            while pending:
+                yield from self.chunk_records(*pending.popleft())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def create_executor(self, workers: int) -> Union[ProcessPoolExecutor, None]:
+        """
+        Returns pool of the given number of worker processes initialized
+        with the indexed resources or None if worker processes cannot be
+        used.
+        """
+        self.executable = python_executable()
+        if workers < 1 or self.executable is None:
+            return None
+
+        # processes are spawned to avoid copying state of the QGIS process
+        context = ExecutableContext(self.executable)
+
+        included = [
+            item
+            for resources in self.resolver.index.values()
+            for item in resources.values()
+        ]
+        try:
+            return ProcessPoolExecutor(
+                workers,
+                context,
+                initializer=init_worker,
+                initargs=(included,),
+            )
+        except (OSError, ValueError):
+            return None
+
+    def submit(
+        self, executor: ProcessPoolExecutor, chunk: list[dict]
+    ) -> Union[Future, None]:
+        """
+        Submits chunk of datasets to the worker processes. Returns None if
+        workers failed.
+        """
+        try:
+            return executor.submit(resolve_chunk, chunk, self.tolerant)
+        except (BrokenProcessPool, RuntimeError, OSError):
+            return None
+
+    def chunk_records(
+        self, chunk: list[dict], future: Union[Future, None]
+    ) -> list[dict]:
+        """
+        Returns records resolved by the worker processes and reports
+        resources skipped by them. If workers failed, chunk is resolved in
+        the task.
+        """
+        if future is not None:
+            try:
+                records, errors = future.result()
+            except (BrokenProcessPool, OSError, pickle.PicklingError):
+                pass
+            else:
+                for uid, reason in errors:
+                    self.add_error("dataset", uid, reason)
+                self.worker_chunks += 1
+                return records
+
+        records = (self.dataset_record(item) for item in chunk)
+        return [record for record in records if record is not None]
+
+    def collection_records(self, cache_root: str) -> Union[list[dict], None]:
+        """
+        Reads collections from the cached server reply and resolves them
+        into plain records. Returns None if task was canceled. If collections
+        were not fetched yet, returns empty list.
+        """
+        cache_file = os.path.join(cache_root, "collections.json")
+        if not os.path.exists(cache_file):
+            return list()
 
-        step = 90 / len(content["data"])
-        for i, item in enumerate(content["data"]):
+        with open(cache_file, "r", encoding="utf-8") as f:
+            content = json.load(f)
+
+        lookup_table = lookup_map(content["included"], include_resources=True)
+
+        collections = list()
+        for item in content["data"]:
             if self.isCanceled():
-                return False
+                return None
+
+            params = self.isolate(
+                "collection",
+                item,
+                lambda i: self.collection_record(i, lookup_table),
+            )
+            if params is None:
+                continue
 
-            uid = item["id"]
-            attributes = item["attributes"].copy()
-
-            # create datasources
-            for dtype, keys in (
-                ("wfsSource", ["typeName"]),
-                ("wmsSource", ["layer", "style", "format"]),
-                ("wmtsSource", ["layer", "style", "format", "matrixSet"]),
-            ):
-                data = attributes.pop(dtype, None)
-                protocol = dtype[:-6].lower()
-                attributes[protocol] = ows_datasource(protocol, data, keys)
-
-            # process fileSources attribute
-            data = attributes.pop("fileSources", None)
-            attributes["files"] = file_datasource(data)
-
-            data = attributes.pop("category", None).copy()
-            attributes["category"] = attribute(data, "name")
-            attributes["category_icon"] = PLUGIN_ICON
-            if data is not None:
-                t = data.pop("thumbnail", None)
-                if t is not None:
-                    thumb = t.copy()
-                    tid = attribute(thumb, "id")
-                    url = attribute(thumb, "url")
-                    if tid is not None:
-                        icon_file = os.path.join(icon_cache, tid)
-                        attributes["category_icon"] = icon(icon_file, url)
-
-            data = attributes.pop("thumbnail", None)
-            attributes["thumbnail"] = QIcon(attributes["category_icon"])
+            # empty collections are not shown, but they are reported, as
+            # they are usually broken on the server
+            if params["datasets"] is None:
+                self.add_error("collection", params["uid"], "no datasets")
+                continue
+
+            collections.append(params)
+
+        return collections
+
+    def collection_record(self, item: dict, lookup_table: dict) -> dict:
+        """
+        Resolves collection resource into a plain record.
+        """
+        attrs = collection(item, lookup_table)
+
+        params = dict()
+        params["uid"] = item["id"]
+        params["title"] = attrs["title"]
+        params["description"] = attrs["description"]
+        params["datasets"] = attrs["datasets"]
+        params["thumbnail"] = thumbnail_record(attrs["thumbnail"])
+
+        return params
+
+    def create_dataset(self, record: dict) -> Dataset:
+        """
+        Creates a dataset from the plain record.
+        """
+        attributes = record.copy()
+        intern = SYMBOLS.intern
+
+        # datasources are created by the dataset when they are used, only
+        # their arguments are stored
+        has_ows = False
+        for protocol, keys in (
+            ("wfs", ("url", "typeName")),
+            ("wms", ("url", "layer", "style", "format")),
+            ("wmts", ("url", "layer", "style", "format", "matrixSet")),
+        ):
+            data = attributes.pop(protocol)
             if data is not None:
-                tid = attribute(data, "id")
-                url = attribute(data, "url")
-                if tid is not None:
-                    icon_file = os.path.join(icon_cache, tid)
-                    attributes["thumbnail"] = icon(icon_file, url)
-
-            # extract necessary information from the complex attributes
-            for key, field in (
-                ("tags", "name"),
-                ("owners", "title"),
-            ):
-                data = attributes.pop(key, None)
-                attributes[key] = attribute(data, field)
-
-            # inject status info
-            status = attribute(status_info.get(uid, None), "status")
-            attributes["status"] = status
-
-            ds = Dataset(uid, **attributes)
-            self.datasets[uid] = ds
+                # layer names are mostly unique, URLs, styles, formats and
+                # tile matrix sets repeat across datasets
+                data = tuple(
+                    (
+                        data.get(k, "")
+                        if k in ("layer", "typeName")
+                        else intern(data.get(k, ""))
+                    )
+                    for k in keys
+                )
+                has_ows = True
+            attributes[f"{protocol}_record"] = data
+        attributes["has_ows"] = has_ows
+
+        data = attributes.pop("fileSources", None)
+        if data is not None:
+            data = tuple(
+                (item.get("url", None), intern(file_type(item)))
+                for item in data
+            )
+        attributes["file_records"] = data
+        attributes["has_file_sources"] = bool(data)
+
+        # status is not stored in the records, so the snapshot does not
+        # depend on it, the current status is applied instead
+        attributes["status"] = attribute(
+            self.status_info.get(attributes["uid"], None), "status"
+        )
+
+        # repeated values share a single string object, datasets are
+        # immutable, so lists are stored as more compact tuples
+        for key in ("category", "supportContact", "status"):
+            attributes[key] = intern(attributes[key])
+        for key in ("tags", "owners"):
+            attributes[key] = SYMBOLS.intern_all(attributes[key])
+
+        # icons are looked up by the data registry using thumbnail ids,
+        # thumbnails which are not stored yet are downloaded later
+        attributes["category_thumbnail_record"] = attributes.pop(
+            "category_thumbnail"
+        )
+        attributes["thumbnail_record"] = attributes.pop("thumbnail")
+
+        self.decode(attributes["category_thumbnail_record"])
+        self.decode(attributes["thumbnail_record"])
+
+        return Dataset(**attributes)
+
+    def create_collection(self, record: dict) -> Collection:
+        """
+        Creates a collection from the plain record.
+        """
+        params = record.copy()
+
+        params["thumbnail_record"] = params.pop("thumbnail")
+        params["datasets"] = tuple(params["datasets"])
+
+        self.decode(params["thumbnail_record"])
+
+        return Collection(**params)
+
+    def decode(self, thumbnail: Union[tuple[str, str], None]):
+        """
+        Decodes stored thumbnail image scaled to the icon size. Every
+        thumbnail is decoded only once, even if it is used by several
+        datasets and collections.
+        """
+        if thumbnail is None:
+            return
+
+        tid = thumbnail[0]
+        if tid not in self.images:
+            image = self.thumbnails.image(tid, self.icon_size)
+            self.images[tid] = image
+            if image is not None:
+                self.batch_images[tid] = image
+
+
+def python_executable() -> Union[str, None]:
+    """
+    Returns path of the Python interpreter which can run worker processes
+    or None if it cannot be found. Workers exchange pickled records with
+    the task, so only the running interpreter or the interpreter bundled
+    with it, which has the same version, can be used. Interpreters found
+    elsewhere on the system are never used.
+    """
+    if os.path.basename(sys.executable).lower().startswith(
+        "python"
+    ) and os.path.isfile(sys.executable):
+        return sys.executable
+
+    # sys.executable of the embedded interpreter can be QGIS itself
+    name = "python.exe" if sys.platform == "win32" else "python3"
+    for path in (
+        os.path.join(sys.exec_prefix, name),
+        os.path.join(sys.exec_prefix, "bin", name),
+    ):
+        if os.path.isfile(path) and python_version(path) == tuple(
+            sys.version_info[:2]
+        ):
+            return path
+
+    return None
+
+
+@lru_cache(maxsize=None)
+def python_version(path: str) -> Union[tuple[int, int], None]:
+    """
+    Returns major and minor version of the Python interpreter or None if
+    it cannot be run.
+    """
+    try:
+        result = subprocess.run(
+            [path, "-c", "import sys; print(*sys.version_info[:2])"],
+            capture_output=True,
+            text=True,
+            timeout=30,
+            check=True,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+        major, minor = result.stdout.split()
+        return int(major), int(minor)
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+
+SPAWN_LOCK = threading.Lock()
+
+
+@contextmanager
+def spawn_executable(executable: str) -> Iterator[None]:
+    """
+    Spawns processes started in the enclosed block with the executable.
+    The executable is set for the whole process by multiprocessing, so
+    the previous executable is restored when the block ends.
+    """
+    with SPAWN_LOCK:
+        previous = multiprocessing.spawn.get_executable()
+        if os.fsdecode(previous) == executable:
+            yield
+            return
 
-            self.setProgress(i * step)
+        multiprocessing.spawn.set_executable(executable)
+        try:
+            yield
+        finally:
+            multiprocessing.spawn.set_executable(previous)
 
-        # read and parse collections metadata
-        cache_file = os.path.join(cache_root, "collections.json")
-        with open(cache_file, "r", encoding="utf-8") as f:
-            content = json.load(f)
 
-        lookup_table = lookup_map(content["included"], simplify=True)
-        flatten(content["data"], lookup_table)
+class ExecutableProcess(multiprocessing.context.SpawnProcess):
+    """
+    Process spawned with the executable of its context. The executable is
+    changed only while the process is being launched, instead of for the
+    whole lifetime of the pool.
+    """
 
-        step = 10 / len(content["data"])
-        for i, item in enumerate(content["data"]):
-            if self.isCanceled():
-                return False
+    executable = None
 
-            uid = item["id"]
-            params = dict()
+    @staticmethod
+    def _Popen(process_obj):
+        with spawn_executable(process_obj.executable):
+            return multiprocessing.context.SpawnProcess._Popen(process_obj)
 
-            attrs = item["attributes"]
-            params["title"] = attrs["title"]
-            params["description"] = attrs["description"]
 
-            params["datasets"] = list()
-            d = attrs["datasetCollectionItems"]
-            if d is None:
-                continue
+class ExecutableContext(multiprocessing.context.SpawnContext):
+    """
+    Spawn context owned by the parser task, which starts processes with
+    the given executable without changing the executable used by other
+    users of multiprocessing.
+    """
 
-            for item in d:
-                params["datasets"].append(item["dataset"]["id"])
+    def __init__(self, executable: str):
+        super().__init__()
+        self.executable = executable
 
-            params["icon"] = None
-            t = attrs.get("thumbnail")
-            if t is not None:
-                tid = t["id"]
-                url = t["url"]
-                if tid is not None:
-                    icon_file = os.path.join(icon_cache, tid)
-                    params["icon"] = icon(icon_file, url)
+    def Process(self, *args, **kwargs) -> ExecutableProcess:
+        process = ExecutableProcess(*args, **kwargs)
+        process.executable = self.executable
+        return process
 
-            self.collections[uid] = Collection(uid, **params)
-            self.setProgress(self.progress() + i * step)
 
-        self.processed.emit()
-        return True
+def parse_workers() -> int:
+    """
+    Returns number of worker processes used to parse large catalogues,
+    leaving one processor to QGIS.
+    """
+    return min((os.cpu_count() or 1) - 1, MAX_PARSE_WORKERS)
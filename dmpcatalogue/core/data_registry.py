@@ -13,19 +13,55 @@
 
 from __future__ import annotations
 
+from typing import Callable, Iterable, Union
 import os
+import json
+from dataclasses import replace
 from functools import partial
 
-from qgis.PyQt.QtCore import pyqtSignal, QObject, QUrl
-from qgis.PyQt.QtNetwork import QNetworkReply
+from qgis.PyQt.QtCore import pyqtSignal, QObject, QTimer, QUrl
+from qgis.PyQt.QtGui import QIcon
+from qgis.PyQt.QtNetwork import QNetworkReply, QNetworkRequest
 
-from qgis.core import QgsApplication, QgsNetworkContentFetcherTask, QgsTask
+from qgis.core import QgsApplication, QgsNetworkContentFetcherTask
 
+from dmpcatalogue.core.catalogue_store import CatalogueStore
+from dmpcatalogue.core.data_classes import Dataset, Collection
 from dmpcatalogue.core.data_parser_task import DataParserTask
+from dmpcatalogue.core.delta_sync import (
+    changed_records,
+    file_versions,
+    merge_files,
+    record_versions,
+)
+from dmpcatalogue.core.fetch_orchestrator import FetchOrchestrator
+from dmpcatalogue.core.metrics import METRICS
 from dmpcatalogue.core.file_downloader_task import FileDownloaderTask
+from dmpcatalogue.core.icon_registry import ICONS
+from dmpcatalogue.core.request_policy import ManagedRequest
+from dmpcatalogue.core.page_fetcher import (
+    PageFetcher,
+    join_pages,
+    remove_pages,
+)
 from dmpcatalogue.core.settings_registry import SettingsRegistry
-from dmpcatalogue.core.utils import cache_directory, file_exists
-from dmpcatalogue.constants import DEFAULT_LOCALE, LOCALES
+from dmpcatalogue.core.symbols import SYMBOLS
+from dmpcatalogue.core.thumbnail_fetcher import ThumbnailFetcher
+from dmpcatalogue.core.thumbnail_store import ThumbnailStore
+from dmpcatalogue.core.utils import (
+    attribute,
+    cache_directory,
+    file_exists,
+    lookup_map,
+    merge_changes,
+)
+from dmpcatalogue.constants import (
+    DEFAULT_LOCALE,
+    LOCALES,
+    MAX_STATUS_POLL_BACKOFF,
+    PLUGIN_ICON,
+    THUMBNAIL_ICON_SIZE,
+)
 
 
 class DataRegistry(QObject):
@@ -34,11 +70,20 @@ class DataRegistry(QObject):
     """
 
     initialized = pyqtSignal()
+    datasetsAdded = pyqtSignal(list)
+    datasetsRemoved = pyqtSignal(list)
+    datasetsChanged = pyqtSignal(list)
+    collectionsAdded = pyqtSignal(list)
+    collectionsRemoved = pyqtSignal(list)
+    collectionsChanged = pyqtSignal(list)
     dataFetched = pyqtSignal()
+    endpointFetched = pyqtSignal(str, float)
+    fetchProgress = pyqtSignal(int, int)
     requestFailed = pyqtSignal(str)
     favoritesChanged = pyqtSignal()
     fileDownloaded = pyqtSignal(str)
     downloadFailed = pyqtSignal(str)
+    recordsSkipped = pyqtSignal(list)
 
     def __init__(self):
         QObject.__init__(self)
@@ -47,6 +92,48 @@ class DataRegistry(QObject):
         self.collections = dict()
         self.favorites = SettingsRegistry.favorites()
         self.task_manager = QgsApplication.taskManager()
+        self.validators = dict()
+        self.cache_modified = False
+        self.revalidate_pending = False
+
+        # endpoints of the current fetch which were not fetched yet, and
+        # fetched endpoints whose replies were not applied yet
+        self.fetch_pending = set()
+        self.pending_updates = set()
+        self.parse_task = None
+        # catalogue records skipped by the last parse of the replies
+        self.parse_errors = list()
+
+        # optional persistent store of the parsed catalogue, it can be
+        # queried only when it contains the loaded catalogue
+        self.catalogue_store = None
+        self.catalogue_store_ready = False
+
+        # dataset status is polled in the background, polling interval
+        # grows while status does not change
+        self.status_request = None
+        self.status_backoff = 1
+        self.status_timer = QTimer(self)
+        self.status_timer.setSingleShot(True)
+        self.status_timer.timeout.connect(self.poll_status)
+
+        self.thumbnail_store = ThumbnailStore(
+            budget=SettingsRegistry.thumbnail_cache_size() * 1024 * 1024
+        )
+
+        # thumbnails are decoded in the background already scaled to the
+        # icon size, so icons only wrap ready-made pixmaps. Icons are shared
+        # through the icon registry, ids of the acquired ones are kept to
+        # release them when they are not used anymore
+        app = QgsApplication.instance()
+        self.pixel_ratio = 1 if app is None else app.devicePixelRatio()
+        self.icon_size = round(THUMBNAIL_ICON_SIZE * self.pixel_ratio)
+        self.icon_ids = set()
+
+        self.thumbnails = ThumbnailFetcher(
+            self.thumbnail_store, self, self.icon_size
+        )
+        self.thumbnails.thumbnailsFetched.connect(self.update_thumbnails)
 
         locale = QgsApplication.locale()
         self.locale = locale if locale in LOCALES else DEFAULT_LOCALE
@@ -58,115 +145,1058 @@ class DataRegistry(QObject):
         Starts data registry initialization. This includes loading data from
         the cache or fetching them from the server, as well as parsing and
         storing in the registry.
+
+        If stale-while-revalidate mode is enabled and the registry is empty,
+        cached data are published first and then revalidated against
+        the server in the background.
+        """
+        cache_root = cache_directory()
+        datasets_cache = os.path.join(cache_root, "datasets.json")
+        collections_cache = os.path.join(cache_root, "collections.json")
+
+        if (
+            not force_download
+            and not self.datasets
+            and SettingsRegistry.stale_while_revalidate()
+            and os.path.exists(datasets_cache)
+            and os.path.exists(collections_cache)
+        ):
+            # revalidation starts when cached data are loaded, so the cache
+            # files are not overwritten while they are being parsed
+            self.revalidate_pending = True
+            self.parse_data()
+            return
+
+        self.fetch(force_download)
+
+    def fetch(self, force_download=False):
         """
-        url = SettingsRegistry.catalog_url()
+        Fetches data from the server. If force_download is False and
+        datasets were cached today, only status of the datasets is fetched.
+
+        Cached replies are revalidated with conditional requests, so
+        unchanged endpoints are not downloaded again and, if nothing has
+        changed, already loaded data are not parsed again.
 
+        If delta sync is enabled and datasets were cached from the same
+        endpoint before, only changed datasets are downloaded and merged
+        into the cache.
+        """
         cache_root = cache_directory()
         status_cache = os.path.join(cache_root, "status.json")
         datasets_cache = os.path.join(cache_root, "datasets.json")
-        collections_cache = os.path.join(cache_root, "collections.json")
+
+        self.validators = self.load_validators()
+        self.cache_modified = False
 
         if file_exists(datasets_cache) and not force_download:
-            full_url = f"{url}/datasetAvailabilities?locale={self.locale}"
-            if SettingsRegistry.tracking_enabled():
-                full_url += "&orgname=Danmarks Miljøportal&componentname=DMPCatalogue&appname=QGIS&appurlname=http://qgis.org"
             # datasets cached, only fetch their status
-            task = QgsNetworkContentFetcherTask(QUrl(full_url))
-            reply_handler = partial(self.cache_response, task, status_cache)
-            task.fetched.connect(reply_handler)
-            task.errorOccurred.connect(self.report_error)
-        else:
-            # fetch datasets and their status
-            full_url = f"{url}/datasetAvailabilities?locale={self.locale}"
-            if SettingsRegistry.tracking_enabled():
-                full_url += "?orgname=Danmarks Miljøportal&componentname=DMPCatalogue&appname=QGIS&appurlname=http://qgis.org"
-
-            status_task = QgsNetworkContentFetcherTask(QUrl(full_url))
-            status_reply_handler = partial(
-                self.cache_response, status_task, status_cache, False
+            request = self.fetch_request(
+                self.api_url("datasetAvailabilities"), status_cache
             )
-            status_task.fetched.connect(status_reply_handler)
-            status_task.errorOccurred.connect(self.report_error)
+            reply_handler = partial(self.cache_response, request, status_cache)
+            request.finished.connect(reply_handler)
+            request.start()
+        elif self.can_sync():
+            self.sync()
+        else:
+            self.fetch_all()
 
-            full_url = (
-                f"{url}/datasetCollections?include="
-                "datasetCollectionItems,datasetCollectionItems.dataset,thumbnail"
-                f"&locale={self.locale}"
-            )
-            if SettingsRegistry.tracking_enabled():
-                full_url += "&orgname=Danmarks Miljøportal&componentname=DMPCatalogue&appname=QGIS&appurlname=http://qgis.org"
-            collections_task = QgsNetworkContentFetcherTask(QUrl(full_url))
-            collections_reply_handler = partial(
-                self.cache_response, collections_task, collections_cache, False
+    def fetch_all(self):
+        """
+        Fetches datasets, collections and status of the datasets from
+        the server concurrently.
+        """
+        self.fetch_pending = {"datasets", "collections", "status"}
+        self.pending_updates = set()
+
+        orchestrator = self.create_orchestrator()
+        self.add_catalogue_endpoints(orchestrator)
+        orchestrator.start()
+
+        self.fetch_datasets()
+
+    def fetch_datasets(self):
+        """
+        Fetches all datasets from the server in pages. Pages are joined into
+        the datasets cache when all of them are fetched and the catalogue
+        is parsed from the joined cache, pages are not parsed separately,
+        so the snapshot and catalogue store are keyed by a single file and
+        resources shared by several pages are resolved only once.
+        """
+        fetcher = self.page_fetcher(self.datasets_url, "datasets_pages")
+        fetcher.pageFetched.connect(self.fetchProgress)
+        fetcher.finished.connect(partial(self.pages_fetched, fetcher))
+        fetcher.start()
+
+    def page_fetcher(self, url: Callable[[str], str], name: str) -> PageFetcher:
+        """
+        Creates fetcher of the paged datasets endpoint. URL function gets
+        the page query, pages are cached in the cache subdirectory with
+        the given name.
+        """
+        return PageFetcher(
+            url,
+            self.fetch_task,
+            self.save_reply,
+            os.path.join(cache_directory(), name),
+            parent=self,
+        )
+
+    def pages_fetched(self, fetcher: PageFetcher, result: bool):
+        """
+        Joins fetched pages into the datasets cache if any of them has
+        changed and applies the datasets. If pages contain fewer datasets
+        than the server reported, cached datasets are kept.
+        """
+        fetcher.deleteLater()
+        self.endpoint_timed("datasets", fetcher.elapsed)
+
+        if not result:
+            self.requestFailed.emit(
+                self.tr("Network request failed: ") + fetcher.error
             )
-            collections_task.fetched.connect(collections_reply_handler)
-            collections_task.errorOccurred.connect(self.report_error)
-
-            full_url = (
-                f"{url}/datasets?include="
-                "wfsSource,wmsSource,wmtsSource,fileSources,"
-                "category,tags,owners,thumbnail,"
-                "fileSources.fileSourceType,category.thumbnail"
-                f"&locale={self.locale}"
+            self.use_cached_datasets()
+            self.endpoint_ready("datasets")
+            return
+
+        datasets_cache = os.path.join(cache_directory(), "datasets.json")
+        removed = remove_pages(fetcher.cache_dir, fetcher.pages)
+        if fetcher.modified or removed or not os.path.exists(datasets_cache):
+            count = join_pages(
+                fetcher.page_files(), datasets_cache, fetcher.total
             )
-            if SettingsRegistry.tracking_enabled():
-                full_url += "&orgname=Danmarks Miljøportal&componentname=DMPCatalogue&appname=QGIS&appurlname=http://qgis.org"
-            task = QgsNetworkContentFetcherTask(QUrl(full_url))
-            task_handler = partial(self.cache_response, task, datasets_cache)
-            task.fetched.connect(task_handler)
-            task.errorOccurred.connect(self.report_error)
-            task.addSubTask(
-                collections_task,
-                subTaskDependency=QgsTask.ParentDependsOnSubTask,
+            if fetcher.total is not None and count < fetcher.total:
+                self.requestFailed.emit(
+                    self.tr("Incomplete catalogue: {} of {} datasets").format(
+                        count, fetcher.total
+                    )
+                )
+                self.use_cached_datasets()
+                self.endpoint_ready("datasets")
+                return
+
+            self.pending_updates.add("datasets")
+        elif not self.datasets:
+            self.pending_updates.add("datasets")
+
+        self.store_sync_state()
+        self.endpoint_ready("datasets")
+
+    def create_orchestrator(self) -> FetchOrchestrator:
+        """
+        Creates orchestrator of the concurrent requests. Replies are handled
+        by endpoint_fetched() as they land.
+        """
+        orchestrator = FetchOrchestrator(self)
+        orchestrator.fetched.connect(self.endpoint_fetched)
+        orchestrator.endpointTimed.connect(self.endpoint_timed)
+        orchestrator.finished.connect(orchestrator.deleteLater)
+        return orchestrator
+
+    def add_catalogue_endpoints(self, orchestrator: FetchOrchestrator):
+        """
+        Adds tasks fetching dataset status and collections to the
+        orchestrator.
+        """
+        cache_root = cache_directory()
+
+        status_request = self.fetch_request(
+            self.api_url("datasetAvailabilities"),
+            os.path.join(cache_root, "status.json"),
+        )
+        orchestrator.add("status", status_request)
+
+        collections_request = self.fetch_request(
+            self.api_url(
+                "datasetCollections",
+                "include=datasetCollectionItems,"
+                "datasetCollectionItems.dataset,thumbnail",
+            ),
+            os.path.join(cache_root, "collections.json"),
+        )
+        orchestrator.add("collections", collections_request)
+
+    def endpoint_timed(self, endpoint: str, elapsed: float):
+        """
+        Records time it took to fetch the endpoint, including retries.
+        """
+        METRICS.record_timing(f"fetch_{endpoint}", elapsed)
+        self.endpointFetched.emit(endpoint, elapsed)
+
+    def endpoint_fetched(self, endpoint: str, request: ManagedRequest):
+        """
+        Caches reply of the endpoint and applies it as soon as possible.
+        """
+        cache_file = os.path.join(cache_directory(), f"{endpoint}.json")
+        if not self.has_error(request) and self.save_reply(
+            request.task, cache_file
+        ):
+            self.pending_updates.add(endpoint)
+
+        self.endpoint_ready(endpoint)
+
+    def use_cached_datasets(self):
+        """
+        Falls back to the last successfully fetched datasets if they could
+        not be fetched now and the registry does not contain any data yet.
+        """
+        datasets_cache = os.path.join(cache_directory(), "datasets.json")
+        if not self.datasets and os.path.exists(datasets_cache):
+            self.pending_updates.add("datasets")
+
+    def endpoint_ready(self, endpoint: str):
+        """
+        Marks endpoint as fetched and applies changed replies.
+        """
+        self.fetch_pending.discard(endpoint)
+        self.apply_updates()
+
+    def apply_updates(self):
+        """
+        Applies changed replies. Datasets are parsed as soon as they are
+        fetched, status and collections fetched after that are merged into
+        the loaded datasets. Nothing is applied while datasets are being
+        fetched or parsed, as parser reads all the cached replies.
+        """
+        if self.parse_task is not None or "datasets" in self.fetch_pending:
+            return
+
+        if "datasets" in self.pending_updates:
+            self.pending_updates.clear()
+            self.dataFetched.emit()
+            return
+
+        if not self.datasets:
+            return
+
+        cache_root = cache_directory()
+        if "status" in self.pending_updates:
+            self.pending_updates.discard("status")
+            changed = self.update_status(
+                os.path.join(cache_root, "status.json")
             )
-            task.addSubTask(
-                status_task, subTaskDependency=QgsTask.ParentDependsOnSubTask
+            if changed:
+                self.datasetsChanged.emit(changed)
+
+        if "collections" in self.pending_updates:
+            self.pending_updates.discard("collections")
+            self.parse_data(parse_datasets=False)
+
+    def datasets_url(self, query: str = "") -> str:
+        """
+        Returns URL of the datasets endpoint including all related resources
+        used by the plugin, with an optional query appended.
+        """
+        include = (
+            "include=wfsSource,wmsSource,wmtsSource,fileSources,"
+            "category,tags,owners,thumbnail,"
+            "fileSources.fileSourceType,category.thumbnail"
+        )
+        return self.api_url(
+            "datasets", f"{include}&{query}" if query else include
+        )
+
+    def can_sync(self) -> bool:
+        """
+        Checks whether cached datasets can be updated with delta sync. This
+        requires datasets to be cached from the same URL as the one which
+        would be used to fetch them now.
+        """
+        if not SettingsRegistry.delta_sync():
+            return False
+
+        cache_root = cache_directory()
+        if not os.path.exists(os.path.join(cache_root, "datasets.json")):
+            return False
+
+        try:
+            with open(
+                os.path.join(cache_root, "sync.json"), "r", encoding="utf-8"
+            ) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        return state.get("url", None) == self.datasets_url()
+
+    def store_sync_state(self):
+        """
+        Remembers URL the cached datasets were fetched from, so they can be
+        updated with delta sync later.
+        """
+        sync_file = os.path.join(cache_directory(), "sync.json")
+        with open(sync_file, "w", encoding="utf-8") as f:
+            json.dump({"url": self.datasets_url()}, f)
+
+    def sync(self):
+        """
+        Starts delta sync of the cached datasets. Lightweight list of the
+        dataset ids and their modification times is fetched first, it is
+        used to find datasets which were changed or deleted on the server.
+        The list is fetched in pages like the full catalogue, as the server
+        may paginate it. Status and collections are fetched at the same
+        time.
+        """
+        self.fetch_pending = {"datasets", "collections", "status"}
+        self.pending_updates = set()
+
+        orchestrator = self.create_orchestrator()
+        self.add_catalogue_endpoints(orchestrator)
+        orchestrator.start()
+
+        fetcher = self.page_fetcher(
+            lambda query: self.api_url(
+                "datasets", f"fields[datasets]=updated&{query}"
+            ),
+            "datasets_index_pages",
+        )
+        fetcher.finished.connect(partial(self.index_fetched, fetcher))
+        fetcher.start()
+
+    def join_fetched_pages(self, fetcher: PageFetcher, file_name: str) -> bool:
+        """
+        Joins pages downloaded by the fetcher into the file. Returns False
+        if pages contain fewer records than the server reported.
+        """
+        remove_pages(fetcher.cache_dir, fetcher.pages)
+        count = join_pages(fetcher.page_files(), file_name, fetcher.total)
+        return fetcher.total is None or count >= fetcher.total
+
+    def index_fetched(self, fetcher: PageFetcher, result: bool):
+        """
+        Compares fetched dataset ids and modification times with the cached
+        datasets and requests datasets which were added or updated. If the
+        list of datasets is incomplete or the cache can not be compared,
+        all datasets are fetched again, so datasets missing from the list
+        are not removed.
+        """
+        fetcher.deleteLater()
+        self.endpoint_timed("index", fetcher.elapsed)
+        if not result:
+            self.sync_failed(fetcher)
+            return
+
+        cache_file = os.path.join(cache_directory(), "datasets_index.json")
+        if not self.join_fetched_pages(fetcher, cache_file):
+            self.fetch_datasets()
+            return
+
+        datasets_cache = os.path.join(cache_directory(), "datasets.json")
+        try:
+            remote = file_versions(cache_file)
+            local = file_versions(datasets_cache)
+        except (OSError, ValueError, KeyError):
+            self.fetch_datasets()
+            return
+
+        changed, deleted = changed_records(local, remote)
+        if not changed:
+            self.merge_delta(dict(), list(remote), deleted)
+            return
+
+        # all changed datasets were updated since the oldest of them, if the
+        # server can not filter by the modification time, all datasets are
+        # returned and compared by their content
+        versions = [remote[uid] for uid in changed]
+        query = ""
+        if all(versions):
+            query = f"filter[updated][ge]={min(versions)}"
+
+        fetcher = self.page_fetcher(
+            lambda page: self.datasets_url(
+                f"{query}&{page}" if query else page
+            ),
+            "datasets_delta_pages",
+        )
+        fetcher.finished.connect(
+            partial(self.delta_fetched, fetcher, list(remote), changed, deleted)
+        )
+        fetcher.start()
+
+    def sync_failed(self, fetcher: PageFetcher):
+        """
+        Reports failed index or delta request. If the server rejected
+        the request, e.g. because it does not support the sparse fieldset
+        or the filter, all datasets are fetched instead. Otherwise cached
+        datasets are used until the next sync.
+        """
+        self.requestFailed.emit(
+            self.tr("Network request failed: ") + fetcher.error
+        )
+        if not fetcher.transient:
+            self.fetch_datasets()
+            return
+
+        self.use_cached_datasets()
+        self.endpoint_ready("datasets")
+
+    def delta_fetched(
+        self,
+        fetcher: PageFetcher,
+        ids: list[str],
+        changed: list[str],
+        deleted: list[str],
+        result: bool,
+    ):
+        """
+        Merges fetched datasets into the cache. If some of the changed
+        datasets are missing from the reply, all datasets are fetched again.
+        """
+        fetcher.deleteLater()
+        if not result:
+            self.sync_failed(fetcher)
+            return
+
+        cache_file = os.path.join(cache_directory(), "datasets_delta.json")
+        if not self.join_fetched_pages(fetcher, cache_file):
+            self.fetch_datasets()
+            return
+
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                delta = json.load(f)
+            os.remove(cache_file)
+        except (OSError, ValueError):
+            delta = None
+
+        if delta is None or not set(changed) <= set(record_versions(delta)):
+            self.fetch_datasets()
+            return
+
+        self.merge_delta(delta, ids, deleted)
+
+    def merge_delta(self, delta: dict, ids: list[str], deleted: list[str]):
+        """
+        Merges datasets from the delta document into the cached datasets and
+        removes deleted datasets, i.e. datasets not listed in ids. The cache
+        is only read if there is something to merge or remove. Datasets are
+        parsed again if the cache has changed or the registry does not
+        contain any data yet.
+        """
+        datasets_cache = os.path.join(cache_directory(), "datasets.json")
+        changed, removed = list(), 0
+        if delta.get("data", None) or deleted:
+            changed, removed = merge_files(
+                datasets_cache, delta, ids, datasets_cache
             )
 
-        self.task_manager.addTask(task)
+        if changed or removed:
+            self.pending_updates.add("datasets")
+
+            # validators of the full reply do not describe merged content
+            self.validators.pop(self.datasets_url(), None)
+        else:
+            os.utime(datasets_cache)
+
+        if not self.datasets:
+            self.pending_updates.add("datasets")
 
-    def has_error(self, task) -> bool:
+        self.endpoint_ready("datasets")
+
+    def api_url(self, endpoint: str, query: str = "") -> str:
         """
-        Checks whether network content fetcher task completed without
-        error. In case of error emits signal with the error details.
+        Returns full URL of the catalogue API endpoint with the given query,
+        current locale and tracking parameters appended.
         """
-        reply = task.reply()
-        if reply is not None:
-            if reply.error() != QNetworkReply.NetworkError.NoError:
-                self.requestFailed.emit(
-                    self.tr("Network request failed: ") + reply.errorString()
+        url = f"{SettingsRegistry.catalog_url()}/{endpoint}?"
+        if query:
+            url += f"{query}&"
+        url += f"locale={self.locale}"
+        if SettingsRegistry.tracking_enabled():
+            url += "&orgname=Danmarks Miljøportal&componentname=DMPCatalogue&appname=QGIS&appurlname=http://qgis.org"
+        return url
+
+    def fetch_task(
+        self, url: str, cache_file: str
+    ) -> QgsNetworkContentFetcherTask:
+        """
+        Creates a task fetching the given URL. Requested URL is stored in
+        the "url" property of the task.
+        """
+        task = QgsNetworkContentFetcherTask(self.request(url, cache_file))
+        task.setProperty("url", url)
+        return task
+
+    def fetch_request(self, url: str, cache_file: str) -> ManagedRequest:
+        """
+        Creates a request fetching the given URL which is retried on
+        transient errors and is not sent while the host is not responding.
+        """
+        return ManagedRequest(
+            url, partial(self.fetch_task, url, cache_file), parent=self
+        )
+
+    def request(self, url: str, cache_file: str) -> QNetworkRequest:
+        """
+        Creates a network request for the given URL. If the cache file exists
+        and validators from the previous reply are known, the request is made
+        conditional, so the server can answer with "304 Not Modified"
+        instead of sending the same content again.
+        """
+        request = QNetworkRequest(QUrl(url))
+        request.setAttribute(
+            QNetworkRequest.Attribute.CacheLoadControlAttribute,
+            QNetworkRequest.CacheLoadControl.AlwaysNetwork,
+        )
+        request.setAttribute(
+            QNetworkRequest.Attribute.CacheSaveControlAttribute, False
+        )
+
+        validators = self.validators.get(url, None)
+        if validators is not None and os.path.exists(cache_file):
+            etag = validators.get("etag", None)
+            if etag:
+                request.setRawHeader(b"If-None-Match", etag.encode("utf-8"))
+            last_modified = validators.get("last_modified", None)
+            if last_modified:
+                request.setRawHeader(
+                    b"If-Modified-Since", last_modified.encode("utf-8")
                 )
-                return True
+
+        return request
+
+    def has_error(self, request: ManagedRequest) -> bool:
+        """
+        Checks whether request completed without error. In case of error
+        emits signal with the error details.
+        """
+        if request.error is not None:
+            self.requestFailed.emit(
+                self.tr("Network request failed: ") + request.error
+            )
+            return True
 
         return False
 
-    def cache_response(self, task, cache_file: str, emit_signal: bool = True):
+    def cache_response(
+        self, request: ManagedRequest, cache_file: str, emit_signal: bool = True
+    ):
         """
         Caches server reply. If emit_signal is True, emit dataFetched when
         completed.
+
+        A "304 Not Modified" reply keeps the existing cache file. In this
+        case dataFetched is emitted only if some other cache has changed
+        or the registry does not contain any data yet. If the request
+        failed, data cached by the last successful request are used.
         """
-        if self.has_error(task):
+        request.deleteLater()
+        if self.has_error(request):
+            if emit_signal and not self.datasets:
+                self.dataFetched.emit()
             return
 
-        with open(cache_file, "w", encoding="utf-8") as f:
-            f.write(task.contentAsString())
+        self.save_reply(request.task, cache_file)
 
-        if emit_signal:
+        if emit_signal and (self.cache_modified or not self.datasets):
             self.dataFetched.emit()
 
-    def parse_data(self):
+    def save_reply(self, task, cache_file: str) -> bool:
+        """
+        Writes content of the server reply to the cache file. Returns False
+        if the server answered with "304 Not Modified" and the cache file
+        was kept.
+        """
+        reply = task.reply()
+        status = reply.attribute(
+            QNetworkRequest.Attribute.HttpStatusCodeAttribute
+        )
+        if status == 304 and os.path.exists(cache_file):
+            # cached content is still valid, mark it as fresh
+            os.utime(cache_file)
+            return False
+
+        # write reply in chunks to avoid keeping another copy of the
+        # whole content in memory
+        with open(cache_file, "wb") as f:
+            while True:
+                chunk = reply.read(1 << 16)
+                if not chunk:
+                    break
+                f.write(bytes(chunk))
+
+        self.store_validators(task.property("url"), reply)
+        self.cache_modified = True
+        return True
+
+    def load_validators(self) -> dict:
+        """
+        Loads HTTP cache validators (ETag and Last-Modified values) of the
+        cached server replies.
+        """
+        validators_file = os.path.join(cache_directory(), "validators.json")
+        if not os.path.exists(validators_file):
+            return dict()
+
+        try:
+            with open(validators_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return dict()
+
+    def store_validators(self, url: str, reply: QNetworkReply):
+        """
+        Stores HTTP cache validators from the server reply for the given URL.
+        """
+        validators = dict()
+        for header, key in (
+            (b"ETag", "etag"),
+            (b"Last-Modified", "last_modified"),
+        ):
+            if reply.hasRawHeader(header):
+                validators[key] = bytes(reply.rawHeader(header)).decode("utf-8")
+
+        if validators:
+            self.validators[url] = validators
+        else:
+            self.validators.pop(url, None)
+
+        validators_file = os.path.join(cache_directory(), "validators.json")
+        with open(validators_file, "w", encoding="utf-8") as f:
+            json.dump(self.validators, f)
+
+    def parse_data(self, parse_datasets: bool = True):
         """
-        Starts background task to parse data and populate registry.
+        Starts background task to parse data and populate registry. If
+        parse_datasets is False, only collections are parsed.
         """
-        task = DataParserTask()
+        store_file = None
+        if parse_datasets:
+            if SettingsRegistry.use_catalogue_store():
+                store_file = os.path.join(cache_directory(), "catalogue.sqlite")
+            self.catalogue_store_ready = False
+
+        task = DataParserTask(
+            self.thumbnail_store,
+            self.icon_size,
+            store_file,
+            parse_datasets,
+            SettingsRegistry.parallel_parsing(),
+            SettingsRegistry.tolerant_parsing(),
+        )
         handler = partial(self.load_data, task)
         task.processed.connect(handler)
+        task.datasetsProcessed.connect(self.add_datasets)
+        task.taskTerminated.connect(partial(self.parse_terminated, task))
+        self.parse_task = task
         self.task_manager.addTask(task)
 
+    def parse_terminated(self, task):
+        """
+        Applies replies fetched while the failed parser task was running.
+        """
+        if task is self.parse_task:
+            self.parse_task = None
+            self.apply_updates()
+
+        self.revalidate()
+
+    def add_datasets(self, datasets: list[Dataset], images: dict):
+        """
+        Adds datasets parsed so far to the registry, so they can be shown
+        before the whole catalogue is loaded. Only datasets which are not in
+        the registry yet are added, datasetsAdded signal is emitted with
+        their UIDs.
+        """
+        self.create_icons(images)
+
+        added = list()
+        for ds in datasets:
+            if ds.uid not in self.datasets:
+                self.datasets[ds.uid] = ds
+                added.append(ds.uid)
+
+        if added:
+            self.datasetsAdded.emit(added)
+
+        self.request_thumbnails(datasets)
+
     def load_data(self, task):
-        self.datasets = task.datasets
-        self.collections = task.collections
-        self.initialized.emit()
+        """
+        Updates registry with the parsed data. Only datasets and collections
+        which differ from the already loaded ones are replaced. For each
+        kind of change a signal with the UIDs of the affected datasets or
+        collections is emitted, followed by initialized signal if there were
+        any changes. Datasets which were already added while parsing are not
+        reported again. Icons which are no longer used are released. Time
+        spent merging the data is recorded in the metrics.
+        """
+        with METRICS.timer("load_data"):
+            self.create_icons(task.images)
+            self.update_parse_errors(task)
+
+            changes = (list(), list(), list())
+            if task.parse_datasets:
+                self.open_catalogue_store(task.catalogue_store)
+
+                added, removed, changed = merge_changes(
+                    self.datasets, task.datasets
+                )
+                if removed:
+                    self.datasetsRemoved.emit(removed)
+                if added:
+                    self.datasetsAdded.emit(added)
+                if changed:
+                    self.datasetsChanged.emit(changed)
+
+                changes = (added, removed, changed)
+
+            added, removed, changed = merge_changes(
+                self.collections, task.collections
+            )
+            if removed:
+                self.collectionsRemoved.emit(removed)
+            if added:
+                self.collectionsAdded.emit(added)
+            if changed:
+                self.collectionsChanged.emit(changed)
+
+            if any(changes) or any((added, removed, changed)):
+                self.initialized.emit()
+
+            # pixmaps of the thumbnails of removed datasets and collections
+            # are freed
+            self.release_icons()
+
+        self.request_thumbnails(
+            self.datasets.values(), self.collections.values()
+        )
+        self.thumbnail_store.save()
+        self.schedule_status_poll(True)
+
+        if task is self.parse_task:
+            self.parse_task = None
+            self.apply_updates()
+
+        self.revalidate()
+
+    def update_parse_errors(self, task):
+        """
+        Updates report of the catalogue records skipped by the parser task.
+        Report is kept when the task used the snapshot, which contains only
+        valid records. Emits recordsSkipped signal with the skipped records
+        if the report has changed.
+        """
+        if task.from_snapshot:
+            return
+
+        errors = task.errors
+        if not task.parse_datasets:
+            errors = [
+                e for e in self.parse_errors if e.kind != "collection"
+            ] + errors
+
+        if errors != self.parse_errors:
+            self.parse_errors = errors
+            if errors:
+                self.recordsSkipped.emit(errors)
+
+    def schedule_status_poll(self, reset: bool = False):
+        """
+        Schedules next poll of the dataset status. If reset is True,
+        polling interval is reset to the configured one.
+        """
+        if reset:
+            self.status_backoff = 1
+
+        interval = SettingsRegistry.status_poll_interval()
+        if interval <= 0 or not self.datasets:
+            self.status_timer.stop()
+            return
+
+        self.status_timer.start(interval * self.status_backoff * 60000)
+
+    def stop_status_poll(self):
+        """
+        Stops polling of the dataset status and cancels the running status
+        request, e.g. when the plugin is unloaded.
+        """
+        self.status_timer.stop()
+        if self.status_request is not None:
+            self.status_request.cancel()
+            self.status_request.deleteLater()
+            self.status_request = None
+
+    def poll_status(self):
+        """
+        Fetches dataset status from the server in the background.
+        """
+        if self.status_request is not None:
+            return
+
+        if not self.validators:
+            self.validators = self.load_validators()
+
+        cache_file = os.path.join(cache_directory(), "status.json")
+        request = self.fetch_request(
+            self.api_url("datasetAvailabilities"), cache_file
+        )
+        request.finished.connect(
+            partial(self.status_fetched, request, cache_file)
+        )
+        self.status_request = request
+        request.start()
+
+    def status_fetched(self, request: ManagedRequest, cache_file: str):
+        """
+        Applies polled dataset status and schedules the next poll. Polling
+        interval is doubled, up to a limit, every time status has not
+        changed. Failed polls are not reported, as they are repeated later.
+        """
+        self.status_request = None
+        request.deleteLater()
+
+        changed = list()
+        if request.error is None and self.save_reply(request.task, cache_file):
+            changed = self.update_status(cache_file)
+
+        if changed:
+            self.status_backoff = 1
+            self.datasetsChanged.emit(changed)
+        else:
+            self.status_backoff = min(
+                self.status_backoff * 2, MAX_STATUS_POLL_BACKOFF
+            )
+
+        self.schedule_status_poll()
+
+    def update_status(self, cache_file: str) -> list[str]:
+        """
+        Updates status of the datasets from the cached status reply. Returns
+        UIDs of the datasets whose status has changed.
+        """
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                content = json.load(f)
+            status_info = lookup_map(content["data"], True)
+        except (OSError, ValueError, KeyError):
+            return list()
+
+        changed = dict()
+        for uid, ds in self.datasets.items():
+            status = SYMBOLS.intern(
+                attribute(status_info.get(uid, None), "status")
+            )
+            if ds.status != status:
+                self.datasets[uid] = replace(ds, status=status)
+                changed[uid] = status
+
+        if changed and self.catalogue_store_ready:
+            self.catalogue_store.update_status(changed)
+
+        return list(changed)
+
+    def open_catalogue_store(self, file_name: Union[str, None]):
+        """
+        Opens catalogue store written by the parser task. If file_name is
+        None, catalogue store is not used.
+        """
+        if self.catalogue_store is not None:
+            if self.catalogue_store.file_name == file_name:
+                self.catalogue_store_ready = True
+                return
+
+            self.catalogue_store.close()
+            self.catalogue_store = None
+
+        if file_name is not None:
+            self.catalogue_store = CatalogueStore(file_name)
+            self.catalogue_store_ready = True
+
+    def datasets_with_tag(self, tag: str) -> list[str]:
+        """
+        Returns UIDs of the datasets with the given tag.
+        """
+        if self.catalogue_store_ready:
+            return self.catalogue_store.datasets_with_tag(tag)
+
+        # shared object is compared by identity first
+        tag = SYMBOLS.get(tag)
+        return sorted(
+            uid for uid, ds in self.datasets.items() if tag in (ds.tags or ())
+        )
+
+    def datasets_of_owner(self, owner: str) -> list[str]:
+        """
+        Returns UIDs of the datasets owned by the given owner.
+        """
+        if self.catalogue_store_ready:
+            return self.catalogue_store.datasets_of_owner(owner)
+
+        owner = SYMBOLS.get(owner)
+        return sorted(
+            uid
+            for uid, ds in self.datasets.items()
+            if owner in (ds.owners or ())
+        )
+
+    def datasets_with_url(self, url: str) -> list[str]:
+        """
+        Returns UIDs of the datasets which have a datasource with the given
+        URL.
+        """
+        if self.catalogue_store_ready:
+            return self.catalogue_store.datasets_with_url(url)
+
+        # datasource records start with the URL, so datasources do not
+        # have to be created
+        uids = list()
+        for uid, ds in self.datasets.items():
+            records = (ds.wms_record, ds.wmts_record, ds.wfs_record)
+            records += ds.file_records or ()
+            if any(r is not None and r[0] == url for r in records):
+                uids.append(uid)
+        return sorted(uids)
+
+    def search(self, text: str) -> Union[set[str], None]:
+        """
+        Returns UIDs of the datasets matching every space separated part of
+        the text, using indexed catalogue store. Returns None if catalogue
+        store is not available, in this case datasets should be matched
+        by the caller.
+        """
+        if not self.catalogue_store_ready:
+            return None
+
+        return set(self.catalogue_store.search(text))
+
+    def revalidate(self):
+        """
+        Fetches fresh data from the server if published data were loaded
+        from the cache and need to be revalidated.
+        """
+        if self.revalidate_pending:
+            self.revalidate_pending = False
+            self.fetch(True)
+
+    def request_thumbnails(
+        self,
+        datasets: Iterable[Dataset],
+        collections: Iterable[Collection] = (),
+    ):
+        """
+        Requests download of thumbnails which are used by the given datasets
+        and collections but are not cached yet.
+        """
+        for ds in datasets:
+            self.thumbnails.fetch(ds.category_thumbnail_record)
+            self.thumbnails.fetch(ds.thumbnail_record)
+
+        for col in collections:
+            self.thumbnails.fetch(col.thumbnail_record)
+
+    def thumbnail_icon(
+        self, thumbnail: Union[tuple[str, str], None]
+    ) -> Union[QIcon, None]:
+        """
+        Returns icon for the thumbnail record or None if the thumbnail
+        is not available yet.
+        """
+        if thumbnail is None:
+            return None
+
+        return ICONS.icon(thumbnail[0])
+
+    def dataset_icon(self, dataset: Dataset) -> QIcon:
+        """
+        Returns icon of the dataset. Datasets without thumbnail use category
+        icon.
+        """
+        icon = self.thumbnail_icon(dataset.thumbnail_record)
+        if icon is None:
+            icon = self.category_icon(dataset)
+
+        return icon
+
+    def category_icon(self, dataset: Dataset) -> QIcon:
+        """
+        Returns icon of the dataset category or plugin icon if category
+        has no thumbnail.
+        """
+        icon = self.thumbnail_icon(dataset.category_thumbnail_record)
+        if icon is None:
+            icon = PLUGIN_ICON
+
+        return icon
+
+    def collection_icon(self, collection: Collection) -> Union[QIcon, None]:
+        """
+        Returns icon of the collection or None if the collection has no
+        thumbnail.
+        """
+        return self.thumbnail_icon(collection.thumbnail_record)
+
+    def create_icons(self, images: dict):
+        """
+        Acquires icons of the thumbnail images decoded by the parser task
+        from the icon registry. Icons are shared by all datasets and
+        collections referencing the same thumbnail, existing icons are kept.
+        """
+        for tid, image in images.items():
+            if tid not in self.icon_ids:
+                self.icon_ids.add(tid)
+                ICONS.acquire(tid, image, self.pixel_ratio)
+
+    def release_icons(self, all_icons: bool = False):
+        """
+        Releases icons of the thumbnails which are not used by any dataset
+        or collection of the registry anymore, or all icons if all_icons is
+        True, so their pixmaps can be freed.
+        """
+        unused = self.icon_ids
+        if not all_icons:
+            used = set()
+            for ds in self.datasets.values():
+                for record in (
+                    ds.category_thumbnail_record,
+                    ds.thumbnail_record,
+                ):
+                    if record is not None:
+                        used.add(record[0])
+            for col in self.collections.values():
+                if col.thumbnail_record is not None:
+                    used.add(col.thumbnail_record[0])
+            unused = self.icon_ids - used
+
+        ICONS.release(unused)
+        self.icon_ids -= unused
+
+    def update_thumbnails(self, images: dict):
+        """
+        Creates icons from the downloaded thumbnails and notifies about
+        datasets and collections using them. Datasets without own thumbnail
+        also get the new category icon.
+        """
+        for tid, image in images.items():
+            if tid in self.icon_ids:
+                ICONS.set_image(tid, image, self.pixel_ratio)
+            else:
+                self.icon_ids.add(tid)
+                ICONS.acquire(tid, image, self.pixel_ratio)
+
+        changed = list()
+        for uid, ds in self.datasets.items():
+            if any(
+                record is not None and record[0] in images
+                for record in (
+                    ds.category_thumbnail_record,
+                    ds.thumbnail_record,
+                )
+            ):
+                changed.append(uid)
+
+        if changed:
+            self.datasetsChanged.emit(changed)
+
+        changed = [
+            uid
+            for uid, col in self.collections.items()
+            if col.thumbnail_record is not None
+            and col.thumbnail_record[0] in images
+        ]
+        if changed:
+            self.collectionsChanged.emit(changed)
 
     def add_or_remove_favorite(self, dataset_uid: str):
         """
@@ -197,8 +1227,5 @@ class DataRegistry(QObject):
         else:
             self.downloadFailed.emit("\n".join(errors))
 
-    def report_error(self, code, message):
-        self.requestFailed.emit(self.tr("Network request failed: ") + message)
-
 
 DATA_REGISTRY = DataRegistry()
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Union
+import os
+import json
+import hashlib
+
+from dmpcatalogue.core.utils import iter_json
+
+
+def record_versions(document: dict) -> dict[str, Union[str, None]]:
+    """
+    Returns dictionary of the record ids and their "updated" attribute
+    values from the JSON API document. Records are returned in the same
+    order as in the document.
+    """
+    return {
+        item["id"]: item.get("attributes", dict()).get("updated", None)
+        for item in document.get("data", list())
+    }
+
+
+def file_versions(file_name: str) -> dict[str, Union[str, None]]:
+    """
+    Returns the same versions as record_versions() for the JSON API
+    document stored in the file. Records are read one by one, so the whole
+    document is not loaded into memory.
+    """
+    return {
+        item["id"]: item.get("attributes", dict()).get("updated", None)
+        for _, item in iter_json(file_name, {"data"})
+    }
+
+
+def changed_records(
+    local: dict[str, Union[str, None]], remote: dict[str, Union[str, None]]
+) -> tuple[list[str], list[str]]:
+    """
+    Compares versions of the local and remote records. Returns ids of the
+    records which are new or were updated on the server, and ids of the
+    records which were deleted on the server.
+
+    Records without "updated" value are always reported as changed.
+    """
+    modified = [
+        uid
+        for uid, updated in remote.items()
+        if updated is None or local.get(uid, None) != updated
+    ]
+    deleted = [uid for uid in local if uid not in remote]
+    return modified, deleted
+
+
+def resource_index(document: dict) -> dict[tuple[str, str], dict]:
+    """
+    Returns dictionary of the resources included in the JSON API document,
+    keyed by the resource type and id.
+    """
+    return {
+        (item["type"], item["id"]): item
+        for item in document.get("included", list())
+    }
+
+
+def references(item: dict) -> list[tuple[str, str]]:
+    """
+    Returns type and id pairs of the resources referenced by the item.
+    """
+    result = list()
+    for relationship in item.get("relationships", dict()).values():
+        data = relationship.get("data", None)
+        if isinstance(data, dict):
+            data = [data]
+        for ref in data or list():
+            result.append((ref["type"], ref["id"]))
+    return result
+
+
+def walk(
+    refs: list[tuple[str, str]],
+    links: Callable[[tuple[str, str]], Union[list[tuple[str, str]], None]],
+    found: Union[dict, None] = None,
+) -> dict[tuple[str, str], None]:
+    """
+    Follows references to the included resources. Links returns references
+    of the resource or None if there is no such resource. Resources which
+    were found are added to the found dictionary, in the order they were
+    found, and the dictionary is returned.
+    """
+    found = dict() if found is None else found
+    stack = list(reversed(refs))
+    while stack:
+        key = stack.pop()
+        if key in found:
+            continue
+        linked = links(key)
+        if linked is None:
+            continue
+        found[key] = None
+        stack.extend(reversed(linked))
+    return found
+
+
+def reachable(
+    items: list[dict], index: dict[tuple[str, str], dict]
+) -> list[tuple[str, str]]:
+    """
+    Returns type and id pairs of the included resources referenced by
+    the items, directly or via other included resources, in the order they
+    were found.
+    """
+
+    def links(key: tuple[str, str]) -> Union[list[tuple[str, str]], None]:
+        item = index.get(key, None)
+        return None if item is None else references(item)
+
+    return list(
+        walk([ref for item in items for ref in references(item)], links)
+    )
+
+
+def record_hash(item: dict, index: dict[tuple[str, str], dict]) -> str:
+    """
+    Returns hash of the record content including all included resources
+    it references, so records can be compared even if the server does not
+    report their modification time.
+    """
+    content = [item] + [index[key] for key in reachable([item], index)]
+    data = json.dumps(content, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def merge_files(
+    local_file: str, delta: dict, ids: list[str], file_name: str
+) -> tuple[list[str], int]:
+    """
+    Merges records from the delta document into the local JSON API document
+    stored in the local file and writes the result to the file, which can
+    be the local file itself. The ids list contains all records currently
+    published by the server, records missing from it are removed. Delta
+    records replace local ones only if their content differs, merged
+    records follow the order of ids. Included resources no longer
+    referenced by any record are dropped.
+
+    The local document is read incrementally several times, only the
+    delta, local versions of the delta records and references between
+    the local resources are kept in memory. Returns ids of the records
+    which were added or replaced and number of the removed records. If
+    nothing has changed, the file is not written.
+    """
+    ids_set = set(ids)
+    records = {
+        item["id"]: item
+        for item in delta.get("data", list())
+        if item["id"] in ids_set
+    }
+    delta_index = resource_index(delta)
+
+    # local versions of the delta records and references between the local
+    # resources, without their content
+    current = dict()
+    local_ids = set()
+    local_order = list()
+    graph = dict()
+    meta = dict()
+    for key, item in iter_json(local_file, {"data", "included", "meta"}):
+        if key == "data":
+            local_ids.add(item["id"])
+            local_order.append(item["id"])
+            if item["id"] in records:
+                current[item["id"]] = item
+        elif key == "included":
+            graph[(item["type"], item["id"])] = references(item)
+        else:
+            meta = item
+
+    # only resources of the compared records are loaded
+    needed = walk(
+        [ref for item in current.values() for ref in references(item)],
+        graph.get,
+    )
+    local_index = dict()
+    if needed:
+        for _, item in iter_json(local_file, {"included"}):
+            key = (item["type"], item["id"])
+            if key in needed:
+                local_index[key] = item
+
+    changed = list()
+    for uid, item in records.items():
+        local = current.get(uid, None)
+        if local is not None and record_hash(local, local_index) == record_hash(
+            item, delta_index
+        ):
+            continue
+        changed.append(uid)
+    del current, local_index
+
+    # records kept in the same order can be copied while reading the file
+    in_order = [uid for uid in local_order if uid in ids_set] == [
+        uid for uid in ids if uid in local_ids
+    ]
+    del local_order
+
+    removed = len(local_ids - ids_set)
+    if not changed and not removed:
+        return changed, removed
+
+    # resources of the changed records replace the local ones
+    changed_set = set(changed)
+    replaced = reachable([records[uid] for uid in changed], delta_index)
+    replaced_set = set(replaced)
+
+    def links(key: tuple[str, str]) -> Union[list[tuple[str, str]], None]:
+        if key in replaced_set:
+            return references(delta_index[key])
+        return graph.get(key, None)
+
+    found = dict()
+    count = 0
+    with open(f"{file_name}.tmp", "w", encoding="utf-8") as f:
+        f.write('{"data": [')
+        local = (
+            item
+            for _, item in iter_json(local_file, {"data"})
+            if item["id"] in ids_set
+        )
+        if not in_order:
+            # server changed order of the records, local records have to be
+            # loaded to reorder them
+            kept = {item["id"]: item for item in local}
+            local = (kept[uid] for uid in ids if uid in kept)
+
+        for uid in ids:
+            if uid in local_ids:
+                item = next(local)
+            elif uid not in changed_set:
+                continue
+            if uid in changed_set:
+                item = records[uid]
+            f.write(", " if count else "")
+            f.write(json.dumps(item, ensure_ascii=False))
+            walk(references(item), links, found)
+            count += 1
+
+        f.write('], "included": [')
+        written = 0
+        for _, item in iter_json(local_file, {"included"}):
+            key = (item["type"], item["id"])
+            if key in found and key not in replaced_set:
+                f.write(", " if written else "")
+                f.write(json.dumps(item, ensure_ascii=False))
+                written += 1
+        for key in replaced:
+            if key in found:
+                f.write(", " if written else "")
+                f.write(json.dumps(delta_index[key], ensure_ascii=False))
+                written += 1
+
+        meta = {**(meta or dict()), "total": count}
+        f.write(f'], "meta": {json.dumps(meta, ensure_ascii=False)}}}')
+
+    os.replace(f"{file_name}.tmp", file_name)
+    return changed, removed
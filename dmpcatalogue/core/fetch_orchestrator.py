@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from __future__ import annotations
+
+import time
+from functools import partial
+
+from qgis.PyQt.QtCore import pyqtSignal, QObject
+
+from dmpcatalogue.core.request_policy import ManagedRequest
+
+
+class FetchOrchestrator(QObject):
+    """
+    Runs requests to several catalogue endpoints concurrently, as
+    independent tasks, so a reply can be processed as soon as it lands
+    instead of waiting for the slowest one.
+
+    Emits fetched signal with the endpoint name and the finished request
+    for every endpoint, including failed ones, followed by endpointTimed
+    signal with the endpoint name and the time in seconds it took to fetch
+    it, including retries. Emits finished signal once all endpoints were
+    fetched.
+    """
+
+    fetched = pyqtSignal(str, ManagedRequest)
+    endpointTimed = pyqtSignal(str, float)
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
+
+        self.requests = dict()
+        self.started = dict()
+        self.timings = dict()
+
+    def add(self, endpoint: str, request: ManagedRequest):
+        """
+        Adds request fetching the given endpoint. Requests are started by
+        start().
+        """
+        request.finished.connect(partial(self.request_finished, endpoint))
+        self.requests[endpoint] = request
+
+    def start(self):
+        """
+        Starts all added requests.
+        """
+        for endpoint in self.requests:
+            self.started[endpoint] = time.monotonic()
+        for request in list(self.requests.values()):
+            request.start()
+
+    def pending(self) -> list[str]:
+        """
+        Returns names of the endpoints which were not fetched yet.
+        """
+        return [e for e in self.requests if e not in self.timings]
+
+    def request_finished(self, endpoint: str):
+        """
+        Records time it took to fetch the endpoint and reports the reply.
+        """
+        if endpoint in self.timings:
+            return
+
+        self.timings[endpoint] = time.monotonic() - self.started[endpoint]
+        self.fetched.emit(endpoint, self.requests[endpoint])
+        self.endpointTimed.emit(endpoint, self.timings[endpoint])
+
+        if not self.pending():
+            self.finished.emit()
@@ -11,9 +11,16 @@
 ***************************************************************************
 """
 
-from qgis.PyQt.QtCore import pyqtSignal, QEventLoop, QUrl
+import os
+import time
 
-from qgis.core import QgsTask, QgsFileDownloader
+from qgis.PyQt.QtCore import pyqtSignal, QEventLoop, QTimer, QUrl
+from qgis.PyQt.QtNetwork import QNetworkReply, QNetworkRequest
+
+from qgis.core import QgsTask, QgsFileDownloader, QgsNetworkAccessManager
+
+from dmpcatalogue.core.metrics import METRICS
+from dmpcatalogue.core.request_policy import REQUEST_POLICY
 
 
 class FileDownloaderTask(QgsTask):
@@ -21,20 +28,93 @@ class FileDownloaderTask(QgsTask):
     Downloads a file from the given URL and saves it in the specified location.
     Emits downloaded signal when done. If download failed, errors will contain
     error message.
+
+    Failed download is repeated following the request policy if the error
+    is transient. File downloader does not report the kind of the error,
+    so it is taken from the last reply finished by the network access
+    manager of the task thread. Errors without a reply are treated as
+    transient.
     """
 
     downloaded = pyqtSignal()
 
-    def __init__(self, url, file_name):
+    def __init__(self, url, file_name, policy=None):
         super(FileDownloaderTask, self).__init__()
 
         self.url = url
         self.file_name = file_name
-        self.downloader = None
+        self.policy = REQUEST_POLICY if policy is None else policy
         self.errors = None
+        # network error and HTTP status of the last reply
+        self.reply_error = None
+        self.status = None
 
     def run(self):
+        attempt = 0
+        while not self.isCanceled():
+            if not self.policy.allow(self.url):
+                self.errors = [
+                    self.tr(
+                        "{} is not responding, download was postponed"
+                    ).format(self.policy.host(self.url))
+                ]
+                break
+
+            self.errors = None
+            self.download()
+            if self.isCanceled():
+                break
+
+            if self.errors is None:
+                self.policy.record_success(self.url)
+                break
+
+            # e.g. missing file or denied access will not change
+            if self.reply_error is not None and not self.policy.is_transient(
+                self.reply_error, self.status
+            ):
+                break
+
+            self.policy.record_failure(self.url)
+            if not self.policy.can_retry(attempt):
+                break
+
+            self.wait(self.policy.delay(attempt))
+            attempt += 1
+
+        if not self.isCanceled():
+            self.setProgress(100)
+
+        self.downloaded.emit()
+
+        return not self.isCanceled() and self.errors is None
+
+    def download(self):
+        """
+        Downloads the file once, errors are stored in the errors member.
+        Download is recorded in the metrics. Cancellation is checked by
+        the event loop of the task thread, so the downloader is only used
+        by the thread which created it.
+        """
         loop = QEventLoop()
+        started = time.time()
+        self.reply_error = None
+        self.status = None
+
+        # instance of the network access manager used by the task thread,
+        # the task itself lives in the main thread, so replies are handled
+        # by a function called directly in the task thread
+        manager = QgsNetworkAccessManager.instance()
+
+        def reply_finished(reply):
+            self.reply_error = reply.error()
+            if self.reply_error == QNetworkReply.NetworkError.NoError:
+                self.reply_error = None
+            self.status = reply.attribute(
+                QNetworkRequest.Attribute.HttpStatusCodeAttribute
+            )
+
+        manager.finished.connect(reply_finished)
 
         downloader = QgsFileDownloader(QUrl(self.url), self.file_name, "", True)
         downloader.downloadError.connect(
@@ -43,6 +123,13 @@ class FileDownloaderTask(QgsTask):
         downloader.downloadProgress.connect(self.update_progress)
         downloader.downloadExited.connect(loop.quit)
 
+        timer = QTimer()
+        timer.setInterval(100)
+        timer.timeout.connect(
+            lambda: downloader.cancelDownload() if self.isCanceled() else None
+        )
+        timer.start()
+
         downloader.startDownload()
 
         try:
@@ -50,18 +137,28 @@ class FileDownloaderTask(QgsTask):
         except AttributeError:
             loop.exec()
 
-        if not self.isCanceled():
-            self.setProgress(100)
-
-        self.downloaded.emit()
-
-        return not self.isCanceled() and self.errors is None
-
-    def cancel(self):
-        if self.downloader is not None:
-            self.downloader.cancelDownload()
+        timer.stop()
+        manager.finished.disconnect(reply_finished)
+
+        size = 0
+        if self.errors is None and os.path.exists(self.file_name):
+            size = os.path.getsize(self.file_name)
+        METRICS.record_request(
+            "downloads",
+            started,
+            time.time(),
+            size,
+            self.status,
+            None if self.errors is None else "; ".join(self.errors),
+        )
 
-        super(FileDownloaderTask, self).cancel()
+    def wait(self, delay):
+        """
+        Waits before the next attempt, returns early if the task is canceled.
+        """
+        end = time.monotonic() + delay
+        while not self.isCanceled() and time.monotonic() < end:
+            time.sleep(max(0, min(0.1, end - time.monotonic())))
 
     def error_occured(self, errors, loop):
         self.errors = errors
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Union
+
+from qgis.PyQt.QtGui import QIcon, QImage, QPixmap
+
+
+class IconRegistry:
+    """
+    Process-wide registry of the thumbnail icons keyed by thumbnail id.
+    Every thumbnail image is converted to a single pixmap wrapped in
+    a single icon, which is shared by all datasets, categories and
+    collections using the thumbnail, so they only need to keep the id.
+
+    Icons are reference counted. Every owner, e.g. a data registry,
+    acquires the icons it uses once and releases them when they are not
+    used anymore. Icon is removed together with its pixmap when the last
+    reference is released, so pixmaps of the thumbnails no longer shown in
+    the catalogue do not stay in the memory. Pixmaps can only be used in
+    the GUI thread, so the registry is not guarded by a lock.
+    """
+
+    def __init__(self):
+        self.icons = dict()
+        self.references = dict()
+
+    def __len__(self) -> int:
+        return len(self.icons)
+
+    def __contains__(self, tid: str) -> bool:
+        return tid in self.icons
+
+    def clear(self):
+        """
+        Removes all icons and references.
+        """
+        self.icons.clear()
+        self.references.clear()
+
+    def icon(self, tid: str) -> Union[QIcon, None]:
+        """
+        Returns icon of the thumbnail or None if there is no icon for it.
+        """
+        return self.icons.get(tid, None)
+
+    @staticmethod
+    def create_icon(image: QImage, pixel_ratio: float = 1) -> QIcon:
+        """
+        Creates an icon from the thumbnail image decoded for the given
+        device pixel ratio.
+        """
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(pixel_ratio)
+        return QIcon(pixmap)
+
+    def set_image(self, tid: str, image: QImage, pixel_ratio: float = 1):
+        """
+        Replaces icon of the thumbnail with the new image. The thumbnail
+        has to be acquired first, images of the thumbnails without
+        references are ignored.
+        """
+        if tid in self.references:
+            self.icons[tid] = self.create_icon(image, pixel_ratio)
+
+    def acquire(
+        self, tid: str, image: Union[QImage, None], pixel_ratio: float = 1
+    ) -> Union[QIcon, None]:
+        """
+        Adds reference to the thumbnail icon and returns the icon. The icon
+        is created from the image if there is no icon for the thumbnail
+        yet, existing icons are shared.
+        """
+        self.references[tid] = self.references.get(tid, 0) + 1
+        if tid not in self.icons and image is not None:
+            self.icons[tid] = self.create_icon(image, pixel_ratio)
+
+        return self.icons.get(tid, None)
+
+    def release(self, tids: Iterable[str]) -> int:
+        """
+        Removes references to the thumbnail icons. Returns number of icons
+        removed because they are not referenced anymore.
+        """
+        removed = 0
+        for tid in tids:
+            count = self.references.get(tid, 0) - 1
+            if count > 0:
+                self.references[tid] = count
+                continue
+
+            self.references.pop(tid, None)
+            if self.icons.pop(tid, None) is not None:
+                removed += 1
+
+        return removed
+
+
+ICONS = IconRegistry()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, Union
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from dmpcatalogue.constants import METRICS_HISTORY_SIZE
+
+
+class MetricsRegistry:
+    """
+    In-memory registry of the performance metrics, used to find out whether
+    the catalogue is slow because of the server, parsing or thumbnails.
+
+    Three kinds of metrics are collected:
+
+    - requests, per endpoint: number of requests and errors, received
+      bytes, durations, HTTP status codes and start and end times of the
+      last METRICS_HISTORY_SIZE requests
+    - cache lookups, per cache: number of hits and misses
+    - timings, per operation: number of runs and durations
+
+    Metrics are recorded from the worker threads as well, so all operations
+    are guarded by a lock.
+    """
+
+    def __init__(self, history: int = METRICS_HISTORY_SIZE):
+        self.history = history
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Removes all collected metrics.
+        """
+        with self.lock:
+            self.started = time.time()
+            self.requests = dict()
+            self.caches = dict()
+            self.timings = dict()
+
+    @staticmethod
+    def add_duration(entry: dict, elapsed: float):
+        """
+        Adds duration to the aggregated durations of the entry.
+        """
+        entry["count"] += 1
+        entry["total_time"] += elapsed
+        entry["min_time"] = min(entry["min_time"], elapsed)
+        entry["max_time"] = max(entry["max_time"], elapsed)
+
+    def record_request(
+        self,
+        endpoint: str,
+        started: float,
+        finished: float,
+        size: int = 0,
+        status: Union[int, None] = None,
+        error: Union[str, None] = None,
+    ):
+        """
+        Records a network request to the endpoint. Start and end times are
+        given as seconds since the epoch, size in bytes.
+        """
+        with self.lock:
+            entry = self.requests.get(endpoint, None)
+            if entry is None:
+                entry = {
+                    "count": 0,
+                    "errors": 0,
+                    "bytes": 0,
+                    "total_time": 0.0,
+                    "min_time": float("inf"),
+                    "max_time": 0.0,
+                    "statuses": dict(),
+                    "recent": deque(maxlen=self.history),
+                }
+                self.requests[endpoint] = entry
+
+            self.add_duration(entry, max(finished - started, 0.0))
+            entry["bytes"] += size
+            if error is not None:
+                entry["errors"] += 1
+            if status is not None:
+                key = str(status)
+                entry["statuses"][key] = entry["statuses"].get(key, 0) + 1
+            entry["recent"].append(
+                {
+                    "started": started,
+                    "finished": finished,
+                    "bytes": size,
+                    "status": status,
+                    "error": error,
+                }
+            )
+
+    def record_cache(self, cache: str, hit: bool):
+        """
+        Records a cache lookup.
+        """
+        with self.lock:
+            entry = self.caches.setdefault(cache, {"hits": 0, "misses": 0})
+            entry["hits" if hit else "misses"] += 1
+
+    def record_timing(self, operation: str, elapsed: float):
+        """
+        Records duration of the operation in seconds.
+        """
+        with self.lock:
+            entry = self.timings.get(operation, None)
+            if entry is None:
+                entry = {
+                    "count": 0,
+                    "total_time": 0.0,
+                    "min_time": float("inf"),
+                    "max_time": 0.0,
+                }
+                self.timings[operation] = entry
+
+            self.add_duration(entry, elapsed)
+
+    @contextmanager
+    def timer(self, operation: str) -> Iterator[None]:
+        """
+        Records duration of the enclosed block as the operation timing.
+        """
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record_timing(operation, time.monotonic() - started)
+
+    def snapshot(self) -> dict:
+        """
+        Returns copy of the collected metrics which can be serialized to
+        JSON. Average durations are added to the requests and timings.
+        """
+
+        def durations(entry: dict) -> dict:
+            result = dict(entry)
+            count = entry["count"]
+            result["avg_time"] = entry["total_time"] / count if count else 0
+            if not count:
+                result["min_time"] = 0.0
+            return result
+
+        with self.lock:
+            requests = dict()
+            for endpoint, entry in self.requests.items():
+                requests[endpoint] = durations(entry)
+                requests[endpoint]["statuses"] = dict(entry["statuses"])
+                requests[endpoint]["recent"] = list(entry["recent"])
+
+            return {
+                "started": self.started,
+                "exported": time.time(),
+                "requests": requests,
+                "caches": {k: dict(v) for k, v in self.caches.items()},
+                "timings": {k: durations(v) for k, v in self.timings.items()},
+            }
+
+    def to_json(self) -> str:
+        """
+        Returns collected metrics as JSON document.
+        """
+        return json.dumps(self.snapshot(), indent=2)
+
+    def export(self, file_name: str):
+        """
+        Writes collected metrics to the JSON file.
+        """
+        with open(file_name, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+
+METRICS = MetricsRegistry()
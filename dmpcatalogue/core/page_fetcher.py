@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Union
+import os
+import math
+import json
+import time
+from functools import partial
+
+from qgis.PyQt.QtCore import pyqtSignal, QObject
+
+from qgis.core import QgsNetworkContentFetcherTask
+
+from dmpcatalogue.core.request_policy import ManagedRequest, RequestPolicy
+from dmpcatalogue.constants import DATASETS_PAGE_SIZE, MAX_PAGE_REQUESTS
+
+
+class PageFetcher(QObject):
+    """
+    Downloads JSON API collection in pages, using page[number] and
+    page[size] query parameters. Every page is cached in its own file, so
+    memory usage does not grow with the size of the collection and a failed
+    page can be requested again without restarting the whole download.
+
+    Total number of pages is taken from the "total" value of the first
+    page meta information. If the first page has fewer records than
+    requested, but not the whole collection, the server caps the page size
+    and the number of records of the first page is used as the page size.
+    If total is not available, pages are requested one after another until
+    a page which is not full is returned. If the server ignores pagination
+    and returns whole collection in the first page, no other pages are
+    requested.
+
+    At most MAX_PAGE_REQUESTS pages are downloaded at once, a failed page
+    is retried following the request policy. Emits pageFetched signal with
+    the number of fetched pages and total number of pages after every page,
+    and finished signal with the result when all pages are fetched or
+    download failed.
+    """
+
+    pageFetched = pyqtSignal(int, int)
+    finished = pyqtSignal(bool)
+
+    def __init__(
+        self,
+        url: Callable[[str], str],
+        fetch_task: Callable[[str, str], QgsNetworkContentFetcherTask],
+        save_reply: Callable[[QgsNetworkContentFetcherTask, str], bool],
+        cache_dir: str,
+        page_size: int = DATASETS_PAGE_SIZE,
+        policy: Union[RequestPolicy, None] = None,
+        parent=None,
+    ):
+        QObject.__init__(self, parent)
+
+        self.url = url
+        self.fetch_task = fetch_task
+        self.save_reply = save_reply
+        self.cache_dir = cache_dir
+        self.page_size = page_size
+        self.policy = policy
+
+        self.pages = None
+        self.total = None
+        self.queue = list()
+        self.requests = dict()
+        self.fetched = set()
+        self.modified = False
+        self.error = None
+        # False if a page was rejected by the server or is not valid, so
+        # the download would fail again
+        self.transient = True
+        self.started = None
+        self.elapsed = 0
+
+    def page_file(self, page: int) -> str:
+        """
+        Returns path to the cache file of the page with the given number.
+        """
+        return os.path.join(self.cache_dir, f"page_{page}.json")
+
+    def page_files(self) -> list[str]:
+        """
+        Returns cache files of all pages, in order.
+        """
+        return [self.page_file(page) for page in range(1, self.pages + 1)]
+
+    def start(self):
+        """
+        Starts download with the first page.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.started = time.monotonic()
+        self.queue = [1]
+        self.start_next()
+
+    def start_next(self):
+        """
+        Starts queued page downloads while there are free slots.
+        """
+        while self.queue and len(self.requests) < MAX_PAGE_REQUESTS:
+            page = self.queue.pop(0)
+            url = self.url(f"page[number]={page}&page[size]={self.page_size}")
+            request = ManagedRequest(
+                url,
+                partial(self.fetch_task, url, self.page_file(page)),
+                self.policy,
+                self,
+            )
+            request.finished.connect(partial(self.page_fetched, request, page))
+            self.requests[page] = request
+            request.start()
+
+    def page_fetched(self, request: ManagedRequest, page: int):
+        """
+        Caches fetched page and requests next pages. Download fails if the
+        page could not be fetched even after retries.
+        """
+        request.deleteLater()
+        if (
+            self.requests.pop(page, None) is not request
+            or self.error is not None
+        ):
+            return
+
+        if request.error is not None:
+            self.fail(request.error, request.transient)
+            return
+
+        if self.save_reply(request.task, self.page_file(page)):
+            self.modified = True
+
+        self.fetched.add(page)
+        if page == 1 or self.pages is None:
+            self.count_pages(page)
+            if self.error is not None:
+                return
+
+        self.pageFetched.emit(len(self.fetched), self.pages or page)
+        if self.pages is not None and len(self.fetched) == self.pages:
+            self.finish(True)
+            return
+
+        self.start_next()
+
+    def count_pages(self, page: int):
+        """
+        Finds out total number of pages from the fetched page and queues
+        pages which were not requested yet.
+        """
+        try:
+            with open(self.page_file(page), "r", encoding="utf-8") as f:
+                content = json.load(f)
+            count = len(content["data"])
+            total = (content.get("meta", None) or dict()).get("total", None)
+        except (OSError, ValueError, KeyError):
+            self.fail(f"invalid page {page}", False)
+            return
+
+        if total is not None:
+            self.total = total
+            # server returns whole collection if it does not support paging
+            if count >= total:
+                self.pages = 1
+            else:
+                if page == 1 and 0 < count < self.page_size:
+                    self.page_size = count
+                self.pages = math.ceil(total / self.page_size)
+            self.queue.extend(range(2, self.pages + 1))
+        elif count < self.page_size:
+            self.pages = page
+        else:
+            self.queue.append(page + 1)
+
+    def fail(self, message: str, transient: bool = True):
+        """
+        Stops download after a page could not be fetched.
+        """
+        self.error = message
+        self.transient = transient
+        self.queue = list()
+        for request in self.requests.values():
+            request.cancel()
+            request.deleteLater()
+        self.requests = dict()
+        self.finish(False)
+
+    def finish(self, result: bool):
+        """
+        Emits finished signal with the download result.
+        """
+        self.elapsed = time.monotonic() - self.started
+        self.finished.emit(result)
+
+
+def join_pages(
+    page_files: list[str], file_name: str, total: Union[int, None] = None
+) -> int:
+    """
+    Joins cached pages of a JSON API collection into a single document.
+    Pages are read one at a time and records or resources included by
+    several pages, e.g. when the collection changed during the download,
+    are written only once. Returns number of the records in the joined
+    document. If total is given and pages contain fewer records, the
+    document is incomplete and the file is not replaced.
+    """
+    records = set()
+    with open(f"{file_name}.tmp", "w", encoding="utf-8") as f:
+        f.write('{"data": [')
+        for page_file in page_files:
+            with open(page_file, "r", encoding="utf-8") as pf:
+                content = json.load(pf)
+            for item in content["data"]:
+                if item["id"] in records:
+                    continue
+                f.write(", " if records else "")
+                f.write(json.dumps(item, ensure_ascii=False))
+                records.add(item["id"])
+
+        f.write('], "included": [')
+        included = set()
+        for page_file in page_files:
+            with open(page_file, "r", encoding="utf-8") as pf:
+                content = json.load(pf)
+            for item in content.get("included", list()):
+                key = (item["type"], item["id"])
+                if key in included:
+                    continue
+                f.write(", " if included else "")
+                f.write(json.dumps(item, ensure_ascii=False))
+                included.add(key)
+
+        f.write(f'], "meta": {{"total": {len(records)}}}}}')
+
+    if total is not None and len(records) < total:
+        os.remove(f"{file_name}.tmp")
+    else:
+        os.replace(f"{file_name}.tmp", file_name)
+    return len(records)
+
+
+def remove_pages(cache_dir: str, keep: int) -> int:
+    """
+    Removes cached pages with numbers greater than keep. Returns number of
+    the removed pages.
+    """
+    removed = 0
+    if not os.path.isdir(cache_dir):
+        return removed
+
+    for name in os.listdir(cache_dir):
+        if not (name.startswith("page_") and name.endswith(".json")):
+            continue
+        try:
+            page = int(name[5:-5])
+        except ValueError:
+            continue
+        if page > keep:
+            os.remove(os.path.join(cache_dir, name))
+            removed += 1
+
+    return removed
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Resolution of the catalogue resources into plain records. The module
+does not depend on QGIS or Qt, so it can be imported by the worker
+processes parsing large catalogues in parallel.
+"""
+
+from __future__ import annotations
+
+from typing import Union
+
+# errors caused by malformed resources, records failing with them are
+# skipped when parsing in the tolerant mode
+RECORD_ERRORS = (AttributeError, IndexError, KeyError, TypeError, ValueError)
+
+# resolver of the worker process, set by init_worker()
+_resolver = None
+
+
+class ResourceResolver:
+    """
+    Resolves relationships of the JSON API resources.
+
+    Resources from the "included" section of the response are indexed by
+    their type and id and resolved lazily, when they are referenced for the
+    first time. Every resource is resolved only once and the resolved value
+    is shared between all resources referencing it, so resolved values
+    must not be modified.
+
+    Produces the same values as lookup_map() with simplify=True followed by
+    flatten(), but without additional passes over the response and without
+    copying the attributes.
+    """
+
+    def __init__(self, included: Union[list[dict], None] = None):
+        # resources are indexed by type first to avoid creating a (type, id)
+        # key tuple for every lookup
+        self.index = dict()
+        self.resolved = dict()
+        self.pending = set()
+
+        if included is not None:
+            for item in included:
+                self.add(item)
+
+    def add(self, item: dict):
+        """
+        Adds a resource from the "included" section to the resolver.
+        """
+        resources = self.index.get(item["type"], None)
+        if resources is None:
+            resources = self.index[item["type"]] = dict()
+            self.resolved[item["type"]] = dict()
+
+        resources.setdefault(item["id"], item)
+
+    def resolve(self, item: dict) -> dict:
+        """
+        Returns a new dictionary with the item attributes, where all
+        relationships of the item are replaced with the resolved resources.
+        """
+        result = dict(item["attributes"])
+
+        relationships = item.get("relationships", None)
+        if relationships:
+            resource = self.resource
+            for k, v in relationships.items():
+                result[k] = resource(v.get("data", None))
+
+        return result
+
+    def resource(
+        self, data: Union[dict, list[dict], None]
+    ) -> Union[dict, list[dict], None]:
+        """
+        Returns resolved resource(s) referenced by the data object, which can
+        be a dictionary with the resource type and id or a list of such
+        dictionaries. Follows the same rules as resource().
+        """
+        if data is None:
+            return None
+
+        lookup = self.lookup
+        if isinstance(data, dict):
+            return lookup(data["type"], data["id"])
+
+        if isinstance(data, list):
+            values = list()
+            for d in data:
+                v = lookup(d["type"], d["id"])
+                if v is not None:
+                    values.append(v)
+            return values if values else None
+
+        return None
+
+    def lookup(self, resource_type: str, resource_id: str) -> Union[dict, None]:
+        """
+        Returns resolved resource identified by the type and id or None if
+        there is no such resource.
+        """
+        resolved = self.resolved.get(resource_type, None)
+        if resolved is None:
+            return None
+
+        value = resolved.get(resource_id, None)
+        if value is not None:
+            return value
+
+        item = self.index[resource_type].get(resource_id, None)
+        if item is None:
+            return None
+
+        key = (resource_type, resource_id)
+        if key in self.pending:
+            # circular reference, return resource without relationships
+            return {**item["attributes"], "id": resource_id}
+
+        self.pending.add(key)
+        value = self.resolve(item)
+        value["id"] = resource_id
+        self.pending.discard(key)
+
+        resolved[resource_id] = value
+        return value
+
+
+def attribute(
+    value: Union[dict, list[dict]], key: str
+) -> Union[str, list[str], None]:
+    """
+    Extracts value(s) identified by the given key from the value object.
+    The value object can be either dictionary or list of dictionaries.
+    In the latter case value will be extracted from every dictionary in list.
+    """
+    if value is None:
+        return None
+
+    result = None
+    if isinstance(value, dict):
+        result = value.get(key, None)
+    elif isinstance(value, list):
+        values = list()
+        for i in value:
+            v = attribute(i, key)
+            if v is not None:
+                values.append(v)
+        result = values if values else None
+
+    return result
+
+
+def record_error(item: dict, error: Exception) -> tuple[Union[str, None], str]:
+    """
+    Returns id of the malformed resource or record, if it has one, and
+    description of the error it caused.
+    """
+    uid = None
+    if isinstance(item, dict):
+        # resources have id, plain records created from them have uid
+        uid = item.get("id", item.get("uid", None))
+    return uid, f"{type(error).__name__}: {error}"
+
+
+def thumbnail_record(data: Union[dict, None]) -> Union[tuple[str, str], None]:
+    """
+    Returns thumbnail id and URL from the thumbnail resource or None if
+    thumbnail is not set.
+    """
+    if data is None:
+        return None
+
+    tid = attribute(data, "id")
+    if tid is None:
+        return None
+
+    return tid, attribute(data, "url")
+
+
+def dataset_record(item: dict, resolver: ResourceResolver) -> dict:
+    """
+    Resolves dataset resource into a plain record, which can be stored in
+    the snapshot and sent between processes. Status is not included, as it
+    changes more often than the catalogue.
+    """
+    uid = item["id"]
+    attributes = resolver.resolve(item)
+    attributes["uid"] = uid
+
+    # keep only attributes necessary to create datasources
+    for dtype, keys in (
+        ("wfsSource", ["typeName"]),
+        ("wmsSource", ["layer", "style", "format"]),
+        ("wmtsSource", ["layer", "style", "format", "matrixSet"]),
+    ):
+        data = attributes.pop(dtype, None)
+        protocol = dtype[:-6].lower()
+        if data is not None:
+            data = {k: data.get(k, "") for k in keys + ["url"]}
+        attributes[protocol] = data
+
+    data = attributes.pop("category", None)
+    attributes["category"] = attribute(data, "name")
+    attributes["category_thumbnail"] = None
+    if data is not None:
+        attributes["category_thumbnail"] = thumbnail_record(
+            data.get("thumbnail", None)
+        )
+
+    data = attributes.pop("thumbnail", None)
+    attributes["thumbnail"] = thumbnail_record(data)
+
+    # extract necessary information from the complex attributes
+    for key, field in (
+        ("tags", "name"),
+        ("owners", "title"),
+    ):
+        data = attributes.pop(key, None)
+        attributes[key] = attribute(data, field)
+
+    return attributes
+
+
+def init_worker(included: list[dict]):
+    """
+    Initializes worker process with the resources included in the datasets
+    reply.
+    """
+    global _resolver
+
+    _resolver = ResourceResolver(included)
+
+
+def resolve_chunk(
+    items: list[dict], tolerant: bool = False
+) -> tuple[list[dict], list[tuple[Union[str, None], str]]]:
+    """
+    Resolves chunk of the dataset resources into plain records in the
+    worker process initialized by init_worker(). Returns records and
+    errors. If tolerant is True, malformed resources are skipped and
+    reported as (id, reason) errors, otherwise they raise.
+    """
+    if not tolerant:
+        records = [dataset_record(item, _resolver) for item in items]
+        return records, list()
+
+    records = list()
+    errors = list()
+    for item in items:
+        try:
+            records.append(dataset_record(item, _resolver))
+        except RECORD_ERRORS as e:
+            errors.append(record_error(item, e))
+
+    return records, errors
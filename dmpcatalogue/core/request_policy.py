@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Union
+import os
+import json
+import time
+import random
+import threading
+from functools import partial
+from urllib.parse import urlsplit
+
+from qgis.PyQt.QtCore import pyqtSignal, QObject, QTimer
+from qgis.PyQt.QtNetwork import QNetworkReply, QNetworkRequest
+
+from qgis.core import QgsApplication, QgsNetworkContentFetcherTask
+
+from dmpcatalogue.core.metrics import METRICS
+from dmpcatalogue.core.utils import cache_directory
+from dmpcatalogue.constants import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    MAX_REQUEST_RETRIES,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+
+# network errors which may disappear when the request is repeated
+TRANSIENT_ERRORS = {
+    QNetworkReply.NetworkError.ConnectionRefusedError,
+    QNetworkReply.NetworkError.RemoteHostClosedError,
+    QNetworkReply.NetworkError.HostNotFoundError,
+    QNetworkReply.NetworkError.TimeoutError,
+    QNetworkReply.NetworkError.OperationCanceledError,
+    QNetworkReply.NetworkError.TemporaryNetworkFailureError,
+    QNetworkReply.NetworkError.NetworkSessionFailedError,
+    QNetworkReply.NetworkError.UnknownNetworkError,
+    QNetworkReply.NetworkError.ProxyConnectionRefusedError,
+    QNetworkReply.NetworkError.ProxyConnectionClosedError,
+    QNetworkReply.NetworkError.ProxyTimeoutError,
+    QNetworkReply.NetworkError.InternalServerError,
+    QNetworkReply.NetworkError.ServiceUnavailableError,
+    QNetworkReply.NetworkError.UnknownServerError,
+}
+
+
+class RequestPolicy:
+    """
+    Shared policy of the network requests. Failed requests are repeated
+    a limited number of times, with exponentially growing delay randomized
+    by jitter, so many clients do not retry at the same moment.
+
+    Every host has its own circuit breaker. When requests to the host fail
+    CIRCUIT_FAILURE_THRESHOLD times in a row, the circuit opens and no
+    requests are sent to the host for CIRCUIT_RESET_TIMEOUT seconds. After
+    that requests are allowed again, a single failure opens the circuit
+    again, a successful request closes it. State of the circuits is kept
+    in a file, so a host which is down is not contacted again on every
+    start of QGIS.
+
+    Policy is used from the worker threads as well, so all operations are
+    guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        state_file: Union[str, None] = None,
+        max_retries: int = MAX_REQUEST_RETRIES,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+    ):
+        self.state_file = state_file
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+
+        self.hosts = dict()
+        self.load()
+
+    def load(self):
+        """
+        Loads state of the circuits from the state file.
+        """
+        if self.state_file is None:
+            return
+
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                self.hosts = json.load(f)
+        except (OSError, ValueError):
+            self.hosts = dict()
+
+    def save(self):
+        """
+        Writes state of the circuits to the state file. Should be called
+        with the lock held.
+        """
+        if self.state_file is None:
+            return
+
+        try:
+            with open(f"{self.state_file}.tmp", "w", encoding="utf-8") as f:
+                json.dump(self.hosts, f)
+            os.replace(f"{self.state_file}.tmp", self.state_file)
+        except OSError:
+            pass
+
+    @staticmethod
+    def host(url: str) -> str:
+        """
+        Returns host of the URL, circuits are kept per host.
+        """
+        return urlsplit(url).netloc.lower()
+
+    def delay(self, attempt: int) -> float:
+        """
+        Returns delay in seconds before the given retry attempt, counted
+        from 0. Half of the delay is fixed, the other half is random.
+        """
+        delay = min(self.max_delay, self.base_delay * 2**attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def can_retry(self, attempt: int) -> bool:
+        """
+        Checks whether request can be repeated after the given number of
+        retries.
+        """
+        return attempt < self.max_retries
+
+    @staticmethod
+    def is_transient(
+        error: QNetworkReply.NetworkError, status: Union[int, None] = None
+    ) -> bool:
+        """
+        Checks whether the request failed because of an error which may
+        disappear when the request is repeated, e.g. a timeout or an
+        overloaded server.
+        """
+        if status is not None and (status == 429 or status >= 500):
+            return True
+
+        return error in TRANSIENT_ERRORS
+
+    def allow(self, url: str) -> bool:
+        """
+        Checks whether requests to the host of the URL are allowed, i.e. its
+        circuit is closed or it was open long enough to try it again.
+        """
+        with self.lock:
+            state = self.hosts.get(self.host(url), None)
+            if state is None or state.get("opened", None) is None:
+                return True
+
+            return time.time() - state["opened"] >= self.reset_timeout
+
+    def record_success(self, url: str):
+        """
+        Closes circuit of the host after a successful request.
+        """
+        with self.lock:
+            if self.hosts.pop(self.host(url), None) is not None:
+                self.save()
+
+    def record_failure(self, url: str):
+        """
+        Counts failed request to the host and opens its circuit when there
+        were too many failures in a row.
+        """
+        with self.lock:
+            state = self.hosts.setdefault(
+                self.host(url), {"failures": 0, "opened": None}
+            )
+            state["failures"] += 1
+            if state["failures"] >= self.failure_threshold:
+                state["opened"] = time.time()
+                self.save()
+
+
+REQUEST_POLICY = RequestPolicy(os.path.join(cache_directory(), "circuits.json"))
+
+
+class ManagedRequest(QObject):
+    """
+    Fetches URL with the network content fetcher task following the request
+    policy. Request is not sent if the circuit of the host is open, failed
+    request is repeated after a delay if the error is transient. Task is
+    created by the given function for every attempt.
+
+    Emits finished signal when done. Task of the last attempt can be
+    accessed via task class member, if the request failed, error class
+    member contains error message and transient member tells whether
+    the request may succeed later.
+
+    Every attempt is recorded in the metrics under the last segment of the
+    URL path. "304 Not Modified" replies are counted as cache hits.
+    """
+
+    finished = pyqtSignal()
+
+    def __init__(
+        self,
+        url: str,
+        create_task: Callable[[], QgsNetworkContentFetcherTask],
+        policy: Union[RequestPolicy, None] = None,
+        parent=None,
+    ):
+        QObject.__init__(self, parent)
+
+        self.url = url
+        self.endpoint = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+        self.create_task = create_task
+        self.policy = REQUEST_POLICY if policy is None else policy
+        self.task_manager = QgsApplication.taskManager()
+
+        self.attempt = 0
+        self.task = None
+        self.error = None
+        self.transient = True
+        self.canceled = False
+        self.started = None
+
+    def start(self):
+        """
+        Starts the request, unless the circuit of the host is open.
+        """
+        if self.canceled:
+            return
+
+        if not self.policy.allow(self.url):
+            self.task = None
+            self.error = self.tr(
+                "{} is not responding, request was postponed"
+            ).format(self.policy.host(self.url))
+            self.finished.emit()
+            return
+
+        self.task = self.create_task()
+        self.task.fetched.connect(partial(self.task_fetched, self.task))
+        self.started = time.time()
+        self.task_manager.addTask(self.task)
+
+    def cancel(self):
+        """
+        Cancels the running task and any scheduled retries. Finished signal
+        is not emitted.
+        """
+        self.canceled = True
+        if self.task is not None:
+            self.task.cancel()
+
+    def task_fetched(self, task: QgsNetworkContentFetcherTask):
+        """
+        Records result of the request and repeats it if it failed and can be
+        retried.
+        """
+        if task is not self.task or self.canceled:
+            return
+
+        reply = task.reply()
+        if reply is None:
+            self.error = self.tr("no reply received")
+            METRICS.record_request(
+                self.endpoint, self.started, time.time(), error=self.error
+            )
+            self.finished.emit()
+            return
+
+        error = reply.error()
+        status = reply.attribute(
+            QNetworkRequest.Attribute.HttpStatusCodeAttribute
+        )
+        METRICS.record_request(
+            self.endpoint,
+            self.started,
+            time.time(),
+            reply.bytesAvailable(),
+            status,
+            (
+                None
+                if error == QNetworkReply.NetworkError.NoError
+                else reply.errorString()
+            ),
+        )
+
+        if error == QNetworkReply.NetworkError.NoError:
+            METRICS.record_cache(self.endpoint, status == 304)
+            self.policy.record_success(self.url)
+            self.error = None
+            self.finished.emit()
+            return
+
+        self.transient = self.policy.is_transient(error, status)
+        if self.transient:
+            self.policy.record_failure(self.url)
+            if self.policy.can_retry(self.attempt):
+                delay = self.policy.delay(self.attempt)
+                self.attempt += 1
+                QTimer.singleShot(round(delay * 1000), self.start)
+                return
+
+        self.error = reply.errorString()
+        self.finished.emit()
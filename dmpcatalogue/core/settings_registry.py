@@ -15,7 +15,12 @@ from __future__ import annotations
 
 from qgis.core import QgsSettings, QgsApplication
 
-from dmpcatalogue.constants import DEFAULT_API_ROOT, DEFAULT_LOAD_ORDER
+from dmpcatalogue.constants import (
+    DEFAULT_API_ROOT,
+    DEFAULT_LOAD_ORDER,
+    DEFAULT_STATUS_POLL_INTERVAL,
+    DEFAULT_THUMBNAIL_CACHE_SIZE,
+)
 
 
 class SettingsRegistry:
@@ -253,3 +258,189 @@ class SettingsRegistry:
             use_bbox,
             QgsSettings.Plugins,
         )
+
+    @staticmethod
+    def stale_while_revalidate() -> bool:
+        """
+        Returns whether cached catalogue should be shown while it is
+        being revalidated against the server.
+        """
+        settings = QgsSettings()
+        return settings.value(
+            "dmpcatalogue/stale_while_revalidate",
+            True,
+            bool,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def set_stale_while_revalidate(enable: bool):
+        """
+        Sets whether cached catalogue should be shown while it is being
+        revalidated against the server.
+        """
+        settings = QgsSettings()
+        settings.setValue(
+            "dmpcatalogue/stale_while_revalidate",
+            enable,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def status_poll_interval() -> int:
+        """
+        Returns interval of the dataset status polling in minutes. Zero
+        means that status is not polled.
+        """
+        settings = QgsSettings()
+        return settings.value(
+            "dmpcatalogue/status_poll_interval",
+            DEFAULT_STATUS_POLL_INTERVAL,
+            int,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def set_status_poll_interval(interval: int):
+        """
+        Sets interval of the dataset status polling in minutes.
+        """
+        settings = QgsSettings()
+        settings.setValue(
+            "dmpcatalogue/status_poll_interval",
+            interval,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def thumbnail_cache_size() -> int:
+        """
+        Returns disk budget of the thumbnails cache in megabytes. Zero
+        means that cache size is not limited.
+        """
+        settings = QgsSettings()
+        return settings.value(
+            "dmpcatalogue/thumbnail_cache_size",
+            DEFAULT_THUMBNAIL_CACHE_SIZE,
+            int,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def set_thumbnail_cache_size(size: int):
+        """
+        Sets disk budget of the thumbnails cache in megabytes.
+        """
+        settings = QgsSettings()
+        settings.setValue(
+            "dmpcatalogue/thumbnail_cache_size",
+            size,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def use_catalogue_store() -> bool:
+        """
+        Returns whether parsed catalogue should be kept in the SQLite
+        catalogue store.
+        """
+        settings = QgsSettings()
+        return settings.value(
+            "dmpcatalogue/use_catalogue_store",
+            False,
+            bool,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def set_use_catalogue_store(enable: bool):
+        """
+        Sets whether parsed catalogue should be kept in the SQLite
+        catalogue store.
+        """
+        settings = QgsSettings()
+        settings.setValue(
+            "dmpcatalogue/use_catalogue_store",
+            enable,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def delta_sync() -> bool:
+        """
+        Returns whether only changed datasets should be downloaded when
+        catalogue is refreshed.
+        """
+        settings = QgsSettings()
+        return settings.value(
+            "dmpcatalogue/delta_sync",
+            True,
+            bool,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def set_delta_sync(enable: bool):
+        """
+        Sets whether only changed datasets should be downloaded when
+        catalogue is refreshed.
+        """
+        settings = QgsSettings()
+        settings.setValue(
+            "dmpcatalogue/delta_sync",
+            enable,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def parallel_parsing() -> bool:
+        """
+        Returns whether large catalogues should be parsed in worker
+        processes.
+        """
+        settings = QgsSettings()
+        return settings.value(
+            "dmpcatalogue/parallel_parsing",
+            True,
+            bool,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def set_parallel_parsing(enable: bool):
+        """
+        Sets whether large catalogues should be parsed in worker processes.
+        """
+        settings = QgsSettings()
+        settings.setValue(
+            "dmpcatalogue/parallel_parsing",
+            enable,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def tolerant_parsing() -> bool:
+        """
+        Returns whether malformed catalogue records should be skipped
+        instead of failing the whole catalogue.
+        """
+        settings = QgsSettings()
+        return settings.value(
+            "dmpcatalogue/tolerant_parsing",
+            True,
+            bool,
+            QgsSettings.Plugins,
+        )
+
+    @staticmethod
+    def set_tolerant_parsing(enable: bool):
+        """
+        Sets whether malformed catalogue records should be skipped instead
+        of failing the whole catalogue.
+        """
+        settings = QgsSettings()
+        settings.setValue(
+            "dmpcatalogue/tolerant_parsing",
+            enable,
+            QgsSettings.Plugins,
+        )
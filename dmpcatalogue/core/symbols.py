@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Union
+
+
+class SymbolTable:
+    """
+    Table of the shared string objects. Values repeated across many
+    datasets, like category names, owners, tags, file types, image formats
+    and service URLs, are replaced with a single shared object, which saves
+    memory and makes equality checks of the same values an identity check.
+
+    Unlike with sys.intern(), the table is owned by the plugin, so the
+    search and grouping code can check whether a value is known and reuse
+    the shared objects. Dictionary operations are atomic, so the table can
+    be used from the parser task and the GUI thread at the same time.
+    """
+
+    def __init__(self):
+        self.symbols = dict()
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self.symbols
+
+    def clear(self):
+        """
+        Removes all symbols from the table.
+        """
+        self.symbols.clear()
+
+    def intern(self, value: Union[str, None]) -> Union[str, None]:
+        """
+        Returns shared object equal to the given string, adding the string
+        to the table if it is not there yet. None is returned as is.
+        """
+        if value is None:
+            return None
+
+        return self.symbols.setdefault(value, value)
+
+    def get(self, value: str) -> str:
+        """
+        Returns shared object equal to the given string or the string
+        itself if it is not in the table. Unlike intern(), the table is
+        not modified, so it can be used for the search terms.
+        """
+        return self.symbols.get(value, value)
+
+    def intern_all(
+        self, values: Union[Iterable[str], None]
+    ) -> Union[tuple[str, ...], None]:
+        """
+        Returns tuple of the shared objects equal to the given strings or
+        None if values are None.
+        """
+        if values is None:
+            return None
+
+        setdefault = self.symbols.setdefault
+        return tuple(setdefault(v, v) for v in values)
+
+
+SYMBOLS = SymbolTable()
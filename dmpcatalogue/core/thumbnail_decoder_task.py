@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from __future__ import annotations
+
+from qgis.PyQt.QtCore import pyqtSignal
+
+from qgis.core import QgsTask
+
+from dmpcatalogue.core.metrics import METRICS
+from dmpcatalogue.core.thumbnail_store import ThumbnailStore
+
+
+class ThumbnailDecoderTask(QgsTask):
+    """
+    Decodes stored thumbnails with the given ids and scales them to the
+    icon size. Emits decoded signal when finished. Decoded images can be
+    accessed via images class member.
+    """
+
+    decoded = pyqtSignal()
+
+    def __init__(self, store: ThumbnailStore, tids: list[str], size: int):
+        QgsTask.__init__(self)
+
+        self.store = store
+        self.tids = tids
+        self.size = size
+        self.images = dict()
+
+    def run(self):
+        with METRICS.timer("decode_thumbnails"):
+            return self.decode()
+
+    def decode(self) -> bool:
+        """
+        Decodes thumbnails, returns False if the task was canceled.
+        """
+        for i, tid in enumerate(self.tids):
+            if self.isCanceled():
+                return False
+
+            image = self.store.image(tid, self.size)
+            if image is not None:
+                self.images[tid] = image
+
+            self.setProgress(i * 100 / len(self.tids))
+
+        self.decoded.emit()
+        return True
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from __future__ import annotations
+
+from typing import Union
+import time
+from collections import deque
+from functools import partial
+
+from qgis.PyQt.QtCore import pyqtSignal, QObject, QTimer, QUrl
+from qgis.PyQt.QtNetwork import QNetworkReply, QNetworkRequest
+
+from qgis.core import QgsApplication, QgsNetworkAccessManager
+
+from dmpcatalogue.core.metrics import METRICS
+from dmpcatalogue.core.request_policy import REQUEST_POLICY, RequestPolicy
+from dmpcatalogue.core.thumbnail_decoder_task import ThumbnailDecoderTask
+from dmpcatalogue.core.thumbnail_store import ThumbnailStore
+from dmpcatalogue.constants import MAX_THUMBNAIL_REQUESTS, THUMBNAIL_ICON_SIZE
+
+
+class ThumbnailFetcher(QObject):
+    """
+    Downloads missing thumbnails in the background and stores them in the
+    thumbnail store. At most MAX_THUMBNAIL_REQUESTS thumbnails are
+    downloaded at once, the rest are queued. Downloads follow the request
+    policy, thumbnails from a host which is not responding are skipped and
+    can be requested again later. Downloads and lookups in the thumbnail
+    store are recorded in the metrics.
+
+    Downloaded thumbnails are decoded and scaled to the icon size in
+    a background task. Emits thumbnailsFetched signal with a dictionary of
+    thumbnail ids and decoded images when a group of thumbnails is ready.
+    """
+
+    thumbnailsFetched = pyqtSignal(dict)
+
+    def __init__(
+        self,
+        store: ThumbnailStore,
+        parent=None,
+        icon_size: int = THUMBNAIL_ICON_SIZE,
+        policy: Union[RequestPolicy, None] = None,
+    ):
+        QObject.__init__(self, parent)
+
+        self.store = store
+        self.icon_size = icon_size
+        self.policy = REQUEST_POLICY if policy is None else policy
+        self.task_manager = QgsApplication.taskManager()
+
+        self.queue = deque()
+        self.requested = set()
+        self.replies = dict()
+        self.attempts = dict()
+        self.decode_queue = list()
+        self.decoder_task = None
+
+    def fetch(self, thumbnail: Union[tuple[str, str], None]) -> bool:
+        """
+        Queues download of the thumbnail given as (id, url) record. Returns
+        False if the thumbnail is already cached, is being downloaded or its
+        download failed before. Thumbnails evicted from the cache are
+        downloaded again.
+        """
+        if thumbnail is None:
+            return False
+
+        tid, url = thumbnail
+        if url is None or tid in self.requested:
+            return False
+
+        cached = self.store.contains(tid)
+        METRICS.record_cache("thumbnails", cached)
+        if cached:
+            return False
+
+        self.requested.add(tid)
+        self.queue.append((tid, url))
+        self.start_next()
+        return True
+
+    def start_next(self):
+        """
+        Starts queued downloads while there are free slots.
+        """
+        while self.queue and len(self.replies) < MAX_THUMBNAIL_REQUESTS:
+            tid, url = self.queue.popleft()
+            if not self.policy.allow(url):
+                # host is not responding, thumbnail can be requested later
+                self.requested.discard(tid)
+                continue
+
+            reply = QgsNetworkAccessManager.instance().get(
+                QNetworkRequest(QUrl(url))
+            )
+            reply.finished.connect(
+                partial(self.reply_finished, reply, tid, url, time.time())
+            )
+            self.replies[tid] = reply
+
+    def reply_finished(
+        self, reply: QNetworkReply, tid: str, url: str, started: float
+    ):
+        """
+        Stores downloaded thumbnail and starts the next queued download.
+        Thumbnails which failed because of a transient error are queued
+        again after a delay, other failed thumbnails are not requested again
+        during the session.
+        """
+        self.replies.pop(tid, None)
+
+        error = reply.error()
+        status = reply.attribute(
+            QNetworkRequest.Attribute.HttpStatusCodeAttribute
+        )
+        if error == QNetworkReply.NetworkError.NoError:
+            content = bytes(reply.readAll())
+            METRICS.record_request(
+                "thumbnails", started, time.time(), len(content), status
+            )
+            self.policy.record_success(url)
+            self.attempts.pop(tid, None)
+            self.store.store(tid, content)
+            # store is checked from now on
+            self.requested.discard(tid)
+            self.decode_queue.append(tid)
+            self.start_decoding()
+        else:
+            METRICS.record_request(
+                "thumbnails",
+                started,
+                time.time(),
+                status=status,
+                error=reply.errorString(),
+            )
+            if self.policy.is_transient(error, status):
+                self.policy.record_failure(url)
+                attempt = self.attempts.get(tid, 0)
+                if self.policy.can_retry(attempt):
+                    self.attempts[tid] = attempt + 1
+                    QTimer.singleShot(
+                        round(self.policy.delay(attempt) * 1000),
+                        partial(self.retry, tid, url),
+                    )
+
+        reply.deleteLater()
+        self.start_next()
+        self.save_store()
+
+    def retry(self, tid: str, url: str):
+        """
+        Queues failed thumbnail download again.
+        """
+        self.queue.append((tid, url))
+        self.start_next()
+
+    def start_decoding(self):
+        """
+        Starts background decoding of the downloaded thumbnails, unless
+        another group of thumbnails is being decoded.
+        """
+        if self.decoder_task is not None or not self.decode_queue:
+            return
+
+        task = ThumbnailDecoderTask(
+            self.store, self.decode_queue, self.icon_size
+        )
+        task.decoded.connect(partial(self.decoding_finished, task))
+        task.taskTerminated.connect(partial(self.decoding_finished, task))
+        self.decode_queue = list()
+        self.decoder_task = task
+        self.task_manager.addTask(task)
+
+    def decoding_finished(self, task: ThumbnailDecoderTask):
+        """
+        Emits decoded thumbnails and starts decoding of the thumbnails
+        downloaded in the meantime.
+        """
+        if task is not self.decoder_task:
+            return
+
+        self.decoder_task = None
+        if task.images:
+            self.thumbnailsFetched.emit(task.images)
+
+        self.start_decoding()
+        self.save_store()
+
+    def save_store(self):
+        """
+        Writes index of the thumbnail store once all queued thumbnails were
+        downloaded and decoded, instead of writing it for every thumbnail.
+        """
+        if (
+            self.queue
+            or self.replies
+            or self.decode_queue
+            or self.decoder_task is not None
+        ):
+            return
+
+        self.store.save()
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from __future__ import annotations
+
+from typing import Union
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+
+from qgis.PyQt.QtCore import Qt
+from qgis.PyQt.QtGui import QImage
+
+from dmpcatalogue.core.utils import cache_directory
+
+
+class ThumbnailStore:
+    """
+    Disk cache of the thumbnails. Thumbnails are stored under the hash of
+    their content, so identical images used by several thumbnail ids are
+    stored only once. Mapping from thumbnail ids to stored files, file
+    sizes and access times are kept in the index file, so cached thumbnails
+    can be looked up without touching the file system.
+
+    Images scaled to the icon size are stored next to the original ones,
+    so thumbnails do not have to be decoded in full size and scaled every
+    time they are used.
+
+    When total size of the stored files exceeds the budget, least recently
+    used files are removed together with their scaled variants.
+
+    Store is shared by the parser task and the main thread, so all
+    operations are guarded by a lock.
+    """
+
+    INDEX_FILE = "index.json"
+    VARIANT = re.compile(r"[0-9a-f]{64}_[0-9]+\.png")
+
+    def __init__(self, cache_dir: Union[str, None] = None, budget: int = 0):
+        if cache_dir is None:
+            cache_dir = os.path.join(cache_directory(), "thumbnails")
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.cache_dir = cache_dir
+        self.budget = budget
+        self.lock = threading.Lock()
+        self.modified = False
+
+        self.ids = dict()
+        self.blobs = dict()
+        self.load()
+
+    def load(self):
+        """
+        Loads index of the stored thumbnails. If there is no index,
+        thumbnails cached by the previous versions of the plugin are
+        imported.
+        """
+        index_file = os.path.join(self.cache_dir, self.INDEX_FILE)
+        try:
+            with open(index_file, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self.ids = index["ids"]
+            self.blobs = index["blobs"]
+        except (OSError, ValueError, KeyError):
+            self.import_files()
+
+    def import_files(self):
+        """
+        Adds files from the cache directory, named by the thumbnail id,
+        to the store.
+        """
+        for name in os.listdir(self.cache_dir):
+            file_name = os.path.join(self.cache_dir, name)
+            if name == self.INDEX_FILE or not os.path.isfile(file_name):
+                continue
+
+            # scaled variants are created again when needed
+            if name.endswith(".tmp") or self.VARIANT.fullmatch(name):
+                os.remove(file_name)
+                continue
+
+            with open(file_name, "rb") as f:
+                data = f.read()
+            os.remove(file_name)
+            self.store(name, data)
+
+        self.save()
+
+    def contains(self, tid: str) -> bool:
+        """
+        Returns True if thumbnail with the given id is stored.
+        """
+        with self.lock:
+            return tid in self.ids
+
+    def file_name(self, tid: str) -> Union[str, None]:
+        """
+        Returns path to the stored thumbnail with the given id and marks it
+        as recently used. Returns None if thumbnail is not stored.
+        """
+        with self.lock:
+            digest = self.ids.get(tid, None)
+            if digest is None:
+                return None
+
+            self.blobs[digest]["accessed"] = time.time()
+            self.modified = True
+            return os.path.join(self.cache_dir, digest)
+
+    def image(self, tid: str, size: int) -> Union[QImage, None]:
+        """
+        Returns image of the thumbnail with the given id, scaled to fit into
+        a square with the given size in pixels. Scaled image is created
+        and stored if it does not exist yet. Returns None if thumbnail is not
+        stored or can not be decoded.
+
+        Can be called from the worker threads.
+        """
+        file_name = self.file_name(tid)
+        if file_name is None:
+            return None
+
+        variant = f"{file_name}_{size}.png"
+        image = QImage(variant)
+        if not image.isNull():
+            return image
+
+        image = QImage(file_name)
+        if image.isNull():
+            return None
+
+        image = image.scaled(
+            size,
+            size,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+        # several threads can scale the same thumbnail, so every thread
+        # writes its own temporary file, which is moved in place together
+        # with the index update, unless the thumbnail was evicted meanwhile
+        temp_file = f"{variant}.{threading.get_ident()}.tmp"
+        if image.save(temp_file, "PNG"):
+            with self.lock:
+                blob = self.blobs.get(os.path.basename(file_name), None)
+                if blob is not None:
+                    variants = blob.setdefault("variants", dict())
+                    variants[str(size)] = os.path.getsize(temp_file)
+                    os.replace(temp_file, variant)
+                    self.modified = True
+                else:
+                    os.remove(temp_file)
+
+        return image
+
+    def store(self, tid: str, data: bytes) -> str:
+        """
+        Stores thumbnail with the given id and returns path to it. If the
+        same image is already stored, it is reused. Stored thumbnail is
+        never evicted by this call, even if it does not fit into the budget
+        alone.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        file_name = os.path.join(self.cache_dir, digest)
+
+        with self.lock:
+            if digest not in self.blobs:
+                # file may be read at the same time, so it is written under
+                # a temporary name first
+                with open(f"{file_name}.tmp", "wb") as f:
+                    f.write(data)
+                os.replace(f"{file_name}.tmp", file_name)
+
+            previous = self.ids.get(tid, None)
+            self.ids[tid] = digest
+            blob = self.blobs.setdefault(digest, {"size": len(data)})
+            blob["accessed"] = time.time()
+            self.modified = True
+
+            # previous content of the thumbnail is not needed anymore,
+            # unless it is shared with other thumbnail ids
+            if (
+                previous is not None
+                and previous != digest
+                and previous not in self.ids.values()
+            ):
+                self.remove_blob(previous)
+
+            self.evict(digest)
+
+        return file_name
+
+    def set_budget(self, budget: int):
+        """
+        Sets disk budget of the store in bytes and removes thumbnails which
+        do not fit into it.
+        """
+        with self.lock:
+            self.budget = budget
+            self.evict()
+
+        self.save()
+
+    def size(self) -> int:
+        """
+        Returns total size of the stored thumbnails in bytes.
+        """
+        with self.lock:
+            return sum(self.blob_size(blob) for blob in self.blobs.values())
+
+    @staticmethod
+    def blob_size(blob: dict) -> int:
+        """
+        Returns size of the stored thumbnail including its scaled variants.
+        """
+        return blob["size"] + sum(blob.get("variants", dict()).values())
+
+    def evict(self, keep: Union[str, None] = None):
+        """
+        Removes least recently used thumbnails until the total size of the
+        store fits into the budget. Budget of 0 means no limit. Thumbnail
+        with the keep digest is never removed. Should be called with the
+        lock held.
+        """
+        if self.budget <= 0:
+            return
+
+        total = sum(self.blob_size(blob) for blob in self.blobs.values())
+        if total <= self.budget:
+            return
+
+        removed = set()
+        for digest in sorted(
+            self.blobs, key=lambda d: self.blobs[d]["accessed"]
+        ):
+            if total <= self.budget:
+                break
+            if digest == keep:
+                continue
+
+            total -= self.remove_blob(digest)
+            removed.add(digest)
+
+        self.ids = {k: v for k, v in self.ids.items() if v not in removed}
+
+    def remove_blob(self, digest: str) -> int:
+        """
+        Removes stored file with the given digest together with its scaled
+        variants and returns their total size. Thumbnail ids referencing
+        the file are not updated. Should be called with the lock held.
+        """
+        blob = self.blobs.pop(digest)
+        self.modified = True
+
+        file_name = os.path.join(self.cache_dir, digest)
+        file_names = [file_name] + [
+            f"{file_name}_{size}.png" for size in blob.get("variants", ())
+        ]
+        for file_name in file_names:
+            try:
+                os.remove(file_name)
+            except OSError:
+                pass
+
+        return self.blob_size(blob)
+
+    def save(self):
+        """
+        Writes index of the stored thumbnails if it was modified.
+        """
+        with self.lock:
+            if not self.modified:
+                return
+
+            index_file = os.path.join(self.cache_dir, self.INDEX_FILE)
+            with open(f"{index_file}.tmp", "w", encoding="utf-8") as f:
+                json.dump({"ids": self.ids, "blobs": self.blobs}, f)
+            os.replace(f"{index_file}.tmp", index_file)
+
+            self.modified = False
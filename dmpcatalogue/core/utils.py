@@ -13,24 +13,19 @@
 
 from __future__ import annotations
 
-from typing import Union
+from typing import Any, Iterator, Union
 import os
+import re
+import json
+import pickle
+import hashlib
 import tempfile
 from datetime import date
 
-from qgis.PyQt.QtCore import QStandardPaths, QUrl
-from qgis.PyQt.QtGui import QIcon
-from qgis.PyQt.QtNetwork import QNetworkRequest
+from qgis.PyQt.QtCore import QStandardPaths
 
-from qgis.core import QgsBlockingNetworkRequest
-
-from dmpcatalogue.core.data_classes import (
-    WmsSource,
-    WmtsSource,
-    WfsSource,
-    FileSource,
-)
-from dmpcatalogue.constants import PLUGIN_ICON
+from dmpcatalogue.core.records import ResourceResolver, attribute
+from dmpcatalogue.constants import SNAPSHOT_VERSION
 
 
 def cache_directory(dir_name: str = "dmpcatalogue") -> str:
@@ -63,6 +58,211 @@ def file_exists(file_name: str, age: int = 0) -> bool:
     return True
 
 
+def cache_key(file_names: list[str]) -> str:
+    """
+    Returns a key identifying the current content of the given files.
+    Missing files are taken into account as well.
+    """
+    digest = hashlib.sha256()
+    for file_name in file_names:
+        digest.update(os.path.basename(file_name).encode("utf-8"))
+        if not os.path.exists(file_name):
+            digest.update(b"\0")
+            continue
+
+        with open(file_name, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def load_snapshot(file_name: str, key: str) -> Any:
+    """
+    Loads data from the snapshot file. Returns None if snapshot does not
+    exist, has different version or was created for a different key.
+    """
+    if not os.path.exists(file_name):
+        return None
+
+    try:
+        with open(file_name, "rb") as f:
+            version, snapshot_key = pickle.load(f)
+            if version != SNAPSHOT_VERSION or snapshot_key != key:
+                return None
+
+            return pickle.load(f)
+    except Exception:
+        # treat unreadable snapshot as a missing one
+        return None
+
+
+def save_snapshot(file_name: str, key: str, data: Any):
+    """
+    Saves data to the snapshot file. Snapshot header contains snapshot
+    format version and the given key, so it can be validated without
+    loading the data.
+    """
+    temp_file = f"{file_name}.tmp"
+    with open(temp_file, "wb") as f:
+        pickle.dump((SNAPSHOT_VERSION, key), f, pickle.HIGHEST_PROTOCOL)
+        pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+
+    os.replace(temp_file, file_name)
+
+
+def merge_changes(current: dict, new: dict) -> tuple[list, list, list]:
+    """
+    Updates the current dictionary in place, so it has the same content
+    as the new one. Values which are equal in both dictionaries are kept
+    untouched.
+
+    Returns lists of added, removed and changed keys.
+    """
+    removed = [k for k in current if k not in new]
+    for k in removed:
+        del current[k]
+
+    added = list()
+    changed = list()
+    for k, v in new.items():
+        if k not in current:
+            added.append(k)
+        elif current[k] != v:
+            changed.append(k)
+        else:
+            continue
+
+        current[k] = v
+
+    return added, removed, changed
+
+
+class JsonReader:
+    """
+    Incremental reader of the JSON text file. File is read in chunks and
+    only the currently processed part of it is kept in memory.
+    """
+
+    WHITESPACE = re.compile(r"[ \t\n\r]*")
+    DELIMITERS = (" ", "\t", "\n", "\r", ",", "]", "}")
+
+    def __init__(self, stream, chunk_size: int = 1 << 16):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size: int = 0) -> bool:
+        """
+        Reads next chunk of the file, at least chunk_size characters long,
+        into the buffer, dropping already processed data. Returns False if
+        end of file is reached.
+        """
+        chunk = self.stream.read(max(self.chunk_size, size))
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Returns the next non-whitespace character without consuming it or
+        an empty string at the end of file.
+        """
+        while True:
+            self.pos = self.WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self.fill():
+                break
+
+        return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, chars: str) -> str:
+        """
+        Consumes the next non-whitespace character, which should be one of
+        the given characters, and returns it.
+        """
+        c = self.peek()
+        if c == "" or c not in chars:
+            raise ValueError(
+                f"Expected one of '{chars}', got '{c}' at position {self.pos}"
+            )
+
+        self.pos += 1
+        return c
+
+    def value(self) -> Any:
+        """
+        Decodes the next JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # numbers and literals may continue in the next chunk, they
+                # are complete only if followed by a delimiter
+                if (
+                    self.eof
+                    or isinstance(value, (str, list, dict))
+                    or self.buffer[end : end + 1] in self.DELIMITERS
+                ):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+
+            # value is decoded from its start after every read, so the
+            # buffered part is doubled to decode large values only a few
+            # times instead of once per chunk
+            self.fill(len(self.buffer) - self.pos)
+
+
+def iter_json(
+    file_name: str, keys: set[str], chunk_size: int = 1 << 16
+) -> Iterator[tuple[str, Any]]:
+    """
+    Iterates over members of the top-level JSON object stored in the file
+    without loading the whole file into memory. Yields (key, value) pairs for
+    the members with the given keys. Arrays are processed item by item, so
+    for members containing arrays every array item is yielded separately.
+    """
+    with open(file_name, "r", encoding="utf-8") as f:
+        reader = JsonReader(f, chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+
+        while True:
+            key = reader.value()
+            reader.expect(":")
+
+            if reader.peek() == "[":
+                reader.expect("[")
+                if reader.peek() == "]":
+                    reader.expect("]")
+                else:
+                    while True:
+                        item = reader.value()
+                        if key in keys:
+                            yield key, item
+
+                        if reader.expect(",]") == "]":
+                            break
+            else:
+                value = reader.value()
+                if key in keys:
+                    yield key, value
+
+            if reader.expect(",}") == "}":
+                break
+
+
 def lookup_map(
     data: dict,
     exclude_type: bool = False,
@@ -152,107 +352,45 @@ def flatten(content: dict, lookup_table: dict):
             item["attributes"][k] = resource(data, lookup_table)
 
 
-def attribute(
-    value: Union[dict, list[dict]], key: str
-) -> Union[str, list[str], None]:
-    """
-    Extracts value(s) identified by the given key from the value object.
-    The value object can be either dictionary or list of dictionaries.
-    In the latter case value will be extracted from every dictionary in list.
-    """
-    if value is None:
-        return None
-
-    result = None
-    if isinstance(value, dict):
-        result = value.get(key, None)
-    elif isinstance(value, list):
-        values = list()
-        for i in value:
-            v = attribute(i, key)
-            if v is not None:
-                values.append(v)
-        result = values if values else None
-
-    return result
-
-
-def ows_datasource(protocol: str, data: dict, keys: list[str]):
+def collection(item: dict, lookup_table: dict) -> dict:
     """
-    Creates an OGC datasource class instance for the given protocol using
-    information from the data dictionary. Only keys from the keys list
-    will be used.
+    Returns attributes of the collection resource. Collection items are
+    replaced with the "datasets" list containing ids of the datasets in the
+    collection, or None if collection is empty. Collection thumbnail is
+    resolved using the lookup_table, which should be created by lookup_map()
+    with include_resources set to True.
     """
-    if data is None:
-        return None
-
-    # all datasources have URL
-    if "url" not in keys:
-        keys.append("url")
-
-    args = dict()
-    for k in keys:
-        v = data.get(k, "")
-        if k == "format":
-            args["image_format"] = v
-        elif k == "matrixSet":
-            args["tile_matrix"] = v
-        elif k == "typeName":
-            args["typename"] = v
-        else:
-            args[k] = v
-
-    if protocol == "wms":
-        datasource = WmsSource(**args)
-    elif protocol == "wmts":
-        datasource = WmtsSource(**args)
-    elif protocol == "wfs":
-        datasource = WfsSource(**args)
-
-    return datasource
-
-
-def file_datasource(data: dict):
-    """
-    Creates file source(s) from the data dictionary.
-    """
-    if data is None:
-        return
+    attributes = dict(item["attributes"])
+    relationships = item.get("relationships", dict())
+
+    datasets = list()
+    items = relationships.get("datasetCollectionItems", dict())
+    for i in items.get("data", None) or list():
+        collection_item = lookup_table.get((i["type"], i["id"]), None)
+        if collection_item is None:
+            continue
 
-    files = list()
-    for item in data:
-        url = item.get("url", None)
-        type_info = item.get("fileSourceType", None)
+        dataset = collection_item.get("dataset", None)
+        if dataset is not None and dataset.get("data", None) is not None:
+            datasets.append(dataset["data"]["id"])
 
-        file_type = None
-        if type_info is not None:
-            file_type = type_info.get("name", None)
+    attributes["datasets"] = datasets if datasets else None
 
-        files.append(FileSource(url, file_type))
+    thumbnail = relationships.get("thumbnail", dict())
+    attributes["thumbnail"] = resource(
+        thumbnail.get("data", None), lookup_table
+    )
 
-    return files
+    return attributes
 
 
-def icon(icon_file: str, url: Union[str, None]) -> QIcon:
+def file_type(data: dict) -> Union[str, None]:
     """
-    Returns an icon from the icon_file if it is exists, otherwise tries to
-    fetch icon from the given url. If url is not set or request fails
-    a default icon will be returned. Fetched icon cached as a .png file.
+    Returns name of the file type of the file source or None if file type
+    is not set.
     """
-    if os.path.exists(icon_file):
-        return QIcon(icon_file)
-
-    if url is None:
+    type_info = data.get("fileSourceType", None)
+    if type_info is None:
         return None
 
-    # download icon
-    request = QgsBlockingNetworkRequest()
-    result = request.get(QNetworkRequest(QUrl(url)))
-    if result == QgsBlockingNetworkRequest.NoError:
-        data = request.reply().content()
-        with open(icon_file, "wb") as f:
-            f.write(data)
-
-        return QIcon(icon_file)
-
-    return None
+    return type_info.get("name", None)
@@ -83,6 +83,8 @@ class ModelNode:
     def __init__(self):
         self.parent = None
         self.children = list()
+        # child category nodes indexed by the category name
+        self.category_nodes = dict()
         self.node_type = NodeType.NodeCategory
 
     def get_child_category_node(
@@ -93,11 +95,7 @@ class ModelNode:
         to a category node with the given category name. Returns None if no
         matching child category node was found.
         """
-        for node in self.children:
-            if node.node_type == NodeType.NodeCategory:
-                if node.category == category:
-                    return node
-        return None
+        return self.category_nodes.get(category, None)
 
     def add_child_node(self, node: Type[ModelNode]):
         """
@@ -108,12 +106,27 @@ class ModelNode:
 
         node.parent = self
         self.children.append(node)
+        if node.node_type == NodeType.NodeCategory:
+            self.category_nodes.setdefault(node.category, node)
+
+    def remove_child_node(self, row: int):
+        """
+        Removes child node at the given row from this node.
+        """
+        node = self.children.pop(row)
+        node.parent = None
+        if (
+            node.node_type == NodeType.NodeCategory
+            and self.category_nodes.get(node.category, None) is node
+        ):
+            del self.category_nodes[node.category]
 
     def delete_children(self):
         """
         Deletes all child nodes from this node.
         """
         self.children.clear()
+        self.category_nodes.clear()
 
 
 class FavoriteNode(ModelNode):
@@ -153,12 +166,12 @@ class CollectionNode(ModelNode):
     Model node corresponding to a collection of datasets.
     """
 
-    def __init__(self, collection):
+    def __init__(self, collection, icon=None):
         super(CollectionNode, self).__init__()
         self.node_type = NodeType.NodeCollection
         self.collection = collection
         self.title = collection.title
-        self.icon = collection.icon
+        self.icon = icon
 
 
 class DatasetNode(ModelNode):
@@ -190,7 +203,12 @@ class DatasetItemModel(QAbstractItemModel):
 
         self.rebuild()
 
-        self.registry.initialized.connect(self.rebuild)
+        self.registry.datasetsAdded.connect(self.insert_datasets)
+        self.registry.datasetsRemoved.connect(self.remove_datasets)
+        self.registry.datasetsChanged.connect(self.update_datasets)
+        self.registry.collectionsAdded.connect(self.insert_collections)
+        self.registry.collectionsRemoved.connect(self.remove_collections)
+        self.registry.collectionsChanged.connect(self.update_collections)
         self.registry.favoritesChanged.connect(self.repopulate_favorites)
 
     def set_show_collections(self, show_collections):
@@ -291,9 +309,222 @@ class DatasetItemModel(QAbstractItemModel):
         row = node.parent.children.index(node)
         return self.index(row, 0, parent_index)
 
-    def add_dataset(self, dataset: Dataset):
+    def insert_datasets(self, uids: list[str]):
+        """
+        Inserts datasets with the given UIDs into the model without
+        resetting it.
+        """
+        if self.show_collections:
+            # datasets which were not available when collection was added
+            added = set(uids)
+            for node in list(self.root_node.children):
+                if node.node_type != NodeType.NodeCollection:
+                    continue
+                for uid in node.collection.datasets:
+                    if uid in added:
+                        dataset_node = DatasetNode(self.registry.datasets[uid])
+                        self.add_node(node, dataset_node, True)
+        else:
+            for uid in uids:
+                dataset = self.registry.datasets.get(uid, None)
+                if dataset is not None:
+                    self.add_dataset(dataset, True)
+
+        if self.favorite_node is not None:
+            for uid in uids:
+                if uid in self.registry.favorites:
+                    dataset_node = DatasetNode(self.registry.datasets[uid])
+                    self.add_node(self.favorite_node, dataset_node, True)
+
+    def remove_datasets(self, uids: list[str]):
+        """
+        Removes nodes of the datasets with the given UIDs from the model
+        without resetting it. Categories left empty are removed as well.
+        """
+        for nodes in self.find_dataset_nodes(uids).values():
+            for node in nodes:
+                self.remove_dataset_node(node)
+
+    def update_datasets(self, uids: list[str]):
+        """
+        Updates nodes of the datasets with the given UIDs from the data
+        registry. Datasets which moved to another category or owner are
+        removed and inserted again, other datasets are updated in place.
+        """
+        for uid, nodes in self.find_dataset_nodes(uids).items():
+            dataset = self.registry.datasets[uid]
+
+            regroup = False
+            for node in nodes:
+                if self.is_grouping_node(node.parent):
+                    if self.mode == Mode.GroupCategories:
+                        regroup = node.dataset.category != dataset.category
+                    else:
+                        regroup = node.dataset.owners != dataset.owners
+                    break
+
+            for node in nodes:
+                if regroup and self.is_grouping_node(node.parent):
+                    self.remove_dataset_node(node)
+                    continue
+
+                node.dataset = dataset
+                index = self.node2index(node)
+                self.dataChanged.emit(index, index)
+
+                parent_node = node.parent
+                icon = self.registry.category_icon(dataset)
+                if (
+                    self.mode == Mode.GroupCategories
+                    and parent_node is not self.root_node
+                    and parent_node.node_type == NodeType.NodeCategory
+                    and parent_node.icon is not icon
+                ):
+                    parent_node.icon = icon
+                    index = self.node2index(parent_node)
+                    self.dataChanged.emit(index, index)
+
+            if regroup:
+                self.add_dataset(dataset, True)
+
+    def insert_collections(self, uids: list[str]):
+        """
+        Inserts collections with the given UIDs into the model without
+        resetting it.
+        """
+        if not self.show_collections:
+            return
+
+        for uid in uids:
+            collection = self.registry.collections.get(uid, None)
+            if collection is not None:
+                self.add_collection(collection, True)
+
+    def remove_collections(self, uids: list[str]):
+        """
+        Removes nodes of the collections with the given UIDs from the model
+        without resetting it.
+        """
+        if not self.show_collections:
+            return
+
+        removed = set(uids)
+        for node in list(self.root_node.children):
+            if (
+                node.node_type == NodeType.NodeCollection
+                and node.collection.uid in removed
+            ):
+                self.remove_node(node)
+
+    def update_collections(self, uids: list[str]):
+        """
+        Updates nodes of the collections with the given UIDs from the data
+        registry. Collections whose datasets did not change are updated in
+        place, other collections are removed and inserted again.
+        """
+        if not self.show_collections:
+            return
+
+        updated = set(uids)
+        replaced = list()
+        for node in list(self.root_node.children):
+            if (
+                node.node_type != NodeType.NodeCollection
+                or node.collection.uid not in updated
+            ):
+                continue
+
+            collection = self.registry.collections[node.collection.uid]
+            if collection.datasets != node.collection.datasets:
+                replaced.append(collection.uid)
+                continue
+
+            node.collection = collection
+            node.title = collection.title
+            node.icon = self.registry.collection_icon(collection)
+            index = self.node2index(node)
+            self.dataChanged.emit(index, index)
+
+        if replaced:
+            self.remove_collections(replaced)
+            self.insert_collections(replaced)
+
+    def find_dataset_nodes(
+        self, uids: list[str]
+    ) -> dict[str, list[DatasetNode]]:
+        """
+        Returns all nodes corresponding to the datasets with the given UIDs,
+        including nodes within favorites and collections.
+        """
+        uids = set(uids)
+        found = dict()
+
+        nodes = list(self.root_node.children)
+        while nodes:
+            node = nodes.pop()
+            if node.node_type == NodeType.NodeDataset:
+                if node.dataset.uid in uids:
+                    found.setdefault(node.dataset.uid, list()).append(node)
+            else:
+                nodes.extend(node.children)
+
+        return found
+
+    def is_grouping_node(self, node: Type[ModelNode]) -> bool:
         """
-        Creates a node for a dataset and adds it to the model.
+        Returns True if node is the root node or a category/owner node,
+        i.e. a node which groups datasets by their attributes.
+        """
+        return node is self.root_node or node.node_type == NodeType.NodeCategory
+
+    def remove_dataset_node(self, node: DatasetNode):
+        """
+        Removes a dataset node from the model. If its parent category
+        becomes empty, it is removed as well.
+        """
+        parent_node = node.parent
+        self.remove_node(node)
+
+        if (
+            parent_node is not self.root_node
+            and parent_node.node_type == NodeType.NodeCategory
+            and not parent_node.children
+        ):
+            self.remove_node(parent_node)
+
+    def add_node(
+        self,
+        parent_node: Type[ModelNode],
+        node: Type[ModelNode],
+        notify: bool = False,
+    ):
+        """
+        Adds a node to the given parent node. If notify is True, views are
+        notified about inserted row.
+        """
+        if notify:
+            row = len(parent_node.children)
+            self.beginInsertRows(self.node2index(parent_node), row, row)
+
+        parent_node.add_child_node(node)
+
+        if notify:
+            self.endInsertRows()
+
+    def remove_node(self, node: Type[ModelNode]):
+        """
+        Removes a node from its parent and notifies views about removed row.
+        """
+        parent_node = node.parent
+        row = parent_node.children.index(node)
+        self.beginRemoveRows(self.node2index(parent_node), row, row)
+        parent_node.remove_child_node(row)
+        self.endRemoveRows()
+
+    def add_dataset(self, dataset: Dataset, notify: bool = False):
+        """
+        Creates a node for a dataset and adds it to the model. If notify is
+        True, views are notified about inserted rows.
         """
         parent_node = self.root_node
 
@@ -303,13 +534,17 @@ class DatasetItemModel(QAbstractItemModel):
             if category != "":
                 category_node = parent_node.get_child_category_node(category)
                 if category_node is None:
+                    # new category is added together with its first dataset,
+                    # so it is not filtered out as empty by the proxy model
                     category_node = CategoryNode(
-                        category, dataset.category_icon
+                        category, self.registry.category_icon(dataset)
                     )
-                    parent_node.add_child_node(category_node)
-                category_node.add_child_node(dataset_node)
+                    category_node.add_child_node(dataset_node)
+                    self.add_node(parent_node, category_node, notify)
+                else:
+                    self.add_node(category_node, dataset_node, notify)
             else:
-                parent_node.add_child_node(dataset_node)
+                self.add_node(parent_node, dataset_node, notify)
         elif self.mode == Mode.GroupOwners:
             for owner in dataset.owners:
                 dataset_node = DatasetNode(dataset)
@@ -317,23 +552,28 @@ class DatasetItemModel(QAbstractItemModel):
                     owner_node = parent_node.get_child_category_node(owner)
                     if owner_node is None:
                         owner_node = CategoryNode(owner)
-                        parent_node.add_child_node(owner_node)
-                    owner_node.add_child_node(dataset_node)
+                        owner_node.add_child_node(dataset_node)
+                        self.add_node(parent_node, owner_node, notify)
+                    else:
+                        self.add_node(owner_node, dataset_node, notify)
                 else:
-                    parent_node.add_child_node(dataset_node)
+                    self.add_node(parent_node, dataset_node, notify)
 
-    def add_collection(self, collection: Collection):
+    def add_collection(self, collection: Collection, notify: bool = False):
         """
-        Creates a node for a collection and adds it to the model.
+        Creates a node for a collection and adds it to the model. If notify
+        is True, views are notified about inserted row.
         """
         parent_node = self.root_node
 
-        collection_node = CollectionNode(collection)
+        collection_node = CollectionNode(
+            collection, self.registry.collection_icon(collection)
+        )
         for ds in collection.datasets:
             if ds in self.registry.datasets:
                 dataset_node = DatasetNode(self.registry.datasets[ds])
                 collection_node.add_child_node(dataset_node)
-        parent_node.add_child_node(collection_node)
+        self.add_node(parent_node, collection_node, notify)
 
     def tooltip_for_dataset(self, dataset: Dataset) -> str:
         """
@@ -413,7 +653,7 @@ class DatasetItemModel(QAbstractItemModel):
                     elif dataset.status == "partly":
                         return QgsApplication.getThemeIcon("/mIconWarning.svg")
                     else:
-                        return dataset.thumbnail
+                        return self.registry.dataset_icon(dataset)
                 elif node.node_type == NodeType.NodeCategory:
                     return PLUGIN_ICON if node.icon is None else node.icon
                 elif node.node_type == NodeType.NodeCollection:
@@ -580,6 +820,8 @@ class DatasetProxyModel(QSortFilterProxyModel):
         self.model = DatasetItemModel(self, registry)
         self.filter_string = ""
         self.filters = None
+        # datasets matching the filter parts, found by the catalogue store
+        self.matches = dict()
 
         self.setSourceModel(self.model)
         self.setDynamicSortFilter(True)
@@ -588,6 +830,12 @@ class DatasetProxyModel(QSortFilterProxyModel):
         self.sort(0)
 
         self.model.favoriteAdded.connect(self.invalidateFilter)
+        # connected after the source model, so rows it inserted or updated
+        # with stale matches are filtered again
+        self.model.registry.initialized.connect(self.clear_matches)
+        self.model.registry.datasetsAdded.connect(self.clear_matches)
+        self.model.registry.datasetsRemoved.connect(self.clear_matches)
+        self.model.registry.datasetsChanged.connect(self.clear_matches)
 
     def datasets_model(self) -> DatasetItemModel:
         """
@@ -609,8 +857,34 @@ class DatasetProxyModel(QSortFilterProxyModel):
         including checking against the dataset title, description, tags, etc.
         """
         self.filter_string = filter_string
+        self.matches.clear()
         self.invalidateFilter()
 
+    def clear_matches(self, *args):
+        """
+        Clears datasets found by the catalogue store, after the catalogue
+        was changed, and applies the filter again. This also shows
+        categories which were hidden before and contain matching datasets
+        now.
+        """
+        self.matches.clear()
+        if self.filter_string.strip() != "":
+            self.invalidateFilter()
+
+    def search(self, parts: tuple[str]) -> Union[set[str], None]:
+        """
+        Returns UIDs of the datasets matching all the given parts, as found
+        by the catalogue store. Returns None if catalogue store is not
+        available.
+        """
+        if parts not in self.matches:
+            matches = self.model.registry.search(" ".join(parts))
+            if matches is None:
+                return None
+            self.matches[parts] = matches
+
+        return self.matches[parts]
+
     def filterAcceptsRow(
         self, source_row: int, source_parent: QModelIndex
     ) -> bool:
@@ -642,6 +916,25 @@ class DatasetProxyModel(QSortFilterProxyModel):
 
                 parts_to_match = self.filter_string.strip().split(" ")
 
+                # parts which are not matched by the parent nodes have to be
+                # matched by the dataset itself, which can be looked up in
+                # the catalogue store instead of testing every dataset
+                remaining = tuple(
+                    part
+                    for part in parts_to_match
+                    if not any(
+                        part.lower() in text.lower() for text in parent_text
+                    )
+                )
+                if not remaining:
+                    parts_to_match = list()
+                else:
+                    matches = self.search(remaining)
+                    if matches is not None:
+                        if ds_uid not in matches:
+                            return False
+                        parts_to_match = list()
+
                 parts_to_search = (
                     self.sourceModel()
                     .data(source_index, Qt.ItemDataRole.DisplayRole)
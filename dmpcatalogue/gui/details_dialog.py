@@ -63,12 +63,16 @@ class DetailsDialog(BASE, WIDGET):
 
         if dataset.tags:
             info += '<tr><td class="highlight">' + self.tr("Tags")
-            info += "</td><td>" + QgsHtmlUtils.buildBulletList(dataset.tags)
+            info += "</td><td>" + QgsHtmlUtils.buildBulletList(
+                list(dataset.tags)
+            )
             info += "</td></tr>\n"
 
         if dataset.owners:
             info += '<tr><td class="highlight">' + self.tr("Owners")
-            info += "</td><td>" + QgsHtmlUtils.buildBulletList(dataset.owners)
+            info += "</td><td>" + QgsHtmlUtils.buildBulletList(
+                list(dataset.owners)
+            )
             info += "</td></tr>\n"
 
         info += "</table>\n<br><br>"
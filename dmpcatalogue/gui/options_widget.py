@@ -15,12 +15,13 @@ import os
 
 from qgis.PyQt import uic
 from qgis.PyQt.QtCore import Qt
-from qgis.PyQt.QtWidgets import QHBoxLayout
+from qgis.PyQt.QtWidgets import QFileDialog, QHBoxLayout, QMessageBox
 
 from qgis.core import QgsApplication
 from qgis.gui import QgsOptionsWidgetFactory, QgsOptionsPageWidget
 
 from dmpcatalogue.core.data_registry import DATA_REGISTRY
+from dmpcatalogue.core.metrics import METRICS
 from dmpcatalogue.core.settings_registry import SettingsRegistry
 from dmpcatalogue.constants import PLUGIN_PATH, PLUGIN_ICON
 
@@ -38,7 +39,12 @@ class DmpOptionsWidget(BASE, WIDGET):
         super(DmpOptionsWidget, self).__init__(parent)
         self.setupUi(self)
 
+        self.refresh_metrics_button.clicked.connect(self.show_metrics)
+        self.reset_metrics_button.clicked.connect(self.reset_metrics)
+        self.export_metrics_button.clicked.connect(self.export_metrics)
+
         self.load_options()
+        self.show_metrics()
 
     def load_options(self):
         self.url_line_edit.setText(SettingsRegistry.catalog_url())
@@ -64,6 +70,25 @@ class DmpOptionsWidget(BASE, WIDGET):
         self.request_bbox_checkbox.setChecked(
             SettingsRegistry.use_request_bbox()
         )
+        self.stale_while_revalidate_checkbox.setChecked(
+            SettingsRegistry.stale_while_revalidate()
+        )
+        self.status_poll_spinbox.setValue(
+            SettingsRegistry.status_poll_interval()
+        )
+        self.thumbnail_cache_spinbox.setValue(
+            SettingsRegistry.thumbnail_cache_size()
+        )
+        self.catalogue_store_checkbox.setChecked(
+            SettingsRegistry.use_catalogue_store()
+        )
+        self.delta_sync_checkbox.setChecked(SettingsRegistry.delta_sync())
+        self.parallel_parsing_checkbox.setChecked(
+            SettingsRegistry.parallel_parsing()
+        )
+        self.tolerant_parsing_checkbox.setChecked(
+            SettingsRegistry.tolerant_parsing()
+        )
 
     def accept(self):
         old_url = SettingsRegistry.catalog_url()
@@ -101,6 +126,110 @@ class DmpOptionsWidget(BASE, WIDGET):
             self.request_bbox_checkbox.isChecked()
         )
 
+        SettingsRegistry.set_stale_while_revalidate(
+            self.stale_while_revalidate_checkbox.isChecked()
+        )
+
+        old_interval = SettingsRegistry.status_poll_interval()
+        SettingsRegistry.set_status_poll_interval(
+            self.status_poll_spinbox.value()
+        )
+        if old_interval != self.status_poll_spinbox.value():
+            DATA_REGISTRY.schedule_status_poll(True)
+
+        size = self.thumbnail_cache_spinbox.value()
+        SettingsRegistry.set_thumbnail_cache_size(size)
+        DATA_REGISTRY.thumbnail_store.set_budget(size * 1024 * 1024)
+
+        SettingsRegistry.set_use_catalogue_store(
+            self.catalogue_store_checkbox.isChecked()
+        )
+
+        SettingsRegistry.set_delta_sync(self.delta_sync_checkbox.isChecked())
+        SettingsRegistry.set_parallel_parsing(
+            self.parallel_parsing_checkbox.isChecked()
+        )
+        SettingsRegistry.set_tolerant_parsing(
+            self.tolerant_parsing_checkbox.isChecked()
+        )
+
+    def show_metrics(self):
+        """
+        Shows summary of the collected network and parsing metrics and
+        of the catalogue records skipped while parsing.
+        """
+        metrics = METRICS.snapshot()
+
+        lines = [self.tr("Requests")]
+        for endpoint, entry in sorted(metrics["requests"].items()):
+            statuses = ", ".join(
+                f"{status}: {count}"
+                for status, count in sorted(entry["statuses"].items())
+            )
+            lines.append(
+                self.tr(
+                    "  {}: {} requests, {} failed, {:.1f} kB, "
+                    "avg {:.2f} s, max {:.2f} s"
+                ).format(
+                    endpoint,
+                    entry["count"],
+                    entry["errors"],
+                    entry["bytes"] / 1024,
+                    entry["avg_time"],
+                    entry["max_time"],
+                )
+                + (f" ({statuses})" if statuses else "")
+            )
+
+        lines.append(self.tr("Caches"))
+        for cache, entry in sorted(metrics["caches"].items()):
+            lines.append(
+                self.tr("  {}: {} hits, {} misses").format(
+                    cache, entry["hits"], entry["misses"]
+                )
+            )
+
+        lines.append(self.tr("Timings"))
+        for operation, entry in sorted(metrics["timings"].items()):
+            lines.append(
+                self.tr("  {}: {} runs, avg {:.2f} s, max {:.2f} s").format(
+                    operation,
+                    entry["count"],
+                    entry["avg_time"],
+                    entry["max_time"],
+                )
+            )
+
+        if DATA_REGISTRY.parse_errors:
+            lines.append(self.tr("Skipped records"))
+            for error in DATA_REGISTRY.parse_errors:
+                lines.append(f"  {error.kind} {error.uid}: {error.reason}")
+
+        self.diagnostics_text.setPlainText("\n".join(lines))
+
+    def reset_metrics(self):
+        METRICS.reset()
+        self.show_metrics()
+
+    def export_metrics(self):
+        file_name, _ = QFileDialog.getSaveFileName(
+            self,
+            self.tr("Export metrics"),
+            "dmpcatalogue_metrics.json",
+            self.tr("JSON files (*.json)"),
+        )
+        if not file_name:
+            return
+
+        try:
+            METRICS.export(file_name)
+        except OSError as e:
+            QMessageBox.warning(
+                self,
+                self.tr("Export metrics"),
+                self.tr("Metrics could not be exported: {}").format(e),
+            )
+
 
 class DmpOptionsFactory(QgsOptionsWidgetFactory):
     def __init__(self):
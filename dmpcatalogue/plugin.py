@@ -86,6 +86,7 @@ class DmpPlugin:
 
         DATA_REGISTRY.initialize()
         DATA_REGISTRY.requestFailed.connect(self.report_error)
+        DATA_REGISTRY.recordsSkipped.connect(self.report_skipped_records)
 
     def unload(self):
         self.iface.removePluginWebMenu(
@@ -104,6 +105,13 @@ class DmpPlugin:
 
         self.iface.unregisterOptionsWidgetFactory(self.options_factory)
 
+        # registry and icons are shared by the whole process, they would
+        # outlive the plugin otherwise
+        DATA_REGISTRY.stop_status_poll()
+        DATA_REGISTRY.requestFailed.disconnect(self.report_error)
+        DATA_REGISTRY.recordsSkipped.disconnect(self.report_skipped_records)
+        DATA_REGISTRY.release_icons(True)
+
     def toggle_dock_action(self, visible):
         self.dock_action.setChecked(visible)
 
@@ -126,5 +134,13 @@ class DmpPlugin:
             self.tr("DMP Catalogue"), message, Qgis.Warning
         )
 
+    def report_skipped_records(self, errors):
+        self.report_error(
+            self.tr(
+                "{} catalogue records could not be read and were skipped, "
+                "see Diagnostics in the plugin settings"
+            ).format(len(errors))
+        )
+
     def tr(self, text):
         return QCoreApplication.translate(self.__class__.__name__, text)
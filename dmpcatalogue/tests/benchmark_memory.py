@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Measures memory used by the dataset objects of synthetic catalogues. Run
+with
+
+    python -m dmpcatalogue.tests.benchmark_memory [SIZE ...]
+
+Compares the current compact representation with the previous one, which
+is reproduced here: regular dataclasses with instance dictionaries, lists,
+icon references and datasource objects created for every dataset.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Union
+import os
+import gc
+import sys
+import shutil
+import tempfile
+import tracemalloc
+from dataclasses import dataclass, field, fields
+
+from dmpcatalogue.tests.synthetic_catalogue import SyntheticCatalogue
+
+DEFAULT_SIZES = [10000, 100000]
+
+
+@dataclass
+class LegacyWmsSource:
+    url: str
+    layer: str
+    style: str
+    image_format: str
+
+
+@dataclass
+class LegacyWmtsSource(LegacyWmsSource):
+    tile_matrix: str
+
+
+@dataclass
+class LegacyWfsSource:
+    url: str
+    typename: str
+
+
+@dataclass
+class LegacyFileSource:
+    url: str
+    file_type: str
+
+
+@dataclass
+class LegacyDataset:
+    uid: str
+    title: str
+    description: str
+    category: str
+    supportContact: str
+    metadata: str
+    created: str
+    updated: str
+    tags: list[str]
+    owners: list[str]
+    status: str
+    thumbnail: object = field(compare=False)
+    category_icon: object = field(compare=False)
+    wms: LegacyWmsSource
+    wmts: LegacyWmtsSource
+    wfs: LegacyWfsSource
+    files: list[LegacyFileSource]
+    thumbnail_record: Union[tuple[str, str], None] = None
+    category_thumbnail_record: Union[tuple[str, str], None] = None
+
+
+LEGACY_SOURCES = {
+    "wms": LegacyWmsSource,
+    "wmts": LegacyWmtsSource,
+    "wfs": LegacyWfsSource,
+}
+
+
+def legacy_dataset(dataset, icon) -> LegacyDataset:
+    """
+    Converts dataset into the previous representation, with the shared
+    icon assigned like the data registry did.
+    """
+
+    params = {
+        f.name: getattr(dataset, f.name)
+        for f in fields(LegacyDataset)
+        if f.name
+        not in ("thumbnail", "category_icon", "files", *LEGACY_SOURCES)
+    }
+    # sources are created from the records, so datasources cached by
+    # the dataset are not counted
+    for protocol, cls in LEGACY_SOURCES.items():
+        record = getattr(dataset, f"{protocol}_record")
+        params[protocol] = None if record is None else cls(*record)
+    for key in ("tags", "owners"):
+        if params[key] is not None:
+            params[key] = list(params[key])
+    params["files"] = None
+    if dataset.file_records is not None:
+        params["files"] = [LegacyFileSource(*r) for r in dataset.file_records]
+
+    return LegacyDataset(thumbnail=icon, category_icon=icon, **params)
+
+
+def allocated(build: Callable[[], list]) -> int:
+    """
+    Returns number of bytes allocated by the objects created by build and
+    still referenced by the returned list.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    del objects
+    return size
+
+
+def run(sizes: list[int]) -> dict:
+    """
+    Returns bytes per dataset of the previous and the current
+    representation keyed by catalogue size.
+    """
+    from qgis.PyQt.QtGui import QIcon
+
+    from dmpcatalogue.core.data_parser_task import DataParserTask
+    from dmpcatalogue.core.records import ResourceResolver, dataset_record
+    from dmpcatalogue.core.thumbnail_store import ThumbnailStore
+
+    icon = QIcon()
+    results = dict()
+    for size in sizes:
+        cache_dir = tempfile.mkdtemp()
+        try:
+            document = SyntheticCatalogue(size).datasets_document()
+            resolver = ResourceResolver(document["included"])
+            records = [
+                dataset_record(item, resolver) for item in document["data"]
+            ]
+            del document
+
+            task = DataParserTask(
+                ThumbnailStore(os.path.join(cache_dir, "thumbnails"))
+            )
+            # thumbnail lookups are cached by the task, they should not be
+            # counted
+            datasets = [task.create_dataset(record) for record in records]
+
+            current = allocated(
+                lambda: [task.create_dataset(record) for record in records]
+            )
+            previous = allocated(
+                lambda: [legacy_dataset(ds, icon) for ds in datasets]
+            )
+            results[size] = {
+                "previous": previous / size,
+                "current": current / size,
+            }
+        finally:
+            shutil.rmtree(cache_dir)
+
+    return results
+
+
+def main(sizes: list[int]):
+    from qgis.testing import start_app
+
+    start_app()
+
+    print(f"{'datasets':>10} {'previous':>12} {'current':>12} {'saved':>7}")
+    for size, result in run(sizes).items():
+        previous = result["previous"]
+        current = result["current"]
+        print(
+            f"{size:>10} {previous:>10.0f} B {current:>10.0f} B "
+            f"{1 - current / previous:>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Measures time from DataRegistry.initialize() to a populated
+DatasetProxyModel, with the catalogue served by the local stand-in server.
+Run with
+
+    python -m dmpcatalogue.tests.benchmark_registry [SIZE ...]
+
+Latency in seconds and bandwidth in bytes per second of the server can be
+set with BENCHMARK_LATENCY and BENCHMARK_BANDWIDTH environment variables.
+"""
+
+from __future__ import annotations
+
+from typing import Union
+import os
+import sys
+import time
+import shutil
+
+from qgis.PyQt.QtCore import QCoreApplication, QStandardPaths
+
+# keep cache and settings of the benchmark away from the user profile
+QStandardPaths.setTestModeEnabled(True)
+
+from qgis.testing import start_app
+
+QGIS_APP = start_app()
+
+from dmpcatalogue.core.data_registry import DataRegistry
+from dmpcatalogue.core.metrics import METRICS
+from dmpcatalogue.core.settings_registry import SettingsRegistry
+from dmpcatalogue.core.utils import cache_directory
+from dmpcatalogue.gui.dataset_item_model import DatasetProxyModel
+from dmpcatalogue.tests.standin_server import StandInServer
+from dmpcatalogue.tests.synthetic_catalogue import SyntheticCatalogue
+
+TIMEOUT = 600
+
+
+def model_datasets(model, parent=None) -> int:
+    """
+    Returns number of the dataset rows of the model, i.e. leaf rows below
+    the top-level groups.
+    """
+    count = 0
+    rows = model.rowCount() if parent is None else model.rowCount(parent)
+    for row in range(rows):
+        index = (
+            model.index(row, 0)
+            if parent is None
+            else model.index(row, 0, parent)
+        )
+        children = model_datasets(model, index)
+        if children or parent is not None:
+            count += children or 1
+
+    return count
+
+
+def clear_cache():
+    """
+    Removes cached catalogue, so it is fetched from the server.
+    """
+    cache_root = cache_directory()
+    for name in os.listdir(cache_root):
+        path = os.path.join(cache_root, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+
+def wait_until(condition, timeout: float = TIMEOUT) -> bool:
+    """
+    Processes events until the condition is met or timeout expires.
+    """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        QCoreApplication.processEvents()
+        time.sleep(0.001)
+
+    return True
+
+
+def run(
+    catalogue: SyntheticCatalogue,
+    latency: float = 0,
+    bandwidth: Union[int, None] = None,
+    cold: bool = True,
+) -> dict:
+    """
+    Initializes registry from the stand-in server and returns elapsed time
+    until the proxy model was populated, with collected metrics. If cold is
+    True, cache is removed first.
+    """
+    if cold:
+        clear_cache()
+
+    expected = len(catalogue.datasets)
+    catalogue_url = SettingsRegistry.catalog_url()
+    with StandInServer(catalogue, latency, bandwidth) as server:
+        SettingsRegistry.set_catalog_url(server.url)
+        try:
+            registry = DataRegistry()
+            proxy = DatasetProxyModel(registry=registry)
+            METRICS.reset()
+
+            started = time.perf_counter()
+            registry.initialize(not cold)
+            populated = wait_until(
+                lambda: len(registry.datasets) == expected
+                and registry.parse_task is None
+                and not registry.fetch_pending
+            )
+            elapsed = time.perf_counter() - started
+            rows = model_datasets(proxy)
+        finally:
+            SettingsRegistry.set_catalog_url(catalogue_url)
+
+    return {
+        "datasets": expected,
+        "populated": populated,
+        "rows": rows,
+        "elapsed": elapsed,
+        "requests": len(server.requests),
+        "bytes": sum(size for _, _, size in server.requests),
+        "metrics": METRICS.snapshot(),
+    }
+
+
+def main(sizes: list[int]):
+    latency = float(os.environ.get("BENCHMARK_LATENCY", 0))
+    bandwidth = os.environ.get("BENCHMARK_BANDWIDTH", None)
+    bandwidth = int(bandwidth) if bandwidth else None
+
+    print(
+        f"{'datasets':>10} {'cold':>9} {'warm':>9} "
+        f"{'requests':>9} {'MB':>8} {'parse':>8}"
+    )
+    for size in sizes:
+        catalogue = SyntheticCatalogue(size)
+        cold = run(catalogue, latency, bandwidth, True)
+        warm = run(catalogue, latency, bandwidth, False)
+        if not (cold["populated"] and warm["populated"]):
+            print(f"{size:>10} timed out")
+            continue
+
+        parse = cold["metrics"]["timings"].get("parse_datasets", dict())
+        print(
+            f"{size:>10} {cold['elapsed']:>8.2f}s {warm['elapsed']:>8.2f}s "
+            f"{cold['requests']:>9} {cold['bytes'] / 1e6:>8.1f} "
+            f"{parse.get('total_time', 0):>7.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Compares ResourceResolver with lookup_map() and flatten() on synthetic
+JSON API payloads. Run with
+
+    python -m dmpcatalogue.tests.benchmark_resolver [SIZE ...]
+"""
+
+import gc
+import sys
+import time
+
+from dmpcatalogue.core.utils import lookup_map, flatten, ResourceResolver
+from dmpcatalogue.tests.synthetic_catalogue import SyntheticCatalogue
+
+
+def synthetic_payload(size: int) -> dict:
+    """
+    Creates a payload similar to the /datasets reply with the given number
+    of datasets.
+    """
+    return SyntheticCatalogue(size).datasets_document()
+
+
+def measure(func, size: int, repeat: int = 3) -> float:
+    """
+    Returns the best time of several runs of func on a fresh payload.
+    """
+    best = None
+    for _ in range(repeat):
+        content = synthetic_payload(size)
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        func(content)
+        elapsed = time.perf_counter() - start
+        gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def with_lookup_map(content: dict):
+    lookup_table = lookup_map(content["included"], simplify=True)
+    flatten(content["data"], lookup_table)
+    return [item["attributes"].copy() for item in content["data"]]
+
+
+def with_resolver(content: dict):
+    resolver = ResourceResolver(content["included"])
+    return [resolver.resolve(item) for item in content["data"]]
+
+
+def main(sizes: list[int]):
+    print(
+        f"{'datasets':>10} {'lookup_map':>12} {'resolver':>12} {'speedup':>8}"
+    )
+    for size in sizes:
+        old = measure(with_lookup_map, size)
+        new = measure(with_resolver, size)
+        print(f"{size:>10} {old:>11.3f}s {new:>11.3f}s {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or [1000, 10000, 50000])
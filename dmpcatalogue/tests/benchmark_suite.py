@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Times parsing stages on synthetic catalogues of several sizes and compares
+results with the stored baseline. Run with
+
+    python -m dmpcatalogue.tests.benchmark_suite [SIZE ...]
+
+Exits with non-zero status if any stage is slower than the baseline by more
+than the tolerance or if there is no baseline. Run with --update to store
+results as the new baseline. Timings are stored relative to the calibration
+stage, which does not run any plugin code, so the baseline committed with
+the plugin can be compared on any machine, including CI runners.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Union
+import os
+import gc
+import sys
+import copy
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+
+from dmpcatalogue.tests.synthetic_catalogue import SyntheticCatalogue
+
+BASELINE_FILE = os.path.join(
+    os.path.dirname(__file__), "benchmark_baselines.json"
+)
+# allowed slowdown relative to the baseline
+DEFAULT_TOLERANCE = 0.25
+# differences smaller than this number of seconds are considered noise
+MIN_DIFFERENCE = 0.005
+DEFAULT_SIZES = [1000, 10000]
+# stage measuring speed of the machine
+CALIBRATION = "calibration"
+
+
+def measure(setup: Callable[[], Callable[[], None]], repeat: int) -> float:
+    """
+    Returns the best time of several runs. Setup creates the function to
+    time, so every run starts from the same state and preparation is not
+    counted.
+    """
+    best = None
+    for _ in range(repeat):
+        func = setup()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def stages(catalogue: SyntheticCatalogue, cache_dir: str) -> dict:
+    """
+    Returns setup functions of the benchmarked stages for the catalogue
+    written to the cache directory.
+    """
+    from dmpcatalogue.core.data_parser_task import DataParserTask
+    from dmpcatalogue.core.records import dataset_record
+    from dmpcatalogue.core.thumbnail_store import ThumbnailStore
+    from dmpcatalogue.core.utils import (
+        lookup_map,
+        flatten,
+        attribute,
+        ResourceResolver,
+    )
+
+    document = catalogue.datasets_document()
+    resolver = ResourceResolver(document["included"])
+    records = [resolver.resolve(item) for item in document["data"]]
+    lookup_table = lookup_map(document["included"], simplify=True)
+    thumbnails = ThumbnailStore(os.path.join(cache_dir, "thumbnails"))
+    snapshot_file = os.path.join(cache_dir, "catalogue.snapshot")
+
+    def calibration_stage():
+        # plain Python work on the same data, independent of the plugin
+        return lambda: copy.deepcopy(document["data"])
+
+    def lookup_map_stage():
+        return lambda: lookup_map(document["included"], simplify=True)
+
+    def flatten_stage():
+        data = copy.deepcopy(document["data"])
+        return lambda: flatten(data, lookup_table)
+
+    def attribute_stage():
+        def run():
+            for record in records:
+                attribute(record["tags"], "name")
+                attribute(record["owners"], "title")
+                attribute(record["category"], "name")
+
+        return run
+
+    def dataset_record_stage():
+        def run():
+            for item in document["data"]:
+                dataset_record(item, resolver)
+
+        return run
+
+    def parse_stage(snapshot: bool):
+        def setup():
+            if not snapshot and os.path.exists(snapshot_file):
+                os.remove(snapshot_file)
+            task = DataParserTask(thumbnails)
+            return lambda: task.parse(cache_dir, "benchmark")
+
+        return setup
+
+    return {
+        CALIBRATION: calibration_stage,
+        "lookup_map": lookup_map_stage,
+        "flatten": flatten_stage,
+        "attribute": attribute_stage,
+        "dataset_record": dataset_record_stage,
+        "parse": parse_stage(False),
+        "parse_snapshot": parse_stage(True),
+    }
+
+
+def run(sizes: list[int], repeat: int = 3) -> dict:
+    """
+    Times all stages for every catalogue size. Returns dictionary of
+    stage timings in seconds keyed by size.
+    """
+    results = dict()
+    for size in sizes:
+        cache_dir = tempfile.mkdtemp()
+        try:
+            catalogue = SyntheticCatalogue(size)
+            catalogue.write(cache_dir)
+            results[str(size)] = {
+                name: measure(setup, repeat)
+                for name, setup in stages(catalogue, cache_dir).items()
+            }
+        finally:
+            shutil.rmtree(cache_dir)
+
+    return results
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    tolerance: float,
+    min_difference: float = MIN_DIFFERENCE,
+) -> list[str]:
+    """
+    Compares results with the baseline relative to the calibration stage.
+    Baseline is converted to the expected timings on this machine using
+    the calibration stage of the results. Returns descriptions of the
+    stages which are slower than expected by more than the tolerance.
+    Stages and sizes missing from the baseline are not compared.
+    """
+    regressions = list()
+    for size, timings in results.items():
+        calibration = timings.get(CALIBRATION, None)
+        if not calibration:
+            continue
+
+        for name, elapsed in timings.items():
+            ratio = baseline.get(size, dict()).get(name, None)
+            if ratio is None or name == CALIBRATION:
+                continue
+
+            reference = ratio * calibration
+
+            if (
+                elapsed > reference * (1 + tolerance)
+                and elapsed - reference > min_difference
+            ):
+                regressions.append(
+                    f"{name} ({size} datasets): {elapsed:.4f}s, "
+                    f"baseline {reference:.4f}s, "
+                    f"{(elapsed / reference - 1) * 100:+.0f}%"
+                )
+
+    return regressions
+
+
+def relative(results: dict) -> dict:
+    """
+    Returns timings of the stages relative to the calibration stage of
+    the same catalogue size.
+    """
+    return {
+        size: {
+            name: elapsed / timings[CALIBRATION]
+            for name, elapsed in timings.items()
+            if name != CALIBRATION
+        }
+        for size, timings in results.items()
+        if timings.get(CALIBRATION, None)
+    }
+
+
+def load_baseline(file_name: str) -> Union[dict, None]:
+    """
+    Reads stored baseline, timings relative to the calibration stage, or
+    returns None if there is none.
+    """
+    try:
+        with open(file_name, "r", encoding="utf-8") as f:
+            return json.load(f)["results"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_baseline(file_name: str, results: dict):
+    """
+    Stores results as the new baseline. Results are stored relative to
+    the calibration stage.
+    """
+    with open(file_name, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "results": relative(results),
+            },
+            f,
+            indent=2,
+        )
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description="Times parsing stages and compares them with the baseline."
+    )
+    parser.add_argument("sizes", type=int, nargs="*", default=DEFAULT_SIZES)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=float(os.environ.get("BENCHMARK_TOLERANCE", DEFAULT_TOLERANCE)),
+        help="allowed slowdown, 0.25 means 25%%",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--update", action="store_true", help="store results as baseline"
+    )
+    args = parser.parse_args(argv)
+
+    from qgis.testing import start_app
+
+    start_app()
+
+    results = run(args.sizes, args.repeat)
+    for size, timings in results.items():
+        print(f"{size} datasets")
+        for name, elapsed in timings.items():
+            print(f"  {name:<16} {elapsed:>9.4f}s")
+
+    if args.update:
+        save_baseline(args.baseline, results)
+        print(f"Baseline stored in {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline in {args.baseline}, run with --update")
+        return 1
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"Slower than baseline by more than {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"All stages within {args.tolerance:.0%} of the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
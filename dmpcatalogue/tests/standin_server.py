@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Local HTTP stand-in of the catalogue API serving a synthetic catalogue.
+Run it with
+
+    python -m dmpcatalogue.tests.standin_server [SIZE] [PORT]
+
+and set the catalogue URL in the plugin options to the printed URL.
+"""
+
+from __future__ import annotations
+
+from typing import Union
+import sys
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dmpcatalogue.tests.synthetic_catalogue import SyntheticCatalogue
+
+CHUNK_SIZE = 1 << 14
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Serves catalogue endpoints and thumbnails of the stand-in server.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        standin = self.server.standin
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        content, content_type = standin.content(url.path, query)
+        if content is None:
+            self.reply(404, b"", "text/plain")
+            return
+
+        etag = f'"{hashlib.sha1(content).hexdigest()}"'
+        if self.headers.get("If-None-Match", None) == etag:
+            self.reply(304, b"", content_type, etag)
+            return
+
+        self.reply(200, content, content_type, etag)
+
+    def reply(
+        self,
+        status: int,
+        content: bytes,
+        content_type: str,
+        etag: Union[str, None] = None,
+    ):
+        """
+        Sends reply after the configured latency, limited to the configured
+        bandwidth.
+        """
+        standin = self.server.standin
+        if standin.latency:
+            time.sleep(standin.latency)
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+
+        for i in range(0, len(content), CHUNK_SIZE):
+            chunk = content[i : i + CHUNK_SIZE]
+            self.wfile.write(chunk)
+            if standin.bandwidth:
+                time.sleep(len(chunk) / standin.bandwidth)
+
+        standin.log(self.path, status, len(content))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer:
+    """
+    Local HTTP server standing in for the catalogue API. Serves datasets,
+    datasetCollections and datasetAvailabilities endpoints and thumbnails
+    of the given synthetic catalogue under url, with paging, filtering by
+    modification time and conditional requests supported like by the real
+    API.
+
+    Every reply is delayed by latency seconds and sent at most at
+    bandwidth bytes per second, if set. Served requests are recorded in
+    the requests list as (path, status, size) tuples.
+    """
+
+    def __init__(
+        self,
+        catalogue: SyntheticCatalogue,
+        latency: float = 0,
+        bandwidth: Union[int, None] = None,
+        port: int = 0,
+    ):
+        self.catalogue = catalogue
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = list()
+        self.lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+        self.server.daemon_threads = True
+        self.server.standin = self
+        self.thread = None
+
+        root = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.url = f"{root}/api"
+        catalogue.thumbnail_url = f"{root}/thumbnails"
+
+    def __enter__(self) -> StandInServer:
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        """
+        Starts serving requests in a background thread.
+        """
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the server.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def log(self, path: str, status: int, size: int):
+        """
+        Records served request.
+        """
+        with self.lock:
+            self.requests.append((path, status, size))
+
+    def content(
+        self, path: str, query: dict[str, str]
+    ) -> tuple[Union[bytes, None], str]:
+        """
+        Returns content and content type of the reply to the request with
+        the given path and query. Content is None if there is nothing to
+        serve at the path.
+        """
+        catalogue = self.catalogue
+        name = path.rstrip("/").rsplit("/", 1)[-1]
+
+        if path.startswith("/thumbnails/"):
+            tid = name.rsplit(".", 1)[0]
+            return catalogue.thumbnail_image(tid), "image/png"
+
+        if name == "datasets":
+            page = query.get("page[number]", None)
+            size = query.get("page[size]", None)
+            document = catalogue.datasets_document(
+                int(page) if page is not None else None,
+                int(size) if size is not None else None,
+                query.get("filter[updated][ge]", None),
+                query.get("fields[datasets]", None) == "updated",
+            )
+        elif name == "datasetCollections":
+            document = catalogue.collections_document()
+        elif name == "datasetAvailabilities":
+            document = catalogue.status_document()
+        else:
+            return None, "text/plain"
+
+        content = json.dumps(document, ensure_ascii=False).encode("utf-8")
+        return content, "application/vnd.api+json"
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    server = StandInServer(SyntheticCatalogue(size), port=port)
+    print(f"Serving {size} datasets at {server.url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.server.server_close()
@@ -0,0 +1,525 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Generates synthetic catalogues of any size for tests and benchmarks.
+Write replies of all endpoints to a directory with
+
+    python -m dmpcatalogue.tests.synthetic_catalogue DIRECTORY [SIZE]
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Union
+import os
+import sys
+import json
+import zlib
+import random
+import struct
+from itertools import accumulate
+from datetime import datetime, timedelta, timezone
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%SZ"
+BASE_TIME = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+FILE_FORMATS = ["Shapefile", "TAB", "GeoPackage", "CSV", "GML"]
+STATUSES = ["available"] * 18 + ["partly", "unavailable"]
+WORDS = [f"word{i}" for i in range(5000)]
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> list[float]:
+    """
+    Returns weights of the items in order of their popularity, so a few
+    items are used often and most of them only rarely, as it is with tags
+    and owners of the real catalogue.
+    """
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+
+def png_image(seed: int, size: int = 64) -> bytes:
+    """
+    Creates PNG image of the given size filled with a color derived from
+    the seed.
+    """
+    color = bytes([(seed * 67) % 256, (seed * 131) % 256, (seed * 197) % 256])
+    raw = (b"\x00" + color * size) * size
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        content = kind + data
+        return (
+            struct.pack(">I", len(data))
+            + content
+            + struct.pack(">I", zlib.crc32(content) & 0xFFFFFFFF)
+        )
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+class SyntheticCatalogue:
+    """
+    Synthetic catalogue producing JSON API documents in the shape of the
+    replies of the catalogue API endpoints: datasets, datasetCollections
+    and datasetAvailabilities.
+
+    Number of tags, owners, categories and collections defaults to values
+    growing with the number of datasets, in proportions similar to the real
+    catalogue. Tags and owners are assigned with Zipf-like popularity. The
+    same parameters and seed always produce the same catalogue.
+
+    Thumbnails are referenced by URL under thumbnail_url, which should be
+    set to the location serving thumbnail_image() before the documents are
+    created.
+    """
+
+    def __init__(
+        self,
+        datasets: int = 1000,
+        tags: Union[int, None] = None,
+        owners: Union[int, None] = None,
+        categories: Union[int, None] = None,
+        collections: Union[int, None] = None,
+        collection_size: int = 12,
+        thumbnail_share: float = 0.3,
+        seed: int = 0,
+    ):
+        self.rng = random.Random(seed)
+        self.weights = dict()
+        self.thumbnail_url = "http://127.0.0.1/thumbnails"
+
+        self.tags = [
+            {
+                "type": "tags",
+                "id": f"tag-{i}",
+                "attributes": {"name": f"tag {i}"},
+            }
+            for i in range(tags or max(20, datasets // 25))
+        ]
+        self.owners = [
+            {
+                "type": "organizations",
+                "id": f"org-{i}",
+                "attributes": {
+                    "title": f"Organization {i}",
+                    "abbreviation": f"ORG{i}",
+                    "attribution": None,
+                    "url": None,
+                    "created": BASE_TIME.strftime(TIME_FORMAT),
+                    "updated": BASE_TIME.strftime(TIME_FORMAT),
+                    "description": None,
+                },
+            }
+            for i in range(owners or max(5, datasets // 100))
+        ]
+        self.categories = [
+            {
+                "type": "categories",
+                "id": f"cat-{i}",
+                "attributes": {"name": f"Category {i}"},
+                "relationships": {
+                    "thumbnail": {
+                        "data": {"type": "thumbnails", "id": f"thumb-cat-{i}"}
+                    }
+                },
+            }
+            for i in range(categories or min(40, max(5, datasets // 50)))
+        ]
+        self.file_types = [
+            {
+                "type": "fileSourceTypes",
+                "id": f"ft-{i}",
+                "attributes": {"name": name},
+            }
+            for i, name in enumerate(FILE_FORMATS)
+        ]
+        self.thumbnails = {
+            f"thumb-cat-{i}" for i in range(len(self.categories))
+        }
+
+        self.datasets = list()
+        self.sources = dict()
+        self.statuses = dict()
+        for i in range(datasets):
+            self.add_dataset(i, thumbnail_share)
+
+        self.collections = list()
+        self.collection_items = dict()
+        count = collections
+        if count is None:
+            count = max(2, datasets // 250)
+        for i in range(count):
+            self.add_collection(i, collection_size)
+
+        self.shared = {
+            (item["type"], item["id"]): item
+            for item in self.tags
+            + self.owners
+            + self.categories
+            + self.file_types
+        }
+
+    def timestamp(self) -> str:
+        """
+        Returns random modification time within the first year of the
+        catalogue.
+        """
+        offset = timedelta(seconds=self.rng.randrange(365 * 24 * 3600))
+        return (BASE_TIME + offset).strftime(TIME_FORMAT)
+
+    def add_dataset(self, i: int, thumbnail_share: float):
+        """
+        Creates dataset with the given index and its data sources.
+        """
+        rng = self.rng
+        uid = f"urn:dmp:ds:synthetic-{i}"
+        relationships = dict()
+        sources = list()
+
+        for protocol, share, attributes in (
+            (
+                "wms",
+                0.8,
+                {"layer": f"layer_{i}", "style": None, "format": "image/png"},
+            ),
+            ("wfs", 0.6, {"typeName": f"ns:layer_{i}", "version": "2.0.0"}),
+            (
+                "wmts",
+                0.1,
+                {
+                    "layer": f"layer_{i}",
+                    "style": "default",
+                    "format": "image/png",
+                    "matrixSet": "KortforsyningTilingDK",
+                },
+            ),
+        ):
+            key = f"{protocol}Source"
+            if rng.random() >= share:
+                relationships[key] = {"data": None}
+                continue
+
+            source = {
+                "type": f"{protocol}Sources",
+                "id": f"{protocol}-{i}",
+                "attributes": {
+                    "url": f"https://example.com/{protocol}",
+                    "documentationUrl": None,
+                    "description": None,
+                    **attributes,
+                },
+            }
+            sources.append(source)
+            relationships[key] = {
+                "data": {"type": source["type"], "id": source["id"]}
+            }
+
+        files = list()
+        for j in range(rng.choice([0, 0, 1, 2, 3])):
+            file_type = self.file_types[j % len(self.file_types)]
+            source = {
+                "type": "fileSources",
+                "id": f"file-{i}-{j}",
+                "attributes": {
+                    "url": f"https://example.com/download/{i}_{j}.zip",
+                    "documentationUrl": None,
+                    "description": None,
+                },
+                "relationships": {
+                    "fileSourceType": {
+                        "data": {
+                            "type": "fileSourceTypes",
+                            "id": file_type["id"],
+                        }
+                    }
+                },
+            }
+            sources.append(source)
+            files.append({"type": "fileSources", "id": source["id"]})
+        relationships["fileSources"] = {"data": files}
+
+        tags = self.pick(self.tags, rng.randint(1, 8))
+        owners = self.pick(self.owners, 1 if rng.random() < 0.85 else 2)
+        category = self.pick(self.categories, 1)[0]
+        relationships["tags"] = {"data": tags}
+        relationships["owners"] = {"data": owners}
+        relationships["category"] = {"data": category}
+
+        thumbnail = None
+        if rng.random() < thumbnail_share:
+            thumbnail = {"type": "thumbnails", "id": f"thumb-{i}"}
+            self.thumbnails.add(thumbnail["id"])
+        relationships["thumbnail"] = {"data": thumbnail}
+
+        created = self.timestamp()
+        self.datasets.append(
+            {
+                "type": "datasets",
+                "id": uid,
+                "attributes": {
+                    "title": f"Synthetic dataset {i}",
+                    "description": " ".join(
+                        rng.choices(WORDS, k=rng.randint(10, 60))
+                    ),
+                    "supportContact": "support@example.com",
+                    "metadata": None,
+                    "created": created,
+                    "updated": max(created, self.timestamp()),
+                },
+                "relationships": relationships,
+            }
+        )
+        self.sources[uid] = sources
+        self.statuses[uid] = rng.choice(STATUSES)
+
+    def add_collection(self, i: int, size: int):
+        """
+        Creates collection with the given index, containing randomly chosen
+        datasets.
+        """
+        count = min(len(self.datasets), self.rng.randint(2, 2 * size))
+        datasets = self.rng.sample(self.datasets, count)
+        items = [
+            {
+                "type": "datasetCollectionItems",
+                "id": f"item-{i}-{j}",
+                "attributes": {"order": j},
+                "relationships": {
+                    "dataset": {"data": {"type": "datasets", "id": ds["id"]}}
+                },
+            }
+            for j, ds in enumerate(datasets)
+        ]
+        self.collection_items[f"col-{i}"] = (items, datasets)
+        self.collections.append(
+            {
+                "type": "datasetCollections",
+                "id": f"col-{i}",
+                "attributes": {
+                    "title": f"Synthetic collection {i}",
+                    "description": f"Collection of {count} datasets",
+                    "created": BASE_TIME.strftime(TIME_FORMAT),
+                    "updated": BASE_TIME.strftime(TIME_FORMAT),
+                },
+                "relationships": {
+                    "datasetCollectionItems": {
+                        "data": [
+                            {"type": item["type"], "id": item["id"]}
+                            for item in items
+                        ]
+                    }
+                },
+            }
+        )
+
+    def pick(self, resources: list[dict], count: int) -> list[dict]:
+        """
+        Returns references to distinct resources chosen with Zipf-like
+        popularity.
+        """
+        count = min(count, len(resources))
+        weights = self.weights.get(id(resources), None)
+        if weights is None:
+            weights = list(accumulate(zipf_weights(len(resources))))
+            self.weights[id(resources)] = weights
+
+        chosen = list()
+        while len(chosen) < count:
+            item = self.rng.choices(resources, cum_weights=weights)[0]
+            if item not in chosen:
+                chosen.append(item)
+        return [{"type": item["type"], "id": item["id"]} for item in chosen]
+
+    def thumbnail(self, tid: str) -> dict:
+        """
+        Returns thumbnail resource with the given id.
+        """
+        return {
+            "type": "thumbnails",
+            "id": tid,
+            "attributes": {"url": f"{self.thumbnail_url}/{tid}.png"},
+        }
+
+    def thumbnail_image(self, tid: str) -> Union[bytes, None]:
+        """
+        Returns content of the thumbnail with the given id or None if there
+        is no such thumbnail.
+        """
+        if tid not in self.thumbnails:
+            return None
+
+        return png_image(zlib.crc32(tid.encode("utf-8")))
+
+    def included(self, datasets: Iterable[dict]) -> list[dict]:
+        """
+        Returns resources related to the given datasets, each of them once.
+        """
+        included = dict()
+        for ds in datasets:
+            for source in self.sources[ds["id"]]:
+                included[(source["type"], source["id"])] = source
+                file_type = source.get("relationships", dict()).get(
+                    "fileSourceType", None
+                )
+                if file_type is not None:
+                    key = (file_type["data"]["type"], file_type["data"]["id"])
+                    included[key] = self.shared[key]
+
+            relationships = ds["relationships"]
+            for name in ("tags", "owners"):
+                for ref in relationships[name]["data"]:
+                    key = (ref["type"], ref["id"])
+                    included[key] = self.shared[key]
+
+            ref = relationships["category"]["data"]
+            key = (ref["type"], ref["id"])
+            included[key] = self.shared[key]
+            tid = self.shared[key]["relationships"]["thumbnail"]["data"]["id"]
+            included[("thumbnails", tid)] = self.thumbnail(tid)
+
+            ref = relationships["thumbnail"]["data"]
+            if ref is not None:
+                included[("thumbnails", ref["id"])] = self.thumbnail(ref["id"])
+
+        return list(included.values())
+
+    def datasets_document(
+        self,
+        page: Union[int, None] = None,
+        size: Union[int, None] = None,
+        updated_since: Union[str, None] = None,
+        index: bool = False,
+    ) -> dict:
+        """
+        Returns reply of the datasets endpoint. Datasets can be filtered by
+        their modification time and paged. If index is True, only ids and
+        modification times of the datasets are returned, as requested with
+        fields[datasets]=updated.
+        """
+        datasets = self.datasets
+        if updated_since is not None:
+            datasets = [
+                ds
+                for ds in datasets
+                if ds["attributes"]["updated"] >= updated_since
+            ]
+
+        total = len(datasets)
+        if page is not None and size is not None:
+            datasets = datasets[(page - 1) * size : page * size]
+
+        if index:
+            return {
+                "data": [
+                    {
+                        "type": "datasets",
+                        "id": ds["id"],
+                        "attributes": {"updated": ds["attributes"]["updated"]},
+                    }
+                    for ds in datasets
+                ],
+                "meta": {"total": total},
+            }
+
+        return {
+            "data": datasets,
+            "included": self.included(datasets),
+            "meta": {"total": total},
+        }
+
+    def collections_document(self) -> dict:
+        """
+        Returns reply of the datasetCollections endpoint, including
+        collection items and their datasets.
+        """
+        included = list()
+        for collection in self.collections:
+            items, datasets = self.collection_items[collection["id"]]
+            included.extend(items)
+            included.extend(
+                {
+                    "type": "datasets",
+                    "id": ds["id"],
+                    "attributes": ds["attributes"],
+                }
+                for ds in datasets
+            )
+
+        return {
+            "data": self.collections,
+            "included": included,
+            "meta": {"total": len(self.collections)},
+        }
+
+    def status_document(self) -> dict:
+        """
+        Returns reply of the datasetAvailabilities endpoint.
+        """
+        return {
+            "data": [
+                {
+                    "type": "datasetAvailabilities",
+                    "id": uid,
+                    "attributes": {"status": status},
+                }
+                for uid, status in self.statuses.items()
+            ],
+            "meta": {"total": len(self.statuses)},
+        }
+
+    def touch(self, count: int, when: Union[str, None] = None) -> list[str]:
+        """
+        Modifies given number of randomly chosen datasets, as if they were
+        edited on the server at the given time, now by default. Returns ids
+        of the modified datasets.
+        """
+        if when is None:
+            when = datetime.now(timezone.utc).strftime(TIME_FORMAT)
+
+        changed = list()
+        for ds in self.rng.sample(
+            self.datasets, min(count, len(self.datasets))
+        ):
+            ds["attributes"]["title"] += " (updated)"
+            ds["attributes"]["updated"] = when
+            changed.append(ds["id"])
+        return changed
+
+    def write(self, directory: str):
+        """
+        Writes replies of all endpoints into cache files with the same names
+        as used by the data registry.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name, document in (
+            ("datasets.json", self.datasets_document()),
+            ("collections.json", self.collections_document()),
+            ("status.json", self.status_document()),
+        ):
+            with open(
+                os.path.join(directory, name), "w", encoding="utf-8"
+            ) as f:
+                json.dump(document, f, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    catalogue = SyntheticCatalogue(
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    )
+    catalogue.write(sys.argv[1])
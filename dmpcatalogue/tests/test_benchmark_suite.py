@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import shutil
+import tempfile
+
+from qgis.testing import unittest
+
+from dmpcatalogue.tests.benchmark_suite import (
+    BASELINE_FILE,
+    compare,
+    load_baseline,
+    save_baseline,
+)
+
+
+class test_benchmark_suite(unittest.TestCase):
+    def test_compare(self):
+        # baseline is relative to the calibration stage
+        baseline = {"1000": {"parse": 2.0, "flatten": 0.002}}
+        results = {
+            "1000": {
+                "calibration": 0.5,
+                "parse": 1.2,
+                "flatten": 0.003,
+                "attribute": 5.0,
+            },
+            "10000": {"calibration": 5.0, "parse": 20.0},
+        }
+        self.assertEqual(compare(results, baseline, 0.25), list())
+
+        results["1000"]["parse"] = 1.3
+        regressions = compare(results, baseline, 0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("parse (1000 datasets)"))
+
+        # small absolute differences are ignored
+        self.assertEqual(len(compare(results, baseline, 0.5, 0.0)), 1)
+        self.assertEqual(len(compare(results, baseline, 0.25, 0.0)), 2)
+
+        # the same stages on a machine two times slower
+        results = {"1000": {"calibration": 1.0, "parse": 2.4}}
+        self.assertEqual(compare(results, baseline, 0.25), list())
+        results["1000"]["parse"] = 2.6
+        self.assertEqual(len(compare(results, baseline, 0.25)), 1)
+
+    def test_baseline(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(temp_dir, "baseline.json")
+            self.assertIsNone(load_baseline(file_name))
+
+            save_baseline(
+                file_name, {"1000": {"calibration": 0.5, "parse": 1.0}}
+            )
+            self.assertEqual(load_baseline(file_name), {"1000": {"parse": 2.0}})
+        finally:
+            shutil.rmtree(temp_dir)
+
+        # baseline is committed, so regressions are detected on every
+        # checkout
+        baseline = load_baseline(BASELINE_FILE)
+        self.assertIsNotNone(baseline)
+        self.assertIn("parse", baseline["1000"])
+
+
+if __name__ == "__main__":
+    unittest.main()
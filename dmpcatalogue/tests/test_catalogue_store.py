@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import shutil
+import tempfile
+
+from qgis.testing import unittest
+
+from dmpcatalogue.core.catalogue_store import CatalogueStore
+
+
+def dataset_record(uid, title, **kwargs):
+    record = {
+        "uid": uid,
+        "title": title,
+        "description": None,
+        "category": "Natur",
+        "status": None,
+        "tags": list(),
+        "owners": list(),
+        "wms": None,
+        "wmts": None,
+        "wfs": None,
+        "fileSources": list(),
+        "thumbnail": None,
+    }
+    record.update(kwargs)
+    return record
+
+
+class test_catalogue_store(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.temp_dir, "catalogue.sqlite")
+
+        self.datasets = [
+            dataset_record(
+                "ds2",
+                "Beskyttede områder",
+                description="Fredede arealer",
+                tags=["natur", "beskyttelse"],
+                owners=["Miljøstyrelsen"],
+                wms={"url": "https://example.com/wms", "layers": ["a"]},
+                thumbnail=("t1", "https://example.com/t1.png"),
+                status="ok",
+            ),
+            dataset_record(
+                "ds1",
+                "Vandløb 100%",
+                category="Vand",
+                tags=["vand"],
+                owners=["Miljøstyrelsen", "SDFI"],
+                fileSources=[{"url": "https://example.com/file.zip"}],
+            ),
+        ]
+        self.collections = [
+            {"uid": "col1", "title": "Miljø", "datasets": ["ds1", "ds2"]},
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_update(self):
+        store = CatalogueStore(self.file_name)
+        self.assertIsNone(store.key())
+        self.assertEqual(store.dataset_count(), 0)
+
+        store.update("key1", self.datasets, self.collections)
+        store.close()
+
+        # stored catalogue is available to the next store instance
+        store = CatalogueStore(self.file_name)
+        self.assertEqual(store.key(), "key1")
+        self.assertEqual(store.dataset_count(), 2)
+        self.assertEqual(list(store.dataset_records()), self.datasets)
+        self.assertEqual(store.collection_records(), self.collections)
+
+        # stored catalogue is replaced
+        store.update("key2", self.datasets[1:], list())
+        self.assertEqual(store.key(), "key2")
+        self.assertEqual(list(store.dataset_records()), self.datasets[1:])
+        self.assertEqual(store.collection_records(), list())
+        self.assertEqual(store.datasets_with_tag("natur"), list())
+        store.close()
+
+    def test_queries(self):
+        store = CatalogueStore(self.file_name)
+        store.update("key", self.datasets, self.collections)
+
+        self.assertEqual(store.datasets_with_tag("vand"), ["ds1"])
+        self.assertEqual(store.datasets_with_tag("skov"), list())
+        self.assertEqual(
+            store.datasets_of_owner("Miljøstyrelsen"), ["ds1", "ds2"]
+        )
+        self.assertEqual(store.datasets_of_owner("SDFI"), ["ds1"])
+        self.assertEqual(
+            store.datasets_with_url("https://example.com/wms"), ["ds2"]
+        )
+        self.assertEqual(
+            store.datasets_with_url("https://example.com/file.zip"), ["ds1"]
+        )
+        self.assertEqual(store.datasets_in_category("Vand"), ["ds1"])
+        self.assertEqual(store.datasets_with_status("ok"), ["ds2"])
+        self.assertEqual(store.collections_with_dataset("ds2"), ["col1"])
+        store.close()
+
+    def test_search(self):
+        store = CatalogueStore(self.file_name)
+        datasets = self.datasets + [
+            dataset_record("ds3", "Hav", category="Skov")
+        ]
+        store.update("key", datasets, self.collections)
+
+        self.assertEqual(store.search("områder"), ["ds2"])
+        self.assertEqual(store.search("MILJØ"), ["ds1", "ds2"])
+        self.assertEqual(store.search("fredede natur"), ["ds2"])
+        self.assertEqual(store.search("vand sdfi"), ["ds1"])
+        self.assertEqual(store.search("vand natur"), list())
+        self.assertEqual(store.search("ds1"), ["ds1"])
+        self.assertEqual(store.search(""), list())
+        # category is matched by the proxy model only if it is grouped by
+        self.assertEqual(store.search("skov"), list())
+        self.assertEqual(store.search("hav"), ["ds3"])
+
+        # wildcards are matched literally
+        self.assertEqual(store.search("100%"), ["ds1"])
+        self.assertEqual(store.search("%"), ["ds1"])
+        self.assertEqual(store.search("_"), list())
+        store.close()
+
+    def test_update_status(self):
+        store = CatalogueStore(self.file_name)
+        store.update("key", self.datasets, self.collections)
+
+        store.update_status({"ds1": "error", "ds2": None})
+        self.assertEqual(store.datasets_with_status("error"), ["ds1"])
+        self.assertEqual(store.datasets_with_status("ok"), list())
+
+        records = list(store.dataset_records())
+        self.assertEqual(records[0]["status"], None)
+        self.assertEqual(records[1]["status"], "error")
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,8 @@
 ***************************************************************************
 """
 
+from dataclasses import FrozenInstanceError, replace
+
 from qgis.PyQt.QtCore import QUrl
 
 from qgis.core import QgsApplication
@@ -21,6 +23,7 @@ from dmpcatalogue.core.data_classes import (
     WmsSource,
     WmtsSource,
     WfsSource,
+    FileSource,
     Dataset,
 )
 from dmpcatalogue.core.settings_registry import SettingsRegistry
@@ -42,18 +45,23 @@ class test_classes(unittest.TestCase):
         out_url = ds.prepare_url()
         self.assertEqual(out_url, url)
 
-        ds.url = url
+        ds = replace(ds, url=url)
         out_url = ds.prepare_url()
         self.assertEqual(out_url, url)
 
         # datafordeler.dk auth
-        ds.url = "https://services.datafordeler.dk/DAGIM/dagi/1.0.0/WMS"
+        ds = replace(
+            ds, url="https://services.datafordeler.dk/DAGIM/dagi/1.0.0/WMS"
+        )
         out_url = ds.prepare_url()
         self.assertEqual(out_url, ds.url)
 
-        ds.url = (
-            "https://services.datafordeler.dk/DAGIM/dagi/1.0.0/WMS?"
-            "username=UFZLDDPIJS&password=DAIdatafordel123"
+        ds = replace(
+            ds,
+            url=(
+                "https://services.datafordeler.dk/DAGIM/dagi/1.0.0/WMS?"
+                "username=UFZLDDPIJS&password=DAIdatafordel123"
+            ),
         )
         out_url = ds.prepare_url()
         self.assertEqual(out_url, ds.url)
@@ -82,13 +90,18 @@ class test_classes(unittest.TestCase):
         self.assertEqual(q, "username=UFZLDDPIJS&password=DAIdatafordel123")
 
         # override dataforsyningen.dk auth
-        ds.url = "https://api.dataforsyningen.dk/dhm_flow_ekstremregn"
+        ds = replace(
+            ds, url="https://api.dataforsyningen.dk/dhm_flow_ekstremregn"
+        )
         out_url = ds.prepare_url()
         self.assertEqual(out_url, ds.url)
 
-        ds.url = (
-            "https://api.dataforsyningen.dk/dhm_flow_ekstremregn?"
-            "token=6a51dcd965ebe455153c9da5ceddbab9"
+        ds = replace(
+            ds,
+            url=(
+                "https://api.dataforsyningen.dk/dhm_flow_ekstremregn?"
+                "token=6a51dcd965ebe455153c9da5ceddbab9"
+            ),
         )
         out_url = ds.prepare_url()
         self.assertEqual(out_url, ds.url)
@@ -142,34 +155,48 @@ class test_classes(unittest.TestCase):
         layer = ds.to_layer("test")
         self.assertTrue(layer.isValid())
 
-        ds.url = "https://tilecache3-miljoegis.mim.dk/gwc/service/wmts?"
+        ds = replace(
+            ds, url="https://tilecache3-miljoegis.mim.dk/gwc/service/wmts?"
+        )
         layer = ds.to_layer("test")
         self.assertTrue(layer.isValid())
 
-        ds.url = (
-            "https://tilecache3-miljoegis.mim.dk/gwc/service/wmts?"
-            "SERVICE=WMTS"
+        ds = replace(
+            ds,
+            url=(
+                "https://tilecache3-miljoegis.mim.dk/gwc/service/wmts?"
+                "SERVICE=WMTS"
+            ),
         )
         layer = ds.to_layer("test")
         self.assertTrue(layer.isValid())
 
-        ds.url = (
-            "https://tilecache3-miljoegis.mim.dk/gwc/service/wmts?"
-            "REQUEST=GetCapabilities"
+        ds = replace(
+            ds,
+            url=(
+                "https://tilecache3-miljoegis.mim.dk/gwc/service/wmts?"
+                "REQUEST=GetCapabilities"
+            ),
         )
         layer = ds.to_layer("test")
         self.assertTrue(layer.isValid())
 
-        ds.url = (
-            "https://tilecache3-miljoegis.mim.dk/gwc/service/wmts?"
-            "REQUEST=GetCapabilities&SERVICE=WMTS"
+        ds = replace(
+            ds,
+            url=(
+                "https://tilecache3-miljoegis.mim.dk/gwc/service/wmts?"
+                "REQUEST=GetCapabilities&SERVICE=WMTS"
+            ),
         )
         layer = ds.to_layer("test")
         self.assertTrue(layer.isValid())
 
-        ds.url = (
-            "https://tilecache3-miljoegis.mim.dk/gwc/service/wmts%3F"
-            "SERVICE%3DWMTS%26REQUEST%3DGetCapabilities"
+        ds = replace(
+            ds,
+            url=(
+                "https://tilecache3-miljoegis.mim.dk/gwc/service/wmts%3F"
+                "SERVICE%3DWMTS%26REQUEST%3DGetCapabilities"
+            ),
         )
         layer = ds.to_layer("test")
         self.assertTrue(layer.isValid())
@@ -193,24 +220,38 @@ class test_classes(unittest.TestCase):
             "https://geodata-info.dk/srv/dan/catalog.search/metadata",
             "2022-12-05 12:33:09Z",
             "2022-12-05 12:33:09Z",
-            ["åbeskyttelse", "beskyttelseslinje", "naturbeskyttelse"],
-            ["Kommunerne"],
+            ("åbeskyttelse", "beskyttelseslinje", "naturbeskyttelse"),
+            ("Kommunerne",),
             "available",
-            None,
-            None,
-            WmsSource(
+            (
                 "https://geodata.fvm.dk/geoserver/Vandprojekter/wms",
                 "ID15oplande",
                 "Vandprojekter:ID15oplande",
                 "image/png",
             ),
             None,
+            (
+                "https://b0902-prod-dist-app.azurewebsites.net/geoserver/wfs",
+                "dai:aa_bes_linjer",
+            ),
+            (),
+            True,
+            False,
+            None,
+            None,
+        )
+
+        # datasources are created from the records on the first access
+        self.assertEqual(
+            ds.wfs,
             WfsSource(
                 "https://b0902-prod-dist-app.azurewebsites.net/geoserver/wfs",
                 "dai:aa_bes_linjer",
             ),
-            [],
         )
+        self.assertIs(ds.wfs, ds.wfs)
+        self.assertIsNone(ds.wmts)
+        self.assertEqual(ds.files, ())
 
         SettingsRegistry.set_datasource_load_order(["wfs", "wmts", "wms"])
         layer = ds.layer()
@@ -256,13 +297,29 @@ class test_classes(unittest.TestCase):
 
         # check for source presence
         self.assertTrue(ds.has_ows_source())
-        ds.wms = None
-        ds.wfs = None
-        ds.wmts = None
+        with self.assertRaises(FrozenInstanceError):
+            ds.wms_record = None
+        ds = replace(
+            ds,
+            wms_record=None,
+            wfs_record=None,
+            wmts_record=None,
+            has_ows=False,
+        )
         self.assertFalse(ds.has_ows_source())
+        self.assertIsNone(ds.wms)
 
         self.assertFalse(ds.has_files())
-        ds.files = None
+        ds = replace(ds, file_records=None)
         self.assertFalse(ds.has_files())
-        ds.files = ["https://server.dk/data/resource/file"]
+        self.assertIsNone(ds.files)
+        ds = replace(
+            ds,
+            file_records=(("https://server.dk/data/resource/file", "zip"),),
+            has_file_sources=True,
+        )
         self.assertTrue(ds.has_files())
+        self.assertEqual(
+            ds.files,
+            (FileSource("https://server.dk/data/resource/file", "zip"),),
+        )
@@ -11,20 +11,24 @@
 ***************************************************************************
 """
 
+import io
 import os
 import json
+import tempfile
+from unittest import mock
 
 from qgis.testing import start_app, unittest
 
-from dmpcatalogue.core.data_classes import WmsSource, WfsSource, WmtsSource
 from dmpcatalogue.core.utils import (
     lookup_map,
     resource,
     flatten,
     attribute,
-    ows_datasource,
-    file_datasource,
+    file_type,
     collection,
+    ResourceResolver,
+    JsonReader,
+    iter_json,
 )
 
 TEST_DATA_PATH = os.path.join(os.path.dirname(__file__), "testdata")
@@ -210,40 +214,7 @@ class test_utils(unittest.TestCase):
         self.assertEqual(a[2], "naturbeskyttelse")
         self.assertEqual(a[3], "åbeskyttelse")
 
-    def test_ows_datasource(self):
-        data_file = os.path.join(TEST_DATA_PATH, "datasets.json")
-        with open(data_file, "r", encoding="utf-8") as f:
-            content = json.load(f)
-
-        lookup = lookup_map(content["included"], simplify=True)
-        flatten(content["data"], lookup)
-        data = content["data"]
-
-        wfs = data[0]["attributes"]["wfsSource"]
-        keys = ["typeName"]
-        source = ows_datasource("wfs", wfs, keys)
-        self.assertIsInstance(source, WfsSource)
-
-        wms = data[0]["attributes"]["wmsSource"]
-        keys = ["layer", "style", "format"]
-        source = ows_datasource("wms", wms, keys)
-        self.assertIsInstance(source, WmsSource)
-
-        wmts = data[0]["attributes"]["wmtsSource"]
-        keys = ["layer", "style", "format", "matrixSet"]
-        source = ows_datasource("wmts", wmts, keys)
-        self.assertIsInstance(source, WmtsSource)
-
-        source = ows_datasource("wmts", None, keys)
-        self.assertIsNone(source)
-
-        # explicitly pass url key
-        wfs = data[0]["attributes"]["wfsSource"]
-        keys = ["url", "typeName"]
-        source = ows_datasource("wfs", wfs, keys)
-        self.assertIsInstance(source, WfsSource)
-
-    def test_file_datasource(self):
+    def test_file_type(self):
         data_file = os.path.join(TEST_DATA_PATH, "datasets.json")
         with open(data_file, "r", encoding="utf-8") as f:
             content = json.load(f)
@@ -253,20 +224,8 @@ class test_utils(unittest.TestCase):
         data = content["data"]
 
         file_sources = data[1]["attributes"]["fileSources"]
-        files = file_datasource(file_sources)
-        self.assertEqual(len(files), len(file_sources))
-        self.assertEqual(
-            files[0].url,
-            "https://arealdata-api.miljoeportal.dk/data/vanda-ue-33/file",
-        )
-        self.assertEqual(files[0].file_type, "CSV")
-
-        files = file_datasource(None)
-        self.assertIsNone(files)
-
-        files = file_datasource([])
-        self.assertIsInstance(files, list)
-        self.assertEqual(len(files), 0)
+        self.assertEqual(file_type(file_sources[0]), "CSV")
+        self.assertIsNone(file_type(dict()))
 
     def test_collection(self):
         data_file = os.path.join(TEST_DATA_PATH, "collections.json")
@@ -290,3 +249,119 @@ class test_utils(unittest.TestCase):
         self.assertEqual(len(datasets), 2)
         self.assertEqual(datasets[0], "urn:dmp:ds:aftaleomraader-for-grundvand")
         self.assertEqual(datasets[1], "urn:dmp:ds:bundfauna-dvfi-vandloeb")
+
+    def test_resource_resolver(self):
+        data_file = os.path.join(TEST_DATA_PATH, "datasets.json")
+        with open(data_file, "r", encoding="utf-8") as f:
+            content = json.load(f)
+
+        resolver = ResourceResolver(content["included"])
+        resolved = [resolver.resolve(item) for item in content["data"]]
+
+        # input is not modified
+        for item in content["data"]:
+            self.assertIn("relationships", item)
+            self.assertNotIn("tags", item["attributes"])
+
+        # results are the same as with lookup_map() and flatten()
+        lookup = lookup_map(content["included"], simplify=True)
+        flatten(content["data"], lookup)
+        expected = [item["attributes"] for item in content["data"]]
+        self.assertEqual(resolved, expected)
+
+        attrs = resolved[1]
+        self.assertEqual(
+            attrs["fileSources"][0]["fileSourceType"]["name"], "CSV"
+        )
+
+        # shared resources are resolved only once
+        a = resolver.resource(
+            {"type": "tags", "id": "41cfe7cf-c69b-420c-8865-af7200f50759"}
+        )
+        b = resolver.resource(
+            {"type": "tags", "id": "41cfe7cf-c69b-420c-8865-af7200f50759"}
+        )
+        self.assertIs(a, b)
+        self.assertEqual(a["name"], "naturbeskyttelsesloven")
+
+        self.assertIsNone(resolver.resource(None))
+        self.assertIsNone(resolver.resource([]))
+        self.assertIsNone(resolver.resource({"type": "tags", "id": "none"}))
+
+        # circular references
+        resolver = ResourceResolver(
+            [
+                {
+                    "type": "a",
+                    "id": "1",
+                    "attributes": {"name": "a"},
+                    "relationships": {"b": {"data": {"type": "b", "id": "2"}}},
+                },
+                {
+                    "type": "b",
+                    "id": "2",
+                    "attributes": {"name": "b"},
+                    "relationships": {"a": {"data": {"type": "a", "id": "1"}}},
+                },
+            ]
+        )
+        a = resolver.resource({"type": "a", "id": "1"})
+        self.assertEqual(a["b"]["name"], "b")
+        self.assertEqual(a["b"]["a"], {"name": "a", "id": "1"})
+
+    def test_iter_json(self):
+        data_file = os.path.join(TEST_DATA_PATH, "datasets.json")
+        with open(data_file, "r", encoding="utf-8") as f:
+            content = json.load(f)
+
+        # small chunks to make sure values split between chunks are handled
+        for chunk_size in (1, 7, 1 << 16):
+            items = list(iter_json(data_file, {"data", "meta"}, chunk_size))
+            data = [v for k, v in items if k == "data"]
+            meta = [v for k, v in items if k == "meta"]
+            self.assertEqual(data, content["data"])
+            self.assertEqual(meta, [content["meta"]])
+
+            items = list(iter_json(data_file, {"included"}, chunk_size))
+            self.assertEqual([v for k, v in items], content["included"])
+
+        temp_dir = tempfile.mkdtemp()
+        file_name = os.path.join(temp_dir, "test.json")
+        with open(file_name, "w", encoding="utf-8") as f:
+            f.write('{"a": [], "b": [1.5e3, -20, true, null], "c": 12345}')
+
+        for chunk_size in (1, 2, 3):
+            items = list(iter_json(file_name, {"a", "b", "c"}, chunk_size))
+            self.assertEqual(
+                items,
+                [
+                    ("b", 1.5e3),
+                    ("b", -20),
+                    ("b", True),
+                    ("b", None),
+                    ("c", 12345),
+                ],
+            )
+
+        with open(file_name, "w", encoding="utf-8") as f:
+            f.write("{}")
+        self.assertEqual(list(iter_json(file_name, {"a"})), [])
+
+        with open(file_name, "w", encoding="utf-8") as f:
+            f.write('{"a": [1, 2')
+        with self.assertRaises(ValueError):
+            list(iter_json(file_name, {"a"}))
+
+        os.remove(file_name)
+        os.rmdir(temp_dir)
+
+        # values larger than a chunk are read in growing chunks
+        text = json.dumps({"a": ["x" * 100000]})
+        stream = io.StringIO(text)
+        with mock.patch.object(stream, "read", wraps=stream.read) as read:
+            reader = JsonReader(stream, 16)
+            reader.expect("{")
+            self.assertEqual(reader.value(), "a")
+            reader.expect(":")
+            self.assertEqual(reader.value(), ["x" * 100000])
+        self.assertLess(read.call_count, 20)
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from qgis.PyQt.QtNetwork import QNetworkReply
+from qgis.testing import start_app, unittest
+
+from dmpcatalogue.core.data_classes import Dataset, RecordError
+from dmpcatalogue.core.data_registry import DataRegistry
+from dmpcatalogue.core.settings_registry import SettingsRegistry
+from dmpcatalogue.core.thumbnail_fetcher import ThumbnailFetcher
+from dmpcatalogue.core.thumbnail_store import ThumbnailStore
+
+
+class test_data_registry(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        start_app()
+
+    def test_api_url(self):
+        registry = DataRegistry()
+        registry.locale = "dk"
+
+        tracking = SettingsRegistry.tracking_enabled()
+        SettingsRegistry.set_tracking_enabled(False)
+
+        root = SettingsRegistry.catalog_url()
+        self.assertEqual(
+            registry.api_url("datasetAvailabilities"),
+            f"{root}/datasetAvailabilities?locale=dk",
+        )
+        self.assertEqual(
+            registry.api_url("datasets", "include=tags"),
+            f"{root}/datasets?include=tags&locale=dk",
+        )
+
+        SettingsRegistry.set_tracking_enabled(True)
+        url = registry.api_url("datasetAvailabilities")
+        self.assertTrue(url.startswith(f"{root}/datasetAvailabilities?"))
+        self.assertEqual(url.count("?"), 1)
+        self.assertIn("&componentname=DMPCatalogue", url)
+
+        SettingsRegistry.set_tracking_enabled(tracking)
+
+    def test_conditional_request(self):
+        temp_dir = tempfile.mkdtemp()
+        cache_file = os.path.join(temp_dir, "datasets.json")
+        url = "https://example.com/api/datasets?locale=dk"
+
+        registry = DataRegistry()
+        registry.validators = {
+            url: {
+                "etag": '"abc"',
+                "last_modified": "Wed, 21 Oct 2015 07:28:00 GMT",
+            }
+        }
+
+        # no cached reply, request should not be conditional
+        request = registry.request(url, cache_file)
+        self.assertFalse(request.hasRawHeader(b"If-None-Match"))
+        self.assertFalse(request.hasRawHeader(b"If-Modified-Since"))
+
+        with open(cache_file, "w", encoding="utf-8") as f:
+            f.write("{}")
+
+        request = registry.request(url, cache_file)
+        self.assertEqual(bytes(request.rawHeader(b"If-None-Match")), b'"abc"')
+        self.assertEqual(
+            bytes(request.rawHeader(b"If-Modified-Since")),
+            b"Wed, 21 Oct 2015 07:28:00 GMT",
+        )
+
+        # validators are stored per URL
+        request = registry.request(url + "&orgname=test", cache_file)
+        self.assertFalse(request.hasRawHeader(b"If-None-Match"))
+        self.assertFalse(request.hasRawHeader(b"If-Modified-Since"))
+
+        shutil.rmtree(temp_dir)
+
+    def test_update_status(self):
+        temp_dir = tempfile.mkdtemp()
+        cache_file = os.path.join(temp_dir, "status.json")
+
+        registry = DataRegistry()
+        for uid, status in (
+            ("ds1", "available"),
+            ("ds2", "available"),
+            ("ds3", "partly"),
+        ):
+            registry.datasets[uid] = Dataset(
+                uid,
+                f"dataset {uid}",
+                "",
+                "category",
+                "",
+                "",
+                "",
+                "",
+                (),
+                (),
+                status,
+                None,
+                None,
+                None,
+                (),
+                False,
+                False,
+                None,
+                None,
+            )
+        ds1 = registry.datasets["ds1"]
+
+        content = {
+            "data": [
+                {
+                    "type": "datasetAvailability",
+                    "id": uid,
+                    "attributes": {"status": status},
+                }
+                for uid, status in (
+                    ("ds1", "available"),
+                    ("ds2", "unavailable"),
+                    ("ds3", "available"),
+                )
+            ]
+        }
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(content, f)
+
+        changed = registry.update_status(cache_file)
+        self.assertEqual(changed, ["ds2", "ds3"])
+        self.assertEqual(registry.datasets["ds2"].status, "unavailable")
+        self.assertEqual(registry.datasets["ds3"].status, "available")
+        # unchanged datasets are kept
+        self.assertIs(registry.datasets["ds1"], ds1)
+
+        self.assertEqual(registry.update_status(cache_file), list())
+
+        shutil.rmtree(temp_dir)
+
+    def test_incomplete_index(self):
+        temp_dir = tempfile.mkdtemp()
+
+        class DummyFetcher:
+            cache_dir = temp_dir
+            pages = 2
+            total = 3
+            elapsed = 0
+
+            def page_files(self):
+                return [
+                    os.path.join(temp_dir, f"page_{page}.json")
+                    for page in (1, 2)
+                ]
+
+            def deleteLater(self):
+                pass
+
+        fetcher = DummyFetcher()
+        for page_file, ids in zip(fetcher.page_files(), (["ds1"], ["ds2"])):
+            with open(page_file, "w", encoding="utf-8") as f:
+                json.dump({"data": [{"id": uid} for uid in ids]}, f)
+
+        registry = DataRegistry()
+        try:
+            with mock.patch(
+                "dmpcatalogue.core.data_registry.cache_directory",
+                return_value=temp_dir,
+            ), mock.patch.object(
+                registry, "fetch_datasets"
+            ) as fetch_datasets, mock.patch.object(
+                registry, "merge_delta"
+            ) as merge_delta:
+                # server reported more datasets than the pages contain, so
+                # missing datasets must not be treated as deleted
+                registry.index_fetched(fetcher, True)
+                fetch_datasets.assert_called_once()
+                merge_delta.assert_not_called()
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_failed_delta(self):
+        class DummyFetcher:
+            error = "failed"
+            transient = False
+            elapsed = 0
+
+            def deleteLater(self):
+                pass
+
+        fetcher = DummyFetcher()
+        registry = DataRegistry()
+        failed = list()
+        registry.requestFailed.connect(failed.append)
+        with mock.patch.object(
+            registry, "fetch_datasets"
+        ) as fetch_datasets, mock.patch.object(
+            registry, "use_cached_datasets"
+        ) as use_cached_datasets, mock.patch.object(
+            registry, "endpoint_ready"
+        ):
+            # server rejected the delta request, all datasets are fetched
+            registry.delta_fetched(fetcher, ["ds1"], ["ds1"], list(), False)
+            fetch_datasets.assert_called_once()
+            use_cached_datasets.assert_not_called()
+            self.assertEqual(len(failed), 1)
+            self.assertIn("failed", failed[0])
+
+            registry.index_fetched(fetcher, False)
+            self.assertEqual(fetch_datasets.call_count, 2)
+            self.assertEqual(len(failed), 2)
+
+            # transient failure, cached datasets are used until next sync
+            fetcher.transient = True
+            registry.delta_fetched(fetcher, ["ds1"], ["ds1"], list(), False)
+            self.assertEqual(fetch_datasets.call_count, 2)
+            use_cached_datasets.assert_called_once()
+            self.assertEqual(len(failed), 3)
+
+    def test_status_poll_backoff(self):
+        registry = DataRegistry()
+
+        interval = SettingsRegistry.status_poll_interval()
+        SettingsRegistry.set_status_poll_interval(10)
+
+        # nothing to poll while registry is empty
+        registry.schedule_status_poll(True)
+        self.assertFalse(registry.status_timer.isActive())
+
+        registry.datasets["ds1"] = None
+        registry.schedule_status_poll(True)
+        self.assertTrue(registry.status_timer.isActive())
+        self.assertEqual(registry.status_timer.interval(), 600000)
+
+        registry.status_backoff = 4
+        registry.schedule_status_poll()
+        self.assertEqual(registry.status_timer.interval(), 2400000)
+
+        # running request is canceled when polling is stopped
+        request = mock.Mock()
+        registry.status_request = request
+        registry.stop_status_poll()
+        self.assertFalse(registry.status_timer.isActive())
+        request.cancel.assert_called_once()
+        self.assertIsNone(registry.status_request)
+
+        SettingsRegistry.set_status_poll_interval(0)
+        registry.schedule_status_poll(True)
+        self.assertFalse(registry.status_timer.isActive())
+
+        SettingsRegistry.set_status_poll_interval(interval)
+
+    def test_apply_updates(self):
+        registry = DataRegistry()
+        registry.dataFetched.disconnect()
+
+        fetched = list()
+        registry.dataFetched.connect(lambda: fetched.append(True))
+
+        registry.fetch_pending = {"datasets", "collections", "status"}
+        registry.pending_updates = set()
+
+        # status landed first, it is parsed together with the datasets
+        registry.pending_updates.add("status")
+        registry.endpoint_ready("status")
+        self.assertEqual(fetched, list())
+
+        registry.pending_updates.add("datasets")
+        registry.endpoint_ready("datasets")
+        self.assertEqual(fetched, [True])
+        self.assertEqual(registry.pending_updates, set())
+
+        # collections landed while datasets are parsed, they are applied
+        # when parsing is finished
+        registry.parse_task = object()
+        registry.pending_updates.add("collections")
+        registry.endpoint_ready("collections")
+        self.assertEqual(registry.pending_updates, {"collections"})
+        self.assertEqual(registry.fetch_pending, set())
+
+        # datasets are not parsed again if they have not changed
+        registry.parse_task = None
+        registry.pending_updates = set()
+        registry.fetch_pending = {"datasets"}
+        registry.endpoint_ready("datasets")
+        self.assertEqual(fetched, [True])
+
+    def test_thumbnail_fetcher(self):
+        temp_dir = tempfile.mkdtemp()
+        store = ThumbnailStore(temp_dir)
+        store.store("t1", b"t1")
+
+        fetcher = ThumbnailFetcher(store)
+
+        self.assertFalse(fetcher.fetch(None))
+        # cached thumbnail
+        self.assertFalse(fetcher.fetch(("t1", "http://127.0.0.1:1/t1.png")))
+        # thumbnail without URL
+        self.assertFalse(fetcher.fetch(("t2", None)))
+
+        self.assertTrue(fetcher.fetch(("t3", "http://127.0.0.1:1/t3.png")))
+        # already requested
+        self.assertFalse(fetcher.fetch(("t3", "http://127.0.0.1:1/t3.png")))
+
+        # evicted thumbnail is downloaded again
+        store.set_budget(1)
+        self.assertFalse(store.contains("t1"))
+        self.assertTrue(fetcher.fetch(("t1", "http://127.0.0.1:1/t1.png")))
+        store.set_budget(0)
+
+        # downloaded thumbnail is requested again once evicted
+        reply = mock.Mock()
+        reply.error.return_value = QNetworkReply.NetworkError.NoError
+        reply.attribute.return_value = 200
+        reply.readAll.return_value = b"t5"
+        url = "http://127.0.0.1:1/t5.png"
+        self.assertTrue(fetcher.fetch(("t5", url)))
+        with mock.patch.object(fetcher, "start_decoding"):
+            fetcher.reply_finished(reply, "t5", url, 0)
+        fetcher.decode_queue.clear()
+        self.assertFalse(fetcher.fetch(("t5", url)))
+        store.set_budget(1)
+        self.assertTrue(fetcher.fetch(("t5", url)))
+        store.set_budget(0)
+
+        # store index is written once the download queue is drained
+        for reply in list(fetcher.replies.values()):
+            reply.abort()
+        with mock.patch.object(store, "save") as save:
+            fetcher.replies["t4"] = None
+            fetcher.save_store()
+            save.assert_not_called()
+
+            fetcher.replies.clear()
+            fetcher.save_store()
+            save.assert_called_once()
+
+        shutil.rmtree(temp_dir)
+
+    def test_parse_errors(self):
+        registry = DataRegistry()
+        skipped = list()
+        registry.recordsSkipped.connect(skipped.append)
+
+        class DummyTask:
+            from_snapshot = False
+            parse_datasets = True
+
+        task = DummyTask()
+        dataset_error = RecordError("dataset", "ds1", "KeyError: 'id'")
+        collection_error = RecordError("collection", "col1", "no datasets")
+        task.errors = [dataset_error, collection_error]
+        registry.update_parse_errors(task)
+        self.assertEqual(registry.parse_errors, task.errors)
+        self.assertEqual(skipped, [task.errors])
+
+        # the same errors are not reported again
+        registry.update_parse_errors(task)
+        self.assertEqual(len(skipped), 1)
+
+        # snapshot contains only valid records, report is kept
+        task.from_snapshot = True
+        task.errors = list()
+        registry.update_parse_errors(task)
+        self.assertEqual(len(registry.parse_errors), 2)
+
+        # parsing collections replaces only collection errors
+        task.from_snapshot = False
+        task.parse_datasets = False
+        registry.update_parse_errors(task)
+        self.assertEqual(registry.parse_errors, [dataset_error])
+        self.assertEqual(len(skipped), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
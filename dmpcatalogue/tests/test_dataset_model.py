@@ -48,8 +48,8 @@ class DummyDataset:
         self.ows = ows
         self.files = files
         self.status = "available"
-        self.thumbnail = None
-        self.category_icon = None
+        self.thumbnail_record = None
+        self.category_thumbnail_record = None
         self.owners = owners
 
     def has_ows_source(self):
@@ -65,6 +65,7 @@ class DummyCollection:
         self.title = title
         self.description = description
         self.datasets = datasets
+        self.thumbnail_record = None
 
 
 class test_dataset_model(unittest.TestCase):
@@ -678,6 +679,212 @@ class test_dataset_model(unittest.TestCase):
         registry.add_or_remove_favorite("ds1")
         registry.add_or_remove_favorite("ds2")
 
+    def test_insert_datasets(self):
+        registry = DataRegistry()
+        model = DatasetItemModel(None, registry)
+        self.assertEqual(model.rowCount(), 1)
+
+        inserted = list()
+        model.rowsInserted.connect(
+            lambda parent, first, last: inserted.append((first, last))
+        )
+
+        registry.add_datasets(
+            [
+                DummyDataset(
+                    "ds1",
+                    "dataset1",
+                    "dataset1 description",
+                    "category1",
+                    ["tag1"],
+                    ["org1"],
+                ),
+                DummyDataset(
+                    "ds2",
+                    "dataset2",
+                    "dataset2 description",
+                    "category1",
+                    ["tag2"],
+                    ["org1"],
+                ),
+            ],
+            dict(),
+        )
+        # new category is inserted with its first dataset, second dataset
+        # is inserted into existing category
+        self.assertEqual(inserted, [(1, 1), (1, 1)])
+        self.assertEqual(model.rowCount(), 2)
+        category_index = model.index(1, 0, QModelIndex())
+        self.assertEqual(
+            model.data(category_index, Qt.ItemDataRole.DisplayRole),
+            "category1",
+        )
+        self.assertEqual(model.rowCount(category_index), 2)
+        self.assertEqual(
+            model.data(model.index(1, 0, category_index), Roles.RoleDatasetUid),
+            "ds2",
+        )
+
+        # datasets already in the registry are not inserted again
+        registry.add_datasets([registry.datasets["ds1"]], dict())
+        self.assertEqual(len(inserted), 2)
+        self.assertEqual(model.rowCount(category_index), 2)
+
+        # datasets are not inserted when collections are shown
+        model.set_show_collections(True)
+        registry.add_datasets(
+            [
+                DummyDataset(
+                    "ds3",
+                    "dataset3",
+                    "dataset3 description",
+                    "category2",
+                    ["tag3"],
+                    ["org2"],
+                )
+            ],
+            dict(),
+        )
+        self.assertEqual(model.rowCount(), 1)
+
+    def test_search_matches(self):
+        registry = DataRegistry()
+        registry.search = lambda text: {
+            uid
+            for uid, ds in registry.datasets.items()
+            if all(part in ds.description for part in text.split(" "))
+        }
+        registry.datasets["ds0"] = DummyDataset(
+            "ds0",
+            "dataset0",
+            "other description",
+            "category1",
+            ["tag1"],
+            ["org1"],
+        )
+        model = DatasetProxyModel(None, registry)
+        model.set_filter_string("special")
+        self.assertEqual(model.rowCount(), 0)
+        self.assertEqual(model.matches, {("special",): set()})
+
+        # matches found before the dataset was added do not hide it
+        registry.add_datasets(
+            [
+                DummyDataset(
+                    "ds1",
+                    "dataset1",
+                    "special description",
+                    "category1",
+                    ["tag1"],
+                    ["org1"],
+                )
+            ],
+            dict(),
+        )
+        self.assertEqual(model.rowCount(), 1)
+        category_index = model.index(0, 0, QModelIndex())
+        self.assertEqual(
+            model.data(model.index(0, 0, category_index), Roles.RoleDatasetUid),
+            "ds1",
+        )
+
+    def test_registry_changes(self):
+        registry = DataRegistry()
+        registry.datasets["ds1"] = DummyDataset(
+            "ds1",
+            "dataset1",
+            "dataset1 description",
+            "category1",
+            ["tag1"],
+            ["org1"],
+        )
+        registry.datasets["ds2"] = DummyDataset(
+            "ds2",
+            "dataset2",
+            "dataset2 description",
+            "category2",
+            ["tag2"],
+            ["org1"],
+        )
+        model = DatasetItemModel(None, registry)
+        self.assertEqual(model.rowCount(), 3)
+
+        resets = list()
+        changed = list()
+        model.modelReset.connect(lambda: resets.append(True))
+        model.dataChanged.connect(
+            lambda top_left, bottom_right: changed.append(
+                model.data(top_left, Roles.RoleDatasetUid)
+            )
+        )
+
+        class DummyTask:
+            catalogue_store = None
+            parse_datasets = True
+            from_snapshot = False
+            errors = list()
+
+        # status change is applied in place
+        task = DummyTask()
+        task.datasets = dict(registry.datasets)
+        task.datasets["ds1"] = DummyDataset(
+            "ds1",
+            "dataset1",
+            "dataset1 description",
+            "category1",
+            ["tag1"],
+            ["org1"],
+        )
+        task.datasets["ds1"].status = "unavailable"
+        task.collections = dict()
+        task.images = dict()
+        registry.load_data(task)
+
+        # category icon did not change, so only dataset node is updated
+        self.assertEqual(changed, ["ds1"])
+        category_index = model.index(1, 0, QModelIndex())
+        self.assertEqual(
+            model.dataset_for_index(model.index(0, 0, category_index)).status,
+            "unavailable",
+        )
+
+        # dataset moved to another category, empty category is removed
+        task = DummyTask()
+        task.datasets = dict(registry.datasets)
+        task.datasets["ds1"] = DummyDataset(
+            "ds1",
+            "dataset1",
+            "dataset1 description",
+            "category2",
+            ["tag1"],
+            ["org1"],
+        )
+        task.collections = dict()
+        task.images = dict()
+        registry.load_data(task)
+
+        self.assertEqual(model.rowCount(), 2)
+        category_index = model.index(1, 0, QModelIndex())
+        self.assertEqual(
+            model.data(category_index, Qt.ItemDataRole.DisplayRole),
+            "category2",
+        )
+        self.assertEqual(model.rowCount(category_index), 2)
+
+        # removed dataset
+        task = DummyTask()
+        task.datasets = {"ds1": registry.datasets["ds1"]}
+        task.collections = dict()
+        task.images = dict()
+        registry.load_data(task)
+
+        self.assertEqual(model.rowCount(category_index), 1)
+        self.assertEqual(
+            model.data(model.index(0, 0, category_index), Roles.RoleDatasetUid),
+            "ds1",
+        )
+        self.assertFalse(resets)
+
     def test_view(self):
         registry = DataRegistry()
         view = DatasetTreeView(None, registry)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import copy
+import json
+import shutil
+import tempfile
+
+from qgis.testing import unittest
+
+from dmpcatalogue.core.delta_sync import (
+    changed_records,
+    file_versions,
+    merge_files,
+    reachable,
+    record_versions,
+    resource_index,
+)
+
+
+class test_delta_sync(unittest.TestCase):
+    def setUp(self):
+        data_dir = os.path.join(os.path.dirname(__file__), "testdata")
+        with open(
+            os.path.join(data_dir, "datasets.json"), "r", encoding="utf-8"
+        ) as f:
+            self.document = json.load(f)
+        self.ids = [item["id"] for item in self.document["data"]]
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.temp_dir, "datasets.json")
+        with open(self.file_name, "w", encoding="utf-8") as f:
+            json.dump(self.document, f, ensure_ascii=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def merge_documents(self, delta: dict, ids: list[str]):
+        """
+        Merges the delta into the local datasets file and returns merged
+        document, ids of the changed records and number of removed records.
+        """
+        changed, removed = merge_files(
+            self.file_name, delta, ids, self.file_name
+        )
+        with open(self.file_name, "r", encoding="utf-8") as f:
+            return json.load(f), changed, removed
+
+    def test_changed_records(self):
+        local = {"ds1": "2022-01-01", "ds2": "2022-01-01", "ds3": None}
+        remote = {"ds1": "2022-01-01", "ds2": "2022-02-01", "ds3": None}
+        remote["ds4"] = "2021-01-01"
+
+        changed, deleted = changed_records(local, remote)
+        self.assertEqual(changed, ["ds2", "ds3", "ds4"])
+        self.assertEqual(deleted, list())
+
+        changed, deleted = changed_records(local, {"ds1": "2022-01-01"})
+        self.assertEqual(changed, list())
+        self.assertEqual(deleted, ["ds2", "ds3"])
+
+        versions = record_versions(self.document)
+        self.assertEqual(list(versions), self.ids)
+        self.assertEqual(versions[self.ids[0]], "2022-12-21 13:52:14Z")
+        self.assertEqual(file_versions(self.file_name), versions)
+
+    def test_unchanged(self):
+        # server returned all datasets, but none of them has changed
+        modified = os.stat(self.file_name).st_mtime_ns
+        changed, removed = merge_files(
+            self.file_name,
+            copy.deepcopy(self.document),
+            self.ids,
+            self.file_name,
+        )
+        self.assertEqual(changed, list())
+        self.assertEqual(removed, 0)
+
+        # file is not written if nothing has changed
+        self.assertEqual(os.stat(self.file_name).st_mtime_ns, modified)
+        self.assertFalse(os.path.exists(f"{self.file_name}.tmp"))
+
+    def test_merge(self):
+        delta = copy.deepcopy(self.document)
+        delta["data"] = delta["data"][1:2]
+
+        # changed attribute of the dataset
+        updated = delta["data"][0]
+        updated["attributes"]["title"] = "Updated title"
+        updated["attributes"]["updated"] = "2023-01-01 00:00:00Z"
+
+        # changed resource referenced by the dataset
+        category = updated["relationships"]["category"]["data"]
+        index = resource_index(delta)
+        index[(category["type"], category["id"])]["attributes"][
+            "title"
+        ] = "Updated category"
+
+        # first dataset is removed on the server
+        ids = self.ids[1:]
+        document, changed, removed = self.merge_documents(delta, ids)
+        self.assertEqual(changed, [updated["id"]])
+        self.assertEqual(removed, 1)
+        self.assertEqual([item["id"] for item in document["data"]], ids)
+        self.assertEqual(
+            document["data"][0]["attributes"]["title"], "Updated title"
+        )
+        self.assertEqual(document["meta"]["total"], len(ids))
+
+        index = resource_index(document)
+        self.assertEqual(
+            index[(category["type"], category["id"])]["attributes"]["title"],
+            "Updated category",
+        )
+
+        # resources used only by the removed dataset are dropped
+        self.assertEqual(
+            set(index),
+            set(reachable(document["data"], resource_index(self.document))),
+        )
+        self.assertLess(
+            len(document["included"]), len(self.document["included"])
+        )
+
+    def test_new_record(self):
+        delta = copy.deepcopy(self.document)
+        delta["data"] = delta["data"][:1]
+        delta["data"][0]["id"] = "urn:dmp:ds:new"
+
+        ids = self.ids + ["urn:dmp:ds:new"]
+        document, changed, removed = self.merge_documents(delta, ids)
+        self.assertEqual(changed, ["urn:dmp:ds:new"])
+        self.assertEqual(removed, 0)
+        self.assertEqual([item["id"] for item in document["data"]], ids)
+        self.assertCountEqual(document["included"], self.document["included"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from functools import partial
+
+from qgis.PyQt.QtCore import QUrl
+from qgis.PyQt.QtNetwork import QNetworkRequest
+
+from qgis.core import QgsNetworkContentFetcherTask
+from qgis.testing import start_app, unittest
+
+from dmpcatalogue.core.fetch_orchestrator import FetchOrchestrator
+from dmpcatalogue.core.request_policy import ManagedRequest, RequestPolicy
+
+
+class test_fetch_orchestrator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        start_app()
+
+    def test_fetch(self):
+        orchestrator = FetchOrchestrator()
+        tasks = dict()
+        requests = dict()
+        for endpoint in ("datasets", "collections", "status"):
+            url = f"http://127.0.0.1:1/{endpoint}"
+            tasks[endpoint] = QgsNetworkContentFetcherTask(
+                QNetworkRequest(QUrl(url))
+            )
+            requests[endpoint] = ManagedRequest(
+                url, partial(tasks.get, endpoint), RequestPolicy()
+            )
+            orchestrator.add(endpoint, requests[endpoint])
+
+        fetched = list()
+        timed = list()
+        finished = list()
+        orchestrator.fetched.connect(
+            lambda endpoint, request: fetched.append((endpoint, request))
+        )
+        orchestrator.endpointTimed.connect(
+            lambda endpoint, elapsed: timed.append(endpoint)
+        )
+        orchestrator.finished.connect(lambda: finished.append(True))
+
+        orchestrator.start()
+        self.assertEqual(
+            orchestrator.pending(), ["datasets", "collections", "status"]
+        )
+
+        # replies are reported in the order they land
+        tasks["status"].fetched.emit()
+        tasks["datasets"].fetched.emit()
+        self.assertEqual(
+            fetched,
+            [
+                ("status", requests["status"]),
+                ("datasets", requests["datasets"]),
+            ],
+        )
+        self.assertEqual(timed, ["status", "datasets"])
+        self.assertEqual(orchestrator.pending(), ["collections"])
+        self.assertEqual(finished, list())
+
+        # repeated signal is ignored
+        tasks["status"].fetched.emit()
+        self.assertEqual(len(fetched), 2)
+
+        tasks["collections"].fetched.emit()
+        self.assertEqual(orchestrator.pending(), list())
+        self.assertEqual(finished, [True])
+        self.assertEqual(
+            set(orchestrator.timings), {"datasets", "collections", "status"}
+        )
+        self.assertTrue(all(t >= 0 for t in orchestrator.timings.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from qgis.PyQt.QtGui import QImage
+
+from qgis.testing import start_app, unittest
+
+from dmpcatalogue.core.data_classes import Dataset, Collection
+from dmpcatalogue.core.data_registry import DataRegistry
+from dmpcatalogue.core.icon_registry import ICONS, IconRegistry
+from dmpcatalogue.constants import PLUGIN_ICON
+
+
+class test_icon_registry(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        start_app()
+
+    def test_shared_icons(self):
+        icons = IconRegistry()
+        image = QImage(32, 32, QImage.Format.Format_ARGB32)
+
+        icon = icons.acquire("c1", image, 2)
+        self.assertIsNotNone(icon)
+        self.assertEqual(icon.availableSizes()[0].width(), 32)
+        # second owner gets the same icon, the image is not used
+        self.assertIs(icons.acquire("c1", QImage()), icon)
+        self.assertIs(icons.icon("c1"), icon)
+        self.assertIsNone(icons.icon("t1"))
+
+        # thumbnail which is not decoded yet
+        self.assertIsNone(icons.acquire("t1", None))
+        self.assertNotIn("t1", icons)
+        icons.set_image("t1", image)
+        self.assertIn("t1", icons)
+
+        # images of the thumbnails without references are ignored
+        icons.set_image("t2", image)
+        self.assertNotIn("t2", icons)
+        self.assertEqual(len(icons), 2)
+
+        icons.clear()
+        self.assertEqual(len(icons), 0)
+
+    def test_release(self):
+        icons = IconRegistry()
+        image = QImage(16, 16, QImage.Format.Format_ARGB32)
+
+        icons.acquire("c1", image)
+        icons.acquire("c1", image)
+        icons.acquire("t1", image)
+
+        # icon is removed when the last reference is released
+        self.assertEqual(icons.release(["c1", "t1"]), 1)
+        self.assertIn("c1", icons)
+        self.assertNotIn("t1", icons)
+        self.assertEqual(icons.release(["c1"]), 1)
+        self.assertEqual(len(icons), 0)
+
+        # unknown thumbnails are ignored
+        self.assertEqual(icons.release(["c1", "t2"]), 0)
+        self.assertFalse(icons.references)
+
+    def test_update_thumbnails(self):
+        registry = DataRegistry()
+        image = QImage(16, 16, QImage.Format.Format_ARGB32)
+
+        # ds2 has own thumbnail, others use category icon
+        for uid, thumbnail, category_thumbnail in (
+            ("ds1", None, ("c1", "http://example.com/c1.png")),
+            ("ds2", ("t2", "http://example.com/t2.png"), ("c1", None)),
+            ("ds3", None, None),
+        ):
+            registry.datasets[uid] = Dataset(
+                uid,
+                f"dataset {uid}",
+                "",
+                "category",
+                "",
+                "",
+                "",
+                "",
+                (),
+                (),
+                "available",
+                None,
+                None,
+                None,
+                (),
+                False,
+                False,
+                thumbnail,
+                category_thumbnail,
+            )
+        registry.collections["col1"] = Collection(
+            "col1", "collection", "", ("ds1",), ("t2", None)
+        )
+        ds1, ds2, ds3 = registry.datasets.values()
+        col1 = registry.collections["col1"]
+
+        self.assertIs(registry.dataset_icon(ds1), PLUGIN_ICON)
+        self.assertIs(registry.dataset_icon(ds2), PLUGIN_ICON)
+        self.assertIsNone(registry.collection_icon(col1))
+
+        datasets_changed = list()
+        collections_changed = list()
+        registry.datasetsChanged.connect(datasets_changed.append)
+        registry.collectionsChanged.connect(collections_changed.append)
+
+        # category thumbnail is also used by datasets without own thumbnail
+        registry.update_thumbnails({"c1": image})
+        self.assertEqual(datasets_changed, [["ds1", "ds2"]])
+        self.assertFalse(collections_changed)
+        self.assertIs(registry.category_icon(ds1), ICONS.icon("c1"))
+        self.assertIs(registry.dataset_icon(ds1), ICONS.icon("c1"))
+        self.assertIs(registry.dataset_icon(ds2), ICONS.icon("c1"))
+        self.assertIs(registry.dataset_icon(ds3), PLUGIN_ICON)
+
+        registry.update_thumbnails({"t2": image})
+        self.assertEqual(datasets_changed[-1], ["ds2"])
+        self.assertEqual(collections_changed, [["col1"]])
+        self.assertIs(registry.dataset_icon(ds2), ICONS.icon("t2"))
+        self.assertIs(registry.category_icon(ds2), ICONS.icon("c1"))
+        self.assertIs(registry.collection_icon(col1), ICONS.icon("t2"))
+        # datasets are not replaced, icons are looked up by thumbnail id
+        self.assertIs(registry.datasets["ds2"], ds2)
+
+    def test_create_icons(self):
+        registry = DataRegistry()
+        image = QImage(16, 16, QImage.Format.Format_ARGB32)
+
+        registry.create_icons({"c1": image, "t2": image})
+        icon = ICONS.icon("c1")
+        self.assertIsNot(ICONS.icon("t2"), icon)
+
+        # existing icons are kept
+        registry.create_icons({"c1": image})
+        self.assertIs(ICONS.icon("c1"), icon)
+        self.assertEqual(registry.icon_ids, {"c1", "t2"})
+
+        # icons not used by any dataset or collection are released
+        registry.collections["col1"] = Collection(
+            "col1", "collection", "", (), ("t2", None)
+        )
+        registry.release_icons()
+        self.assertEqual(registry.icon_ids, {"t2"})
+        registry.release_icons(True)
+        self.assertFalse(registry.icon_ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import json
+import shutil
+import tempfile
+
+from qgis.testing import unittest
+
+from dmpcatalogue.core.metrics import MetricsRegistry
+
+
+class test_metrics(unittest.TestCase):
+    def test_requests(self):
+        metrics = MetricsRegistry(history=2)
+        metrics.record_request("datasets", 10.0, 11.0, 100, 200)
+        metrics.record_request("datasets", 20.0, 23.0, 0, 304)
+        metrics.record_request("datasets", 30.0, 32.0, error="timeout")
+
+        entry = metrics.snapshot()["requests"]["datasets"]
+        self.assertEqual(entry["count"], 3)
+        self.assertEqual(entry["errors"], 1)
+        self.assertEqual(entry["bytes"], 100)
+        self.assertEqual(entry["min_time"], 1.0)
+        self.assertEqual(entry["max_time"], 3.0)
+        self.assertEqual(entry["avg_time"], 2.0)
+        self.assertEqual(entry["statuses"], {"200": 1, "304": 1})
+
+        # only the most recent requests are kept
+        self.assertEqual([r["started"] for r in entry["recent"]], [20.0, 30.0])
+        self.assertEqual(entry["recent"][-1]["error"], "timeout")
+
+    def test_caches_and_timings(self):
+        metrics = MetricsRegistry()
+        metrics.record_cache("thumbnails", True)
+        metrics.record_cache("thumbnails", False)
+        metrics.record_cache("thumbnails", True)
+        with metrics.timer("parse_datasets"):
+            pass
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(
+            snapshot["caches"], {"thumbnails": {"hits": 2, "misses": 1}}
+        )
+        timing = snapshot["timings"]["parse_datasets"]
+        self.assertEqual(timing["count"], 1)
+        self.assertGreaterEqual(timing["avg_time"], 0)
+
+        metrics.reset()
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["caches"], dict())
+        self.assertEqual(snapshot["timings"], dict())
+
+    def test_export(self):
+        metrics = MetricsRegistry()
+        metrics.record_request("status", 1.0, 1.5, 10, 200)
+        metrics.record_timing("load_data", 0.25)
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(temp_dir, "metrics.json")
+            metrics.export(file_name)
+            with open(file_name, "r", encoding="utf-8") as f:
+                content = json.load(f)
+        finally:
+            shutil.rmtree(temp_dir)
+
+        self.assertEqual(content["requests"]["status"]["bytes"], 10)
+        self.assertEqual(content["timings"]["load_data"]["total_time"], 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import json
+import shutil
+import tempfile
+
+from qgis.PyQt.QtCore import QCoreApplication, QUrl, QUrlQuery
+from qgis.PyQt.QtNetwork import QNetworkReply
+
+from qgis.testing import start_app, unittest
+
+from dmpcatalogue.core.page_fetcher import (
+    PageFetcher,
+    join_pages,
+    remove_pages,
+)
+from dmpcatalogue.core.request_policy import RequestPolicy
+from dmpcatalogue.tests.utilities import DummyTask
+
+
+class DummyServer:
+    """
+    Serves pages of the collection with the given number of records.
+    """
+
+    def __init__(self, total, paging=True, meta=True, max_size=None):
+        self.total = total
+        self.paging = paging
+        self.meta = meta
+        self.max_size = max_size
+        self.tasks = list()
+        self.failures = dict()
+
+    def url(self, query):
+        return f"http://127.0.0.1:1/datasets?{query}"
+
+    def fetch_task(self, url, cache_file):
+        task = DummyTask(url)
+        self.tasks.append(task)
+        return task
+
+    def save_reply(self, task, cache_file):
+        query = QUrlQuery(QUrl(task.url))
+        page = int(query.queryItemValue("page[number]"))
+        size = int(query.queryItemValue("page[size]"))
+        if self.max_size is not None:
+            size = min(size, self.max_size)
+
+        ids = list(range(self.total))
+        if self.paging:
+            ids = ids[(page - 1) * size : page * size]
+
+        content = {
+            "data": [
+                {
+                    "type": "datasets",
+                    "id": f"ds{i}",
+                    "relationships": {
+                        "category": {"data": {"type": "categories", "id": "c"}}
+                    },
+                }
+                for i in ids
+            ],
+            "included": [{"type": "categories", "id": "c"}],
+        }
+        if self.meta:
+            content["meta"] = {"total": self.total}
+
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(content, f)
+        return True
+
+    def page(self, task):
+        return int(QUrlQuery(QUrl(task.url)).queryItemValue("page[number]"))
+
+    def reply(self, page, error=None):
+        """
+        Finishes the last requested task of the given page.
+        """
+        task = [t for t in self.tasks if self.page(t) == page][-1]
+        if error is not None:
+            task.error = error
+        task.fetched.emit()
+
+
+class test_page_fetcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        start_app()
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def fetcher(self, server):
+        fetcher = PageFetcher(
+            server.url,
+            server.fetch_task,
+            server.save_reply,
+            self.temp_dir,
+            page_size=2,
+            policy=RequestPolicy(base_delay=0),
+        )
+        self.results = list()
+        fetcher.finished.connect(self.results.append)
+        return fetcher
+
+    def test_pages(self):
+        server = DummyServer(5)
+        fetcher = self.fetcher(server)
+        progress = list()
+        fetcher.pageFetched.connect(lambda n, total: progress.append(n))
+
+        fetcher.start()
+        self.assertEqual(len(server.tasks), 1)
+
+        # remaining pages are requested at once when total is known
+        server.reply(1)
+        self.assertEqual(fetcher.pages, 3)
+        self.assertEqual(len(server.tasks), 3)
+
+        server.reply(3)
+        self.assertEqual(self.results, list())
+        server.reply(2)
+        self.assertEqual(self.results, [True])
+        self.assertEqual(progress, [1, 2, 3])
+        self.assertTrue(fetcher.modified)
+
+        file_name = os.path.join(self.temp_dir, "datasets.json")
+        self.assertEqual(join_pages(fetcher.page_files(), file_name), 5)
+        with open(file_name, "r", encoding="utf-8") as f:
+            content = json.load(f)
+        self.assertEqual(
+            [item["id"] for item in content["data"]],
+            ["ds0", "ds1", "ds2", "ds3", "ds4"],
+        )
+        self.assertEqual(len(content["included"]), 1)
+        self.assertEqual(content["meta"], {"total": 5})
+
+        # pages left from the bigger catalogue are removed
+        with open(fetcher.page_file(4), "w", encoding="utf-8") as f:
+            f.write("{}")
+        self.assertEqual(remove_pages(self.temp_dir, 3), 1)
+        self.assertFalse(os.path.exists(fetcher.page_file(4)))
+        self.assertTrue(os.path.exists(fetcher.page_file(3)))
+
+    def test_retry(self):
+        server = DummyServer(5)
+        fetcher = self.fetcher(server)
+        fetcher.start()
+        server.reply(1)
+
+        # failed page is requested again alone
+        server.reply(2, QNetworkReply.NetworkError.TimeoutError)
+        QCoreApplication.processEvents()
+        self.assertEqual(len(server.tasks), 4)
+        server.reply(3)
+        server.reply(2)
+        self.assertEqual(self.results, [True])
+
+    def test_failure(self):
+        server = DummyServer(5)
+        fetcher = self.fetcher(server)
+        fetcher.start()
+        server.reply(1)
+
+        for _ in range(4):
+            server.reply(2, QNetworkReply.NetworkError.TimeoutError)
+            QCoreApplication.processEvents()
+        self.assertEqual(self.results, [False])
+        self.assertEqual(fetcher.error, "failed")
+
+        # replies after failure are ignored
+        server.reply(3)
+        self.assertEqual(self.results, [False])
+
+    def test_no_paging(self):
+        # server returns whole collection in the first page
+        server = DummyServer(5, paging=False)
+        fetcher = self.fetcher(server)
+        fetcher.start()
+        server.reply(1)
+        self.assertEqual(self.results, [True])
+        self.assertEqual(fetcher.pages, 1)
+        self.assertEqual(len(server.tasks), 1)
+
+    def test_capped_page_size(self):
+        # server returns at most 1 record per page
+        server = DummyServer(3, max_size=1)
+        fetcher = self.fetcher(server)
+        fetcher.start()
+        server.reply(1)
+        self.assertEqual(fetcher.page_size, 1)
+        self.assertEqual(fetcher.pages, 3)
+        server.reply(2)
+        server.reply(3)
+        self.assertEqual(self.results, [True])
+
+        file_name = os.path.join(self.temp_dir, "datasets.json")
+        self.assertEqual(
+            join_pages(fetcher.page_files(), file_name, fetcher.total), 3
+        )
+
+        # incomplete pages do not replace the joined document
+        self.assertEqual(
+            join_pages(fetcher.page_files()[:2], file_name, fetcher.total), 2
+        )
+        with open(file_name, "r", encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)["data"]), 3)
+
+    def test_unknown_total(self):
+        # pages are requested until the last one which is not full
+        server = DummyServer(4, meta=False)
+        fetcher = self.fetcher(server)
+        fetcher.start()
+        for page in (1, 2, 3):
+            self.assertEqual(len(server.tasks), page)
+            server.reply(page)
+        self.assertEqual(self.results, [True])
+        self.assertEqual(fetcher.pages, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
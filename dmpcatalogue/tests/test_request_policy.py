@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import time
+import shutil
+import tempfile
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.PyQt.QtNetwork import QNetworkReply
+
+from qgis.testing import start_app, unittest
+
+from dmpcatalogue.core.request_policy import ManagedRequest, RequestPolicy
+from dmpcatalogue.tests.utilities import DummyTask
+
+
+class test_request_policy(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        start_app()
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_delay(self):
+        policy = RequestPolicy(base_delay=1, max_delay=8)
+        for attempt, limit in ((0, 1), (1, 2), (2, 4), (3, 8), (10, 8)):
+            for _ in range(20):
+                delay = policy.delay(attempt)
+                self.assertGreaterEqual(delay, limit / 2)
+                self.assertLessEqual(delay, limit)
+
+        self.assertTrue(policy.can_retry(0))
+        self.assertFalse(policy.can_retry(policy.max_retries))
+
+    def test_transient(self):
+        errors = QNetworkReply.NetworkError
+        self.assertTrue(RequestPolicy.is_transient(errors.TimeoutError))
+        self.assertTrue(
+            RequestPolicy.is_transient(errors.UnknownContentError, 429)
+        )
+        self.assertTrue(
+            RequestPolicy.is_transient(errors.InternalServerError, 500)
+        )
+        self.assertFalse(
+            RequestPolicy.is_transient(errors.ContentNotFoundError, 404)
+        )
+        self.assertFalse(
+            RequestPolicy.is_transient(errors.AuthenticationRequiredError)
+        )
+
+    def test_circuit(self):
+        state_file = os.path.join(self.temp_dir, "circuits.json")
+        policy = RequestPolicy(state_file, failure_threshold=2)
+        url = "http://Example.com/api/datasets"
+
+        policy.record_failure(url)
+        self.assertTrue(policy.allow(url))
+        policy.record_failure(url)
+        self.assertFalse(policy.allow(url))
+        self.assertFalse(policy.allow("http://example.com/other"))
+        self.assertTrue(policy.allow("http://example.org/api"))
+
+        # state is kept between sessions
+        self.assertFalse(RequestPolicy(state_file).allow(url))
+
+        # requests are allowed again after reset timeout
+        policy.hosts["example.com"]["opened"] = time.time() - 3600
+        self.assertTrue(policy.allow(url))
+
+        policy.record_success(url)
+        self.assertEqual(policy.hosts, dict())
+        self.assertTrue(RequestPolicy(state_file).allow(url))
+
+    def test_retry(self):
+        url = "http://127.0.0.1:1/status"
+        errors = [
+            QNetworkReply.NetworkError.TimeoutError,
+            QNetworkReply.NetworkError.NoError,
+        ]
+        tasks = list()
+
+        def create_task():
+            tasks.append(DummyTask(url, errors[len(tasks)]))
+            return tasks[-1]
+
+        request = ManagedRequest(url, create_task, RequestPolicy(base_delay=0))
+        finished = list()
+        request.finished.connect(lambda: finished.append(request.error))
+        request.start()
+
+        tasks[-1].fetched.emit()
+        self.assertEqual(finished, list())
+        QCoreApplication.processEvents()
+        self.assertEqual(len(tasks), 2)
+
+        tasks[-1].fetched.emit()
+        self.assertEqual(finished, [None])
+        self.assertEqual(request.attempt, 1)
+
+    def test_permanent_error(self):
+        url = "http://127.0.0.1:1/status"
+        tasks = list()
+
+        def create_task():
+            tasks.append(
+                DummyTask(url, QNetworkReply.NetworkError.ContentNotFoundError)
+            )
+            return tasks[-1]
+
+        policy = RequestPolicy(base_delay=0)
+        request = ManagedRequest(url, create_task, policy)
+        request.start()
+        tasks[-1].fetched.emit()
+        self.assertEqual(request.error, "failed")
+        self.assertFalse(request.transient)
+        self.assertEqual(len(tasks), 1)
+        self.assertTrue(policy.allow(url))
+
+    def test_circuit_open(self):
+        url = "http://127.0.0.1:1/status"
+        policy = RequestPolicy(failure_threshold=1)
+        policy.record_failure(url)
+
+        tasks = list()
+        request = ManagedRequest(url, lambda: tasks.append(url), policy)
+        finished = list()
+        request.finished.connect(lambda: finished.append(True))
+        request.start()
+        self.assertEqual(finished, [True])
+        self.assertEqual(tasks, list())
+        self.assertIn("127.0.0.1:1", request.error)
+        self.assertTrue(request.transient)
+
+
+if __name__ == "__main__":
+    unittest.main()
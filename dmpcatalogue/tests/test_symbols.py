@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import shutil
+import tempfile
+
+from qgis.testing import start_app, unittest
+
+from dmpcatalogue.core.data_parser_task import DataParserTask
+from dmpcatalogue.core.symbols import SymbolTable
+from dmpcatalogue.core.thumbnail_store import ThumbnailStore
+from dmpcatalogue.gui.dataset_item_model import CategoryNode, DatasetNode
+from dmpcatalogue.tests.synthetic_catalogue import SyntheticCatalogue
+
+
+class test_symbols(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        start_app()
+
+    def test_symbol_table(self):
+        symbols = SymbolTable()
+        # build strings at runtime, so they are not shared by the compiler
+        first = "".join(["Miljø", "styrelsen"])
+        second = "".join(["Miljøs", "tyrelsen"])
+        self.assertIsNot(first, second)
+
+        self.assertIs(symbols.intern(first), first)
+        self.assertIs(symbols.intern(second), first)
+        self.assertIsNone(symbols.intern(None))
+        self.assertIn(second, symbols)
+        self.assertEqual(len(symbols), 1)
+
+        values = symbols.intern_all([second, "".join(["SD", "FI"])])
+        self.assertIsInstance(values, tuple)
+        self.assertIs(values[0], first)
+        self.assertIsNone(symbols.intern_all(None))
+
+        # lookups do not add values
+        unknown = "".join(["un", "known"])
+        self.assertIs(symbols.get(unknown), unknown)
+        self.assertIs(symbols.get(second), first)
+        self.assertEqual(len(symbols), 2)
+
+        symbols.clear()
+        self.assertEqual(len(symbols), 0)
+
+    def test_parsed_values(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            SyntheticCatalogue(300).write(temp_dir)
+
+            thumbnails = ThumbnailStore(os.path.join(temp_dir, "thumbnails"))
+            task = DataParserTask(thumbnails)
+            self.assertTrue(task.parse(temp_dir, "key"))
+        finally:
+            shutil.rmtree(temp_dir)
+
+        # repeated values are shared by all datasets
+        values = dict()
+        for ds in task.datasets.values():
+            for value in (ds.category, ds.status) + ds.tags + ds.owners:
+                self.assertIs(values.setdefault(value, value), value)
+            for source in (ds.wms, ds.wmts, ds.wfs):
+                if source is not None:
+                    url = values.setdefault(source.url, source.url)
+                    self.assertIs(url, source.url)
+
+    def test_category_index(self):
+        root = CategoryNode("")
+        first = CategoryNode("first")
+        second = CategoryNode("second")
+        for node in (first, DatasetNode(None), second):
+            root.add_child_node(node)
+
+        self.assertIs(root.get_child_category_node("first"), first)
+        self.assertIs(root.get_child_category_node("second"), second)
+        self.assertIsNone(root.get_child_category_node("third"))
+
+        root.remove_child_node(0)
+        self.assertIsNone(first.parent)
+        self.assertIsNone(root.get_child_category_node("first"))
+        self.assertIs(root.get_child_category_node("second"), second)
+        self.assertEqual(len(root.children), 2)
+
+        root.delete_children()
+        self.assertIsNone(root.get_child_category_node("second"))
+
+
+if __name__ == "__main__":
+    unittest.main()
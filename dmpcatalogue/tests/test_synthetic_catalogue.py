@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import json
+import math
+import shutil
+import tempfile
+import multiprocessing.spawn
+import multiprocessing.context
+from unittest import mock
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+
+from qgis.PyQt.QtGui import QImage
+
+from qgis.testing import start_app, unittest
+
+from dmpcatalogue.core.catalogue_store import CatalogueStore
+from dmpcatalogue.core.data_parser_task import (
+    DataParserTask,
+    ExecutableContext,
+)
+from dmpcatalogue.core.records import init_worker, resolve_chunk
+from dmpcatalogue.core.thumbnail_store import ThumbnailStore
+from dmpcatalogue.tests.standin_server import StandInServer
+from dmpcatalogue.tests.synthetic_catalogue import SyntheticCatalogue
+from dmpcatalogue.constants import PARSE_CHUNK_SIZE
+
+
+class test_synthetic_catalogue(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        start_app()
+
+    def test_generator(self):
+        catalogue = SyntheticCatalogue(500, seed=1)
+        document = catalogue.datasets_document()
+        self.assertEqual(len(document["data"]), 500)
+        self.assertEqual(document["meta"], {"total": 500})
+
+        # same seed produces the same catalogue
+        self.assertEqual(
+            SyntheticCatalogue(500, seed=1).datasets_document(), document
+        )
+        self.assertNotEqual(
+            SyntheticCatalogue(500, seed=2).datasets_document(), document
+        )
+
+        # all relationships are resolvable
+        included = {(i["type"], i["id"]) for i in document["included"]}
+        for ds in document["data"]:
+            for rel in ds["relationships"].values():
+                refs = rel["data"]
+                if refs is None:
+                    continue
+                for ref in refs if isinstance(refs, list) else [refs]:
+                    self.assertIn((ref["type"], ref["id"]), included)
+
+        # tags have skewed popularity
+        counts = dict()
+        for ds in document["data"]:
+            for ref in ds["relationships"]["tags"]["data"]:
+                counts[ref["id"]] = counts.get(ref["id"], 0) + 1
+        self.assertGreater(counts["tag-0"], 10 * counts.get("tag-19", 1))
+
+        page = catalogue.datasets_document(2, 200)
+        self.assertEqual(
+            [ds["id"] for ds in page["data"]],
+            [ds["id"] for ds in document["data"][200:400]],
+        )
+        self.assertEqual(page["meta"], {"total": 500})
+
+        changed = catalogue.touch(3, "2030-01-01 00:00:00Z")
+        delta = catalogue.datasets_document(
+            updated_since="2030-01-01 00:00:00Z"
+        )
+        self.assertEqual(
+            sorted(ds["id"] for ds in delta["data"]), sorted(changed)
+        )
+
+        index = catalogue.datasets_document(index=True)
+        self.assertNotIn("included", index)
+        self.assertEqual(set(index["data"][0]["attributes"]), {"updated"})
+
+    def test_parse(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            catalogue = SyntheticCatalogue(300)
+            catalogue.write(temp_dir)
+
+            thumbnails = ThumbnailStore(os.path.join(temp_dir, "thumbnails"))
+            task = DataParserTask(thumbnails)
+            self.assertTrue(task.parse(temp_dir, "key"))
+            self.assertEqual(len(task.datasets), 300)
+            self.assertEqual(len(task.collections), len(catalogue.collections))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_status_change(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            catalogue = SyntheticCatalogue(300)
+            catalogue.write(temp_dir)
+            thumbnails = ThumbnailStore(os.path.join(temp_dir, "thumbnails"))
+            uid = catalogue.datasets[0]["id"]
+
+            for store_file in (None, os.path.join(temp_dir, "store.sqlite")):
+                with mock.patch(
+                    "dmpcatalogue.core.data_parser_task.cache_directory",
+                    return_value=temp_dir,
+                ):
+                    catalogue.statuses[uid] = "available"
+                    catalogue.write(temp_dir)
+                    task = DataParserTask(
+                        thumbnails, catalogue_store=store_file
+                    )
+                    self.assertTrue(task.parse_catalogue())
+                    self.assertEqual(task.datasets[uid].status, "available")
+
+                    # changed status does not invalidate the snapshot, it is
+                    # applied to the stored records
+                    catalogue.statuses[uid] = "unavailable"
+                    with open(
+                        os.path.join(temp_dir, "status.json"),
+                        "w",
+                        encoding="utf-8",
+                    ) as f:
+                        json.dump(catalogue.status_document(), f)
+                    task = DataParserTask(
+                        thumbnails, catalogue_store=store_file
+                    )
+                    self.assertTrue(task.parse_catalogue())
+                    self.assertTrue(task.from_snapshot)
+                    self.assertEqual(task.datasets[uid].status, "unavailable")
+
+            store = CatalogueStore(store_file)
+            self.assertIn(uid, store.datasets_with_status("unavailable"))
+            store.close()
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_parallel_parse(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            catalogue = SyntheticCatalogue(2500)
+            catalogue.write(temp_dir)
+
+            executable = multiprocessing.spawn.get_executable()
+            task = DataParserTask(parallel=True)
+            self.assertEqual(task.index_datasets(temp_dir), 2500)
+            expected = list(task.dataset_records(temp_dir))
+
+            # records resolved by the workers are the same and in the same
+            # order as records resolved in the task
+            with mock.patch(
+                "dmpcatalogue.core.data_parser_task.parse_workers",
+                return_value=2,
+            ):
+                self.assertEqual(
+                    list(task.parallel_records(temp_dir)), expected
+                )
+            # every chunk was resolved by the workers
+            self.assertEqual(
+                task.worker_chunks, math.ceil(2500 / PARSE_CHUNK_SIZE)
+            )
+
+            # without worker processes records are resolved in the task
+            task.worker_chunks = 0
+            with mock.patch(
+                "dmpcatalogue.core.data_parser_task.python_executable",
+                return_value=None,
+            ):
+                self.assertEqual(
+                    list(task.parallel_records(temp_dir)), expected
+                )
+            self.assertEqual(task.worker_chunks, 0)
+
+            # spawn executable of the process is not changed
+            self.assertEqual(multiprocessing.spawn.get_executable(), executable)
+
+            # executable of the context is used only to launch its processes
+            context = ExecutableContext("/opt/python3")
+            process = context.Process(target=print)
+            launched = list()
+            with mock.patch.object(
+                multiprocessing.context.SpawnProcess,
+                "_Popen",
+                lambda p: launched.append(
+                    multiprocessing.spawn.get_executable()
+                )
+                or mock.Mock(),
+            ):
+                process.start()
+            self.assertEqual(list(map(os.fsdecode, launched)), ["/opt/python3"])
+            self.assertEqual(multiprocessing.spawn.get_executable(), executable)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_tolerant_parse(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            catalogue = SyntheticCatalogue(300)
+            catalogue.write(temp_dir)
+
+            datasets = catalogue.datasets_document()
+            datasets["included"].append({"id": "broken"})
+            datasets["data"][0]["relationships"]["category"]["data"] = [
+                {"id": "missing"}
+            ]
+            del datasets["data"][1]["attributes"]["title"]
+            datasets["data"][2] = {"type": "datasets"}
+            collections = catalogue.collections_document()
+            collections["data"][0]["relationships"]["datasetCollectionItems"][
+                "data"
+            ] = []
+            del collections["data"][1]["attributes"]
+            for name, document in (
+                ("datasets.json", datasets),
+                ("collections.json", collections),
+            ):
+                with open(
+                    os.path.join(temp_dir, name), "w", encoding="utf-8"
+                ) as f:
+                    json.dump(document, f)
+
+            thumbnails = ThumbnailStore(os.path.join(temp_dir, "thumbnails"))
+            task = DataParserTask(thumbnails)
+            with self.assertRaises(KeyError):
+                task.parse(temp_dir, "key")
+
+            # malformed records are skipped and reported, others are loaded
+            task = DataParserTask(thumbnails, tolerant=True)
+            self.assertTrue(task.parse(temp_dir, "key"))
+            self.assertEqual(len(task.datasets), 297)
+            self.assertEqual(
+                len(task.collections), len(catalogue.collections) - 2
+            )
+            self.assertEqual(
+                [(e.kind, e.uid) for e in task.errors],
+                [
+                    ("resource", "broken"),
+                    ("dataset", datasets["data"][0]["id"]),
+                    ("dataset", datasets["data"][1]["id"]),
+                    ("dataset", None),
+                    ("collection", collections["data"][0]["id"]),
+                    ("collection", collections["data"][1]["id"]),
+                ],
+            )
+            self.assertEqual(task.errors[4].reason, "no datasets")
+            self.assertTrue(task.errors[2].reason.startswith("TypeError"))
+
+            # snapshot contains only valid records
+            task = DataParserTask(thumbnails, tolerant=True)
+            self.assertTrue(task.parse(temp_dir, "key"))
+            self.assertTrue(task.from_snapshot)
+            self.assertEqual(len(task.datasets), 297)
+            self.assertFalse(task.errors)
+
+            # worker processes report skipped datasets instead of failing
+            init_worker(datasets["included"][:-1])
+            records, errors = resolve_chunk(datasets["data"][:4], True)
+            self.assertEqual(len(records), 2)
+            self.assertEqual(
+                [uid for uid, _ in errors], [datasets["data"][0]["id"], None]
+            )
+            with self.assertRaises(KeyError):
+                resolve_chunk(datasets["data"][:4])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_server(self):
+        catalogue = SyntheticCatalogue(50)
+        with StandInServer(catalogue) as server:
+            url = f"{server.url}/datasets?page[number]=2&page[size]=20"
+            with urlopen(url) as reply:
+                etag = reply.headers["ETag"]
+                content = json.load(reply)
+            self.assertEqual(len(content["data"]), 20)
+            self.assertEqual(content["meta"]["total"], 50)
+
+            # unchanged content is not sent again
+            request = Request(url, headers={"If-None-Match": etag})
+            with self.assertRaises(HTTPError) as cm:
+                urlopen(request)
+            self.assertEqual(cm.exception.code, 304)
+
+            for endpoint in ("datasetCollections", "datasetAvailabilities"):
+                with urlopen(f"{server.url}/{endpoint}?locale=dk") as reply:
+                    self.assertIn("data", json.load(reply))
+
+            thumbnail = [
+                item
+                for item in content["included"]
+                if item["type"] == "thumbnails"
+            ][0]
+            with urlopen(thumbnail["attributes"]["url"]) as reply:
+                image = QImage.fromData(reply.read())
+            self.assertFalse(image.isNull())
+
+            with self.assertRaises(HTTPError) as cm:
+                urlopen(f"{server.url}/unknown")
+            self.assertEqual(cm.exception.code, 404)
+
+        self.assertEqual(len(server.requests), 6)
+        self.assertEqual(
+            [status for _, status, _ in server.requests],
+            [200, 304, 200, 200, 200, 404],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
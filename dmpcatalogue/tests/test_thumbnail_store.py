@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from qgis.PyQt.QtCore import QBuffer, QByteArray, QIODevice
+from qgis.PyQt.QtGui import QImage
+
+from qgis.testing import start_app, unittest
+
+from dmpcatalogue.core.thumbnail_store import ThumbnailStore
+
+
+class test_thumbnail_store(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        start_app()
+
+    def test_store(self):
+        temp_dir = tempfile.mkdtemp()
+
+        store = ThumbnailStore(temp_dir)
+        self.assertFalse(store.contains("t1"))
+        self.assertIsNone(store.file_name("t1"))
+
+        file_name = store.store("t1", b"image1")
+        self.assertTrue(store.contains("t1"))
+        self.assertEqual(store.file_name("t1"), file_name)
+        with open(file_name, "rb") as f:
+            self.assertEqual(f.read(), b"image1")
+
+        # identical images are stored only once
+        self.assertEqual(store.store("t2", b"image1"), file_name)
+        self.assertEqual(store.size(), 6)
+        self.assertEqual(len(os.listdir(temp_dir)), 1)
+
+        # index is used by the next store instance
+        store.save()
+        store = ThumbnailStore(temp_dir)
+        self.assertEqual(store.file_name("t2"), file_name)
+
+        shutil.rmtree(temp_dir)
+
+    def test_eviction(self):
+        temp_dir = tempfile.mkdtemp()
+
+        store = ThumbnailStore(temp_dir, 20)
+        store.store("t1", b"0123456789")
+        store.store("t2", b"abcdefghij")
+        store.blobs[store.ids["t1"]]["accessed"] = 1
+        store.blobs[store.ids["t2"]]["accessed"] = 2
+        # t1 is used again
+        store.file_name("t1")
+
+        # least recently used thumbnail is removed
+        store.store("t3", b"ABCDEFGHIJ")
+        self.assertTrue(store.contains("t1"))
+        self.assertFalse(store.contains("t2"))
+        self.assertTrue(store.contains("t3"))
+        self.assertEqual(store.size(), 20)
+
+        store.set_budget(10)
+        self.assertFalse(store.contains("t1"))
+        self.assertTrue(store.contains("t3"))
+        self.assertEqual(
+            sorted(os.listdir(temp_dir)),
+            sorted([store.ids["t3"], ThumbnailStore.INDEX_FILE]),
+        )
+
+        # thumbnail larger than the budget is kept until the next one
+        # is stored
+        file_name = store.store("t4", b"0123456789ABCDEF")
+        self.assertTrue(os.path.exists(file_name))
+        self.assertEqual(store.file_name("t4"), file_name)
+        self.assertFalse(store.contains("t3"))
+
+        shutil.rmtree(temp_dir)
+
+    def test_replace(self):
+        temp_dir = tempfile.mkdtemp()
+
+        store = ThumbnailStore(temp_dir)
+        old_file = store.store("t1", b"image1")
+        store.store("t2", b"image1")
+
+        # old content is still used by t2
+        new_file = store.store("t1", b"image2")
+        self.assertTrue(os.path.exists(old_file))
+        self.assertEqual(store.file_name("t1"), new_file)
+
+        # old content is released once no thumbnail uses it
+        store.store("t2", b"image2")
+        self.assertFalse(os.path.exists(old_file))
+        self.assertEqual(store.size(), 6)
+        self.assertEqual(os.listdir(temp_dir), [os.path.basename(new_file)])
+
+        shutil.rmtree(temp_dir)
+
+    def test_image(self):
+        temp_dir = tempfile.mkdtemp()
+
+        image = QImage(64, 32, QImage.Format.Format_ARGB32)
+        image.fill(0xFF00FF00)
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        image.save(buffer, "PNG")
+        buffer.close()
+
+        store = ThumbnailStore(temp_dir)
+        self.assertIsNone(store.image("t1", 16))
+
+        file_name = store.store("t1", bytes(data))
+        scaled = store.image("t1", 16)
+        self.assertEqual((scaled.width(), scaled.height()), (16, 8))
+
+        # scaled variant is stored and counted in the store size
+        self.assertTrue(os.path.exists(f"{file_name}_16.png"))
+        self.assertGreater(store.size(), len(data))
+        scaled = store.image("t1", 16)
+        self.assertEqual((scaled.width(), scaled.height()), (16, 8))
+
+        # thumbnail evicted while it was scaled, variant is not left behind
+        digest = os.path.basename(file_name)
+        blob = store.blobs[digest]
+
+        def evicted(tid):
+            del store.blobs[digest]
+            return file_name
+
+        with mock.patch.object(store, "file_name", evicted):
+            scaled = store.image("t1", 24)
+        self.assertEqual((scaled.width(), scaled.height()), (24, 12))
+        self.assertEqual(
+            [name for name in os.listdir(temp_dir) if "_24" in name], list()
+        )
+        store.blobs[digest] = blob
+
+        # variants are removed together with the thumbnail
+        store.set_budget(1)
+        self.assertFalse(store.contains("t1"))
+        self.assertEqual(os.listdir(temp_dir), [ThumbnailStore.INDEX_FILE])
+
+        # thumbnail which is not an image
+        store = ThumbnailStore(temp_dir)
+        store.store("t2", b"data")
+        self.assertIsNone(store.image("t2", 16))
+
+        shutil.rmtree(temp_dir)
+
+    def test_import(self):
+        temp_dir = tempfile.mkdtemp()
+
+        # thumbnails cached by the previous versions of the plugin
+        for name, data in (("t1", b"image1"), ("t2", b"image1")):
+            with open(os.path.join(temp_dir, name), "wb") as f:
+                f.write(data)
+
+        store = ThumbnailStore(temp_dir)
+        self.assertEqual(store.file_name("t1"), store.file_name("t2"))
+        self.assertFalse(os.path.exists(os.path.join(temp_dir, "t1")))
+        self.assertTrue(
+            os.path.exists(os.path.join(temp_dir, ThumbnailStore.INDEX_FILE))
+        )
+
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,7 +17,14 @@ from datetime import datetime, timedelta
 
 from qgis.testing import start_app, unittest
 
-from dmpcatalogue.core.utils import cache_directory, file_exists
+from dmpcatalogue.core.utils import (
+    cache_directory,
+    file_exists,
+    merge_changes,
+    cache_key,
+    load_snapshot,
+    save_snapshot,
+)
 
 
 class test_utils(unittest.TestCase):
@@ -76,3 +83,56 @@ class test_utils(unittest.TestCase):
         self.assertTrue(file_exists(file_name, 3))
 
         shutil.rmtree(cache_dir)
+
+    def test_merge_changes(self):
+        current = {"a": 1, "b": 2, "c": 3}
+        new = {"a": 1, "c": 4, "d": 5}
+
+        b = current["b"]
+        added, removed, changed = merge_changes(current, new)
+        self.assertEqual(added, ["d"])
+        self.assertEqual(removed, ["b"])
+        self.assertEqual(changed, ["c"])
+        self.assertEqual(current, new)
+        self.assertNotIn(b, current.values())
+
+        # equal values are kept untouched
+        value = ["x"]
+        current = {"a": value}
+        added, removed, changed = merge_changes(current, {"a": ["x"]})
+        self.assertFalse(added or removed or changed)
+        self.assertIs(current["a"], value)
+
+    def test_snapshot(self):
+        cache_dir = cache_directory("test_cache")
+        source = os.path.join(cache_dir, "source.json")
+        missing = os.path.join(cache_dir, "missing.json")
+        snapshot = os.path.join(cache_dir, "test.snapshot")
+
+        with open(source, "w", encoding="utf-8") as f:
+            f.write('{"data": []}')
+
+        key = cache_key([source, missing])
+        self.assertEqual(key, cache_key([source, missing]))
+        self.assertNotEqual(key, cache_key([source]))
+
+        self.assertIsNone(load_snapshot(snapshot, key))
+
+        data = ([{"uid": "ds-01", "tags": ["a", "b"]}], [])
+        save_snapshot(snapshot, key, data)
+        self.assertTrue(os.path.exists(snapshot))
+        self.assertEqual(load_snapshot(snapshot, key), data)
+
+        # snapshot is invalidated when source changes
+        with open(source, "w", encoding="utf-8") as f:
+            f.write('{"data": [{}]}')
+        new_key = cache_key([source, missing])
+        self.assertNotEqual(key, new_key)
+        self.assertIsNone(load_snapshot(snapshot, new_key))
+
+        # corrupted snapshot is ignored
+        with open(snapshot, "wb") as f:
+            f.write(b"garbage")
+        self.assertIsNone(load_snapshot(snapshot, key))
+
+        shutil.rmtree(cache_dir)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Network stand-ins shared by the tests of the request handling.
+"""
+
+from __future__ import annotations
+
+from typing import Union
+
+from qgis.PyQt.QtCore import QUrl
+from qgis.PyQt.QtNetwork import QNetworkReply, QNetworkRequest
+
+from qgis.core import QgsNetworkContentFetcherTask
+
+
+class DummyReply:
+    """
+    Reply with the given network error and HTTP status and without
+    content.
+    """
+
+    def __init__(
+        self,
+        error: QNetworkReply.NetworkError,
+        status: Union[int, None] = None,
+    ):
+        self.code = error
+        self.status = status
+
+    def error(self):
+        return self.code
+
+    def errorString(self):
+        return "failed"
+
+    def bytesAvailable(self):
+        return 0
+
+    def attribute(self, attribute):
+        return self.status
+
+
+class DummyTask(QgsNetworkContentFetcherTask):
+    """
+    Fetcher task which is never run, its reply is created from the error
+    and status members, which can be changed by the test.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        error: QNetworkReply.NetworkError = QNetworkReply.NetworkError.NoError,
+        status: Union[int, None] = None,
+    ):
+        QgsNetworkContentFetcherTask.__init__(self, QNetworkRequest(QUrl(url)))
+        self.url = url
+        self.error = error
+        self.status = status
+
+    def reply(self):
+        return DummyReply(self.error, self.status)